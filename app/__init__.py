@@ -27,12 +27,46 @@ def create_app(config_name=None):
     from config.config import config
     app.config.from_object(config[config_name])
     
-    # Initialize extensions
+    from app.utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
+    # Initialize extensions (engine tuning first: it picks the pool class)
+    from app.services.database import database
+    database.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
+    # Initialize services
+    from app.services.metrics import metrics
+    metrics.init_app(app)
+    metrics.register_collector(database.prometheus_lines)
+    from app.utils.passwords import passwords
+    passwords.init_app(app)
+    from app.utils.translations import translations
+    translations.init_app(app)
+    from app.services.tenancy import tenants
+    tenants.init_app(app)
+    from app.services.booking_index import booking_index
+    booking_index.init_app(app)
+    from app.services.reservations import reservations
+    reservations.init_app(app)
+    metrics.register_collector(reservations.prometheus_lines)
+    from app.services.recurring_bookings import recurring_bookings
+    recurring_bookings.init_app(app)
+    from app.services.catalog import catalog_cache
+    catalog_cache.init_app(app)
+    metrics.register_collector(catalog_cache.prometheus_lines)
+    from app.services.occupancy import occupancy
+    occupancy.init_app(app)
+    from app.services.status_stream import status_hub
+    status_hub.init_app(app)
+    from app.services.http_cache import http_cache
+    http_cache.init_app(app)
+    from app.services.fragments import fragment_cache
+    fragment_cache.init_app(app)
+    
     # Register blueprints
     from app.routes import auth, gym, member, booking, admin, api
     app.register_blueprint(auth.bp)
@@ -0,0 +1,324 @@
+"""
+ASGI Application
+Serves the hot read-only API endpoints from async views on SQLAlchemy's
+asyncio engine and hands every other request to the Flask app. The async
+views answer like their Flask twins: same ETags and 304s, Cache-Control,
+compression and /metrics series.
+"""
+from datetime import date, datetime
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+import re
+
+from itsdangerous import BadSignature
+from werkzeug.http import parse_accept_header, parse_etags
+from sqlalchemy import event, or_, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app import create_app, db
+from app.models import Tenant, GymArea
+from app.services.availability import day_slots, slots_version
+from app.services.booking_index import booking_index
+from app.services.catalog import catalog_cache, serialize_area
+from app.services.database import database
+from app.services.http_cache import http_cache, etag_for
+from app.services.metrics import metrics
+from app.services.occupancy import occupancy
+from app.services.status_stream import status_payload
+from app.services.tenancy import tenants, rejection, token_tenant_id, EXEMPT_PREFIXES
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+DRIVER_PACKAGES = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+
+def async_database_url(url):
+    """The asyncio-driver equivalent of a SQLAlchemy URL"""
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'No asyncio driver configured for {backend} databases')
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise RuntimeError('The ASGI app needs a file or server database, not in-memory SQLite')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def async_engine_options(options, backend):
+    """Translate SQLALCHEMY_ENGINE_OPTIONS for the asyncio engine"""
+    connect_args = options.get('connect_args') or {}
+    options = {key: value for key, value in options.items() if key not in ('poolclass', 'connect_args')}
+    if backend == 'postgresql':
+        # asyncpg takes server settings directly instead of libpq options
+        server_settings = {'application_name': f"{connect_args.get('application_name', 'gym-app')}-async"}
+        match = re.search(r'statement_timeout=(\d+)', connect_args.get('options', ''))
+        if match:
+            server_settings['statement_timeout'] = match.group(1)
+        options['connect_args'] = {'server_settings': server_settings}
+    return options
+
+
+class AsyncApi:
+    """ASGI callable: async views for a few GET routes, Flask for the rest.
+
+    The async views read the same tenant, catalog and occupancy caches as
+    the Flask process they share, so only cache misses touch the database,
+    and those go through the asyncio engine without tying up a thread.
+    """
+
+    def __init__(self, flask_app):
+        try:
+            from asgiref.wsgi import WsgiToAsgi
+        except ImportError:
+            raise RuntimeError('The ASGI app requires the asgiref package (pip install asgiref)')
+        self.flask_app = flask_app
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = self._create_engine()
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)
+        # Area -> tenant never changes, so lookups are cached for the process
+        self.area_tenants = {}
+        # (path, Flask endpoint the view stands in for, view)
+        self.routes = [
+            (re.compile(r'^/api/gym-status$'), 'api.gym_status', self.gym_status),
+            (re.compile(r'^/api/available-slots/(?P<room_id>[^/]+)$'), 'api.get_available_slots',
+             self.available_slots),
+        ]
+
+    def _create_engine(self):
+        with self.flask_app.app_context():
+            url = db.engine.url
+        backend = url.get_backend_name()
+        url = self.flask_app.config.get('ASYNC_DATABASE_URI') or async_database_url(url)
+        try:
+            engine = create_async_engine(url, **async_engine_options(
+                self.flask_app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}, backend))
+        except ImportError:
+            package = DRIVER_PACKAGES.get(backend, 'the asyncio driver')
+            raise RuntimeError(f'The ASGI app requires the {package} package (pip install {package})')
+        if backend == 'sqlite':
+            event.listen(engine.sync_engine, 'connect',
+                         lambda dbapi_connection, record: database.apply_pragmas(dbapi_connection))
+        return engine
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            for pattern, endpoint, view in self.routes:
+                match = pattern.match(scope['path'])
+                if match:
+                    return await self._serve(scope, send, endpoint, view, match.groupdict())
+        return await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _serve(self, scope, send, endpoint, view, kwargs):
+        """Run a view and answer the way the Flask app answers `endpoint`.
+
+        Views return (status, payload, summary), where summary is what the
+        Flask endpoint's conditional() validator returns for the request.
+        """
+        token = metrics.start_async_request(endpoint) if metrics.enabled else None
+        status, payload, summary = await view(scope, **kwargs)
+        headers = []
+        body = b''
+
+        etag = None
+        if status == 200 and summary is not None:
+            etag = etag_for(_full_path(scope), self._session(scope),
+                            _header(scope, tenants.header.lower().encode('latin-1')), summary)
+            if parse_etags(_header(scope, b'if-none-match')).contains_weak(etag):
+                status = 304
+        if status != 304:
+            body = f'{self.flask_app.json.dumps(payload)}\n'.encode('utf-8')
+            headers.append((b'content-type', b'application/json'))
+
+        vary = []
+        if etag:
+            headers.append((b'etag', f'W/"{etag}"'.encode('ascii')))
+            vary += ['Cookie', tenants.header]
+        if http_cache.policies.get(endpoint):
+            headers.append((b'cache-control', http_cache.policies[endpoint].encode('latin-1')))
+        if status == 200 and http_cache.min_size and len(body) >= http_cache.min_size:
+            vary.append('Accept-Encoding')
+            body, encoding = http_cache.compress(
+                body, parse_accept_header(_header(scope, b'accept-encoding')))
+            if encoding:
+                headers.append((b'content-encoding', encoding.encode('ascii')))
+        if vary:
+            headers.append((b'vary', ', '.join(vary).encode('latin-1')))
+        if _header(scope, b'origin') is not None:
+            headers.append((b'access-control-allow-origin', b'*'))
+        if token is not None:
+            for value in metrics.finish_async_request(token, scope['method'], status):
+                headers.append((b'server-timing', value.encode('latin-1')))
+        headers.append((b'content-length', str(len(body)).encode('ascii')))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    # Tenant resolution (same rules as TenantResolver._resolve)
+
+    async def _tenant(self, key):
+        record = tenants.cached(key)
+        if record is None:
+            async with self.session() as session:
+                tenant = (await session.scalars(select(Tenant).where(
+                    or_(Tenant.id == key, Tenant.subdomain == key)))).first()
+            record = tenants.store(key, tenant)
+        return SimpleNamespace(**record) if record else None
+
+    def _session(self, scope):
+        """Contents of the Flask session cookie, or {} if missing or invalid"""
+        cookie = SimpleCookie(_header(scope, b'cookie') or '')
+        morsel = cookie.get(self.flask_app.config['SESSION_COOKIE_NAME'])
+        serializer = self.flask_app.session_interface.get_signing_serializer(self.flask_app)
+        if morsel is None or serializer is None:
+            return {}
+        try:
+            return serializer.loads(morsel.value,
+                                    max_age=int(self.flask_app.permanent_session_lifetime.total_seconds()))
+        except BadSignature:
+            return {}
+
+    def _session_tenant_id(self, scope):
+        return self._session(scope).get('tenant_id')
+
+    def _authenticated_tenant_id(self, scope):
+        """Gym of the bearer token if one is sent, else of the session cookie"""
+        authorization = _header(scope, b'authorization')
+        if not authorization:
+            return self._session_tenant_id(scope)
+        with self.flask_app.app_context():
+            return token_tenant_id(authorization)
+
+    async def resolve_tenant(self, scope):
+        """(tenant, None) or (None, (status, payload)) for the request"""
+        if scope['path'].startswith(EXEMPT_PREFIXES):
+            return None, None
+        key = _header(scope, tenants.header.lower().encode('latin-1')) or \
+            tenants.subdomain(_header(scope, b'host') or '')
+        authenticated = self._authenticated_tenant_id(scope) if key else None
+        if not key:
+            key = self._session_tenant_id(scope)
+            if key and await self._tenant(key) is None:
+                return None, None
+        if not key:
+            return None, None
+        tenant = await self._tenant(key)
+        rejected = rejection(tenant, authenticated)
+        if rejected:
+            message, code = rejected
+            return None, (code, {'success': False, 'message': message})
+        return tenant, None
+
+    async def _area_tenant(self, area_id):
+        """Tenant record owning a gym area, or None if the area does not exist"""
+        tenant_id = self.area_tenants.get(area_id)
+        if tenant_id is None:
+            async with self.engine.connect() as connection:
+                tenant_id = (await connection.execute(
+                    select(GymArea.tenant_id).where(GymArea.id == area_id))).scalar()
+            if tenant_id is None:
+                return None
+            self.area_tenants[area_id] = tenant_id
+        areas = catalog_cache.cached(tenant_id, 'areas')
+        if areas is not None and all(area['id'] != area_id for area in areas):
+            # Deleted since it was cached
+            self.area_tenants.pop(area_id, None)
+            return None
+        return await self._tenant(tenant_id)
+
+    # Views
+
+    async def gym_status(self, scope):
+        """Async twin of api.gym_status"""
+        tenant, error = await self.resolve_tenant(scope)
+        if error:
+            return error + (None,)
+        if tenant is None:
+            return 400, {'success': False, 'message': 'Tenant ID required'}, None
+
+        areas = catalog_cache.cached(tenant.id, 'areas')
+        if areas is None:
+            async with self.session() as session:
+                rows = (await session.scalars(select(GymArea).options(selectinload(GymArea.texts))
+                                              .where(GymArea.tenant_id == tenant.id))).all()
+            areas = [serialize_area(area) for area in rows]
+            catalog_cache.store(tenant.id, 'areas', areas)
+
+        missing = occupancy.missing([area['id'] for area in areas])
+        if missing:
+            async with self.engine.connect() as connection:
+                occupancy.seed((await connection.execute(
+                    select(GymArea.id, GymArea.current_users).where(GymArea.id.in_(missing)))).all())
+
+        # As api._gym_status_version
+        summary = (catalog_cache.version(tenant.id),
+                   sorted(occupancy.counts([area['id'] for area in areas]).items()))
+        return 200, {
+            'areas': [status_payload(area) for area in occupancy.with_live_state(areas)],
+            'timestamp': datetime.utcnow().isoformat()
+        }, summary
+
+    async def available_slots(self, scope, room_id):
+        """Async twin of api.get_available_slots"""
+        args = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        granularity = _int_arg(args, 'granularity', 30)
+        duration = _int_arg(args, 'duration', granularity)
+        if granularity <= 0 or duration <= 0:
+            return 400, {'success': False, 'message': 'Invalid slot size'}, None
+
+        current, error = await self.resolve_tenant(scope)
+        if error:
+            return error + (None,)
+        tenant = await self._area_tenant(room_id)
+        if tenant is None or current is None or tenant.id != current.id:
+            return 404, {'success': False, 'message': 'Room not found'}, None
+
+        today = date.today()
+        bucket = booking_index.cached(room_id, today)
+        if bucket is None:
+            async with self.engine.connect() as connection:
+                rows = (await connection.execute(booking_index.bucket_query(room_id, today))).all()
+            bucket = booking_index.store(room_id, today, booking_index.build(rows))
+
+        intervals = [(start, end) for start, end, _ in bucket.intervals]
+        now = datetime.now()
+        return 200, {
+            'success': True,
+            'slots': day_slots(intervals, today, tenant.settings, granularity, duration, now)
+        }, slots_version(tenant.settings, intervals, granularity, now)
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', ()):
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _full_path(scope):
+    """request.full_path of the Flask app for this scope"""
+    return f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+
+
+def _int_arg(args, name, default):
+    """request.args.get(name, default, type=int) for a parsed query string"""
+    try:
+        return int(args[name][0])
+    except (KeyError, ValueError):
+        return default
+
+
+def create_asgi_app(config_name=None, flask_app=None):
+    """Build the ASGI app around an existing or newly created Flask app"""
+    return AsyncApi(flask_app or create_app(config_name))
@@ -4,7 +4,10 @@ Multi-tenant architecture with support for multiple gym owners
 """
 from app import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.passwords import passwords
+from sqlalchemy import and_
+from sqlalchemy.orm import declared_attr, foreign
+import json
 import uuid
 
 class Tenant(db.Model):
@@ -65,6 +68,7 @@ class User(db.Model):
     total_workouts = db.Column(db.Integer, default=0)
     calories_burned = db.Column(db.Integer, default=0)
     streak_days = db.Column(db.Integer, default=0)
+    last_workout_date = db.Column(db.Date)  # Tenant-local day of the latest completed workout
     membership_level = db.Column(db.String(50), default='Basic')
     
     # Status
@@ -83,32 +87,124 @@ class User(db.Model):
     __table_args__ = (
         db.UniqueConstraint('tenant_id', 'username', name='_tenant_username_uc'),
         db.UniqueConstraint('tenant_id', 'email', name='_tenant_email_uc'),
+        # Login without a tenant header looks users up by username only
+        db.Index('ix_users_username_active', 'username', 'is_active'),
     )
     
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = passwords.hash(password)
     
     def check_password(self, password):
         """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        return passwords.verify(password, self.password_hash)
+    
+    def rehash_password_if_needed(self, password):
+        """Re-hash a just-verified password if hasher settings changed"""
+        if passwords.needs_rehash(self.password_hash):
+            self.set_password(password)
+            return True
+        return False
     
     def __repr__(self):
         return f'<User {self.username}>'
 
-class GymArea(db.Model):
+class LocalizedText(db.Model):
+    """Translated text of a gym area or workout program, one row per field and language"""
+    __tablename__ = 'localized_texts'
+    
+    # Key order matches lookups: one entity's field in one language
+    entity_type = db.Column(db.String(50), primary_key=True)  # table name of the entity
+    entity_id = db.Column(db.String(36), primary_key=True)
+    field = db.Column(db.String(50), primary_key=True)
+    lang = db.Column(db.String(10), primary_key=True)
+    tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False)
+    value = db.Column(db.Text)  # list fields hold JSON text
+    
+    __table_args__ = (
+        db.Index('ix_localized_texts_tenant_id', 'tenant_id'),
+    )
+    
+    def __repr__(self):
+        return f'<LocalizedText {self.entity_type}:{self.entity_id} {self.field} {self.lang}>'
+
+class Translatable:
+    """Mixin for models whose translated fields live in localized_texts.
+    
+    `localized_fields` names the translated fields and `localized_json`
+    the ones holding lists. Pass them to the constructor as
+    {language: value} dicts; adding a language adds rows, not columns.
+    """
+    localized_fields = ()
+    localized_json = ()
+    
+    @declared_attr
+    def texts(cls):
+        return db.relationship(
+            'LocalizedText',
+            primaryjoin=lambda: and_(foreign(LocalizedText.entity_id) == cls.id,
+                                     LocalizedText.entity_type == cls.__tablename__),
+            cascade='all, delete-orphan', overlaps='texts'
+        )
+    
+    def __init__(self, **kwargs):
+        localized = {field: kwargs.pop(field) for field in self.localized_fields if field in kwargs}
+        super().__init__(**kwargs)
+        for field, values in localized.items():
+            for lang, value in (values or {}).items():
+                self.set_text(field, lang, value)
+    
+    def _decode(self, field, value):
+        return json.loads(value) if field in self.localized_json and value is not None else value
+    
+    def text(self, field, lang, default=None):
+        """A translated field in one language"""
+        for text in self.texts:
+            if text.field == field and text.lang == lang:
+                return self._decode(field, text.value)
+        return default
+    
+    def localized(self, field):
+        """{language: value} of a translated field"""
+        return {text.lang: self._decode(field, text.value) for text in self.texts if text.field == field}
+    
+    def set_text(self, field, lang, value):
+        if field in self.localized_json and value is not None:
+            value = json.dumps(value, ensure_ascii=False)
+        for text in self.texts:
+            if text.field == field and text.lang == lang:
+                text.value = value
+                return
+        self.texts.append(LocalizedText(entity_type=self.__tablename__, field=field, lang=lang,
+                                        tenant_id=self.tenant_id, value=value))
+    
+    @classmethod
+    def split_texts(cls, rows):
+        """(rows, text rows) for a multi-row INSERT of rows with {language: value} fields"""
+        entities, texts = [], []
+        for row in rows:
+            row = dict(row)
+            row.setdefault('id', str(uuid.uuid4()))
+            for field in cls.localized_fields:
+                for lang, value in (row.pop(field, None) or {}).items():
+                    if field in cls.localized_json and value is not None:
+                        value = json.dumps(value, ensure_ascii=False)
+                    texts.append({'entity_type': cls.__tablename__, 'entity_id': row['id'], 'field': field,
+                                  'lang': lang, 'tenant_id': row['tenant_id'], 'value': value})
+            entities.append(row)
+        return entities, texts
+
+class GymArea(Translatable, db.Model):
     """Gym Areas - different workout zones"""
     __tablename__ = 'gym_areas'
     
+    # Translated: name, description, equipment (list), trainers (list)
+    localized_fields = ('name', 'description', 'equipment', 'trainers')
+    localized_json = ('equipment', 'trainers')
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id'), nullable=False)
     
-    # Area info
-    name_en = db.Column(db.String(200), nullable=False)
-    name_el = db.Column(db.String(200), nullable=False)
-    description_en = db.Column(db.Text)
-    description_el = db.Column(db.Text)
-    
     # Capacity and status
     capacity = db.Column(db.Integer, nullable=False)
     current_users = db.Column(db.Integer, default=0)
@@ -118,18 +214,10 @@ class GymArea(db.Model):
     icon = db.Column(db.String(10), default='💪')
     color = db.Column(db.String(20), default='#8B0000')
     
-    # Equipment (JSON array)
-    equipment_en = db.Column(db.JSON, default=[])
-    equipment_el = db.Column(db.JSON, default=[])
-    
     # Booking settings
     is_bookable = db.Column(db.Boolean, default=False)
     price_per_hour = db.Column(db.Float, default=0)
     
-    # Trainers (JSON array)
-    trainers_en = db.Column(db.JSON, default=[])
-    trainers_el = db.Column(db.JSON, default=[])
-    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -137,22 +225,23 @@ class GymArea(db.Model):
     # Relationships
     bookings = db.relationship('Booking', backref='gym_area', lazy='dynamic', cascade='all, delete-orphan')
     
+    __table_args__ = (
+        db.Index('ix_gym_areas_tenant_id', 'tenant_id'),
+    )
+    
     def __repr__(self):
-        return f'<GymArea {self.name_en}>'
+        return f'<GymArea {self.id}>'
 
-class WorkoutProgram(db.Model):
+class WorkoutProgram(Translatable, db.Model):
     """Workout Programs - predefined workout routines"""
     __tablename__ = 'workout_programs'
     
+    # Translated: name, description
+    localized_fields = ('name', 'description')
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id'), nullable=False)
     
-    # Program info
-    name_en = db.Column(db.String(200), nullable=False)
-    name_el = db.Column(db.String(200), nullable=False)
-    description_en = db.Column(db.Text)
-    description_el = db.Column(db.Text)
-    
     # Details
     duration = db.Column(db.String(50))  # e.g., "45 min"
     difficulty = db.Column(db.String(50))  # Beginner, Intermediate, Advanced
@@ -169,8 +258,12 @@ class WorkoutProgram(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_workout_programs_tenant_id', 'tenant_id'),
+    )
+    
     def __repr__(self):
-        return f'<WorkoutProgram {self.name_en}>'
+        return f'<WorkoutProgram {self.id}>'
 
 class Booking(db.Model):
     """Bookings - room/trainer reservations"""
@@ -187,6 +280,9 @@ class Booking(db.Model):
     trainer_name = db.Column(db.String(200))
     price = db.Column(db.Float, nullable=False)
     
+    # Recurring series this booking is an occurrence of, if any
+    series_id = db.Column(db.String(36), db.ForeignKey('booking_series.id', ondelete='SET NULL'))
+    
     # Status
     status = db.Column(db.String(20), default='confirmed')  # confirmed, cancelled, completed
     
@@ -194,9 +290,60 @@ class Booking(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    __table_args__ = (
+        # Conflict checks and availability: area + date (+ status)
+        db.Index('ix_bookings_area_date_status', 'gym_area_id', 'booking_date', 'status'),
+        # Member listings: user + status, newest first
+        db.Index('ix_bookings_user_status_date', 'user_id', 'status', 'booking_date', 'start_time'),
+        # Confirmed bookings only, for the slot lookups on the booking path
+        db.Index('ix_bookings_confirmed_area_slot', 'gym_area_id', 'booking_date', 'start_time',
+                 postgresql_where=db.text("status = 'confirmed'"),
+                 sqlite_where=db.text("status = 'confirmed'")),
+        # Occurrences of a series
+        db.Index('ix_bookings_series_date', 'series_id', 'booking_date'),
+    )
+    
     def __repr__(self):
         return f'<Booking {self.id}>'
 
+class BookingSeries(db.Model):
+    """Recurring bookings - a weekly rule whose occurrences are booked a few weeks ahead"""
+    __tablename__ = 'booking_series'
+    
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    gym_area_id = db.Column(db.String(36), db.ForeignKey('gym_areas.id'), nullable=False)
+    
+    # Recurrence: RRULE-style weekly rule, counted from starts_on
+    rrule = db.Column(db.String(200), nullable=False)
+    starts_on = db.Column(db.Date, nullable=False)
+    
+    # Details copied to every occurrence
+    start_time = db.Column(db.Time, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)
+    trainer_name = db.Column(db.String(200))
+    price = db.Column(db.Float, nullable=False)
+    
+    # Occurrences up to this day have been booked (or found taken)
+    booked_through = db.Column(db.Date)
+    
+    # Status
+    status = db.Column(db.String(20), default='active')  # active, cancelled
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        # Series still to be extended, per tenant
+        db.Index('ix_booking_series_tenant_status', 'tenant_id', 'status'),
+        db.Index('ix_booking_series_user_id', 'user_id'),
+    )
+    
+    def __repr__(self):
+        return f'<BookingSeries {self.id}>'
+
 class WorkoutSession(db.Model):
     """Workout Sessions - track member workouts"""
     __tablename__ = 'workout_sessions'
@@ -222,5 +369,58 @@ class WorkoutSession(db.Model):
     user = db.relationship('User', backref='workout_sessions')
     workout_program = db.relationship('WorkoutProgram', backref='sessions')
     
+    __table_args__ = (
+        db.Index('ix_workout_sessions_user_start', 'user_id', 'start_time'),
+    )
+    
     def __repr__(self):
         return f'<WorkoutSession {self.id}>'
+
+class MemberStatPeriod(db.Model):
+    """Per-member workout totals for one week or month"""
+    __tablename__ = 'member_stat_periods'
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    period = db.Column(db.String(10), primary_key=True)  # week, month
+    period_start = db.Column(db.Date, primary_key=True)  # Monday / first of month, tenant-local
+    
+    workouts = db.Column(db.Integer, nullable=False, default=0)
+    calories_burned = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<MemberStatPeriod {self.user_id} {self.period} {self.period_start}>'
+
+class BookingRollup(db.Model):
+    """Booking totals per tenant, area and hour, day or hour-of-day per month (tenant-local time)"""
+    __tablename__ = 'booking_rollups'
+    
+    # Key order matches report queries: tenant, grain, time range
+    tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True)
+    grain = db.Column(db.String(4), primary_key=True)  # hour, day, hod
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    gym_area_id = db.Column(db.String(36), primary_key=True)
+    
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+    cancellations = db.Column(db.Integer, nullable=False, default=0)
+    booked_minutes = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<BookingRollup {self.gym_area_id} {self.grain} {self.bucket_start}>'
+
+class WorkoutRollup(db.Model):
+    """Workout session totals per tenant, program and hour, day or hour-of-day per month (tenant-local time)"""
+    __tablename__ = 'workout_rollups'
+    
+    tenant_id = db.Column(db.String(36), db.ForeignKey('tenants.id', ondelete='CASCADE'), primary_key=True)
+    grain = db.Column(db.String(4), primary_key=True)  # hour, day, hod
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    workout_program_id = db.Column(db.String(36), primary_key=True)  # '' for sessions without a program
+    
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    calories_burned = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<WorkoutRollup {self.workout_program_id} {self.grain} {self.bucket_start}>'
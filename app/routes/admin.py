@@ -1,6 +1,49 @@
 """Admin routes - Gym owner dashboard"""
-from flask import Blueprint
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from datetime import date, timedelta
+from app.utils.decorators import role_required
+from app.utils.auth import get_identity
+from app.services.export import export_chunks, FORMATS
+from app.services.analytics import tenant_report
 
 bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-# Will be implemented with admin panel
+@bp.route('/api/export/<dataset>')
+@role_required('admin')
+def export_data(dataset):
+    """Stream the tenant's bookings, sessions or members as CSV/JSONL/Parquet"""
+    fmt = request.args.get('format', 'csv')
+    
+    try:
+        date_from = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        date_to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        chunks = export_chunks(dataset, get_identity().tenant_id, fmt, date_from, date_to)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'success': False, 'message': str(e)}), 501
+    
+    mimetype, extension = FORMATS[fmt]
+    return Response(stream_with_context(chunks),
+                    mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={dataset}.{extension}'})
+
+@bp.route('/api/reports')
+@role_required('admin')
+def reports():
+    """Revenue, utilization, program popularity and peak hours for a date range"""
+    lang = request.args.get('lang', current_app.config['DEFAULT_LANGUAGE'])
+    if lang not in current_app.config['LANGUAGES']:
+        lang = current_app.config['DEFAULT_LANGUAGE']
+    
+    try:
+        date_to = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+        date_from = (date.fromisoformat(request.args['from']) if request.args.get('from')
+                     else date_to - timedelta(days=29))
+        report = tenant_report(get_identity().tenant_id, date_from, date_to, lang)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return jsonify({'success': True, 'report': report})
+
+# Admin panel pages will be implemented separately
@@ -1,37 +1,160 @@
 """API routes - RESTful API endpoints"""
-from flask import Blueprint, jsonify, request, session
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, g, jsonify, request, session, current_app, Response, stream_with_context
 from app import db
-from app.models import User, GymArea, WorkoutProgram, Booking, WorkoutSession, Tenant
-from datetime import datetime, date, time as dt_time
-from app.utils.decorators import tenant_required
+from app.models import GymArea, WorkoutProgram, Booking, BookingSeries, WorkoutSession
+from datetime import datetime, date, timedelta
+import time
+from app.utils.decorators import tenant_required, role_required
+from app.utils.auth import get_current_user
+from app.services.booking_index import booking_index, ends_by_midnight
+from app.services.reservations import reservations, SlotUnavailable, BookingContention
+from app.services.recurring_bookings import recurring_bookings
+from app.services.booking_queries import user_bookings, format_booking, bookings_stamp
+from app.services.http_cache import conditional
+from app.services.catalog import catalog_cache, AREA_SCHEMA, WORKOUT_SCHEMA
+from app.services.occupancy import occupancy, derive_status
+from app.services.tenancy import tenants, current_tenant
+from app.services.status_stream import status_hub, status_payload
+from app.services.member_stats import complete_session, current_streak, rollups
+from app.utils.tenant_time import local_today, tenant_zone
+from app.services.availability import compute_availability, day_slots, slots_version, MAX_RANGE_DAYS
+from app.utils.recurrence import WeeklyRule
 
 bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Longest window a series is expanded over in one request
+MAX_SERIES_WINDOW_DAYS = 366
+
+def _gym_status_version():
+    """Catalog version and live counts: all that gym-status depends on"""
+    tenant = current_tenant()
+    if tenant is None:
+        return None
+    area_ids = [area['id'] for area in catalog_cache.areas(tenant.id)]
+    return (catalog_cache.version(tenant.id), sorted(occupancy.counts(area_ids).items())), None
+
 @bp.route('/gym-status')
+@tenant_required
+@conditional(_gym_status_version)
 def gym_status():
     """API endpoint for real-time gym data"""
-    tenant_id = request.headers.get('X-Tenant-ID') or session.get('tenant_id')
-    
-    if not tenant_id:
-        return jsonify({'success': False, 'message': 'Tenant ID required'}), 400
-    
-    areas = GymArea.query.filter_by(tenant_id=tenant_id).all()
+    tenant_id = current_tenant().id
     
-    areas_data = [{
-        'id': area.id,
-        'name': {'en': area.name_en, 'el': area.name_el},
-        'status': area.status,
-        'capacity': area.capacity,
-        'current_users': area.current_users,
-        'usage_percent': (area.current_users / area.capacity * 100) if area.capacity > 0 else 0
-    } for area in areas]
+    areas_data = [status_payload(area)
+                  for area in occupancy.with_live_state(catalog_cache.areas(tenant_id))]
     
     return jsonify({
         'areas': areas_data,
         'timestamp': datetime.utcnow().isoformat()
     })
 
+@bp.route('/gym-status/stream')
+@tenant_required
+def gym_status_stream():
+    """Server-Sent Events stream of gym status changes"""
+    tenant_id = current_tenant().id
+    
+    # Ids from another worker (or before a restart) get a snapshot
+    last_event_id = status_hub.parse_event_id(request.headers.get('Last-Event-ID'))
+    hold = status_hub.hold_limit(request.environ)
+    
+    def sse(event, seq, data):
+        return f"id: {status_hub.event_id(seq)}\nevent: {event}\ndata: {current_app.json.dumps(data)}\n\n"
+    
+    def generate():
+        # Streams end after a while; EventSource reconnects with Last-Event-ID
+        deadline = time.monotonic() + hold
+        if not hold:
+            # Answered at once (sync worker): reconnect after one poll interval
+            yield f'retry: {int(status_hub.poll_interval * 1000)}\n\n'
+        seq = last_event_id
+        if seq is None:
+            seq, areas = status_hub.snapshot(tenant_id)
+            yield sse('snapshot', seq, {'areas': areas})
+        
+        while True:
+            remaining = max(0, deadline - time.monotonic())
+            events = status_hub.wait(tenant_id, seq, min(status_hub.heartbeat, remaining))
+            if events is None:
+                seq, areas = status_hub.snapshot(tenant_id)
+                yield sse('snapshot', seq, {'areas': areas})
+            elif not events:
+                yield ': keepalive\n\n'
+            for seq, changes in events or ():
+                yield sse('delta', seq, {'areas': changes})
+            if time.monotonic() >= deadline:
+                break
+    
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@bp.route('/gym-status/poll')
+@tenant_required
+def gym_status_poll():
+    """Long-poll fallback: waits for changes after ?since=<seq>"""
+    tenant_id = current_tenant().id
+    
+    since = status_hub.parse_event_id(request.args.get('since'))
+    timeout = min(request.args.get('timeout', 25, type=int), status_hub.heartbeat * 2,
+                  status_hub.hold_limit(request.environ))
+    
+    events = status_hub.wait(tenant_id, since, timeout) if since is not None else None
+    
+    if events is None:
+        seq, areas = status_hub.snapshot(tenant_id)
+        return jsonify({'success': True, 'snapshot': True, 'seq': status_hub.event_id(seq), 'areas': areas})
+    
+    # Merge consecutive deltas so each area appears once with its latest state
+    changes = {}
+    for seq, event_changes in events:
+        for change in event_changes:
+            changes[change['id']] = change
+    
+    return jsonify({
+        'success': True,
+        'snapshot': False,
+        'seq': status_hub.event_id(events[-1][0] if events else since),
+        'areas': list(changes.values())
+    })
+
+def _occupancy_event(update):
+    """Shared handler for check-in/check-out events"""
+    tenant_id = current_tenant().id
+    
+    data = request.get_json(silent=True) or {}
+    area = next((area for area in catalog_cache.areas(tenant_id)
+                 if area['id'] == data.get('area_id')), None)
+    
+    if not area:
+        return jsonify({'success': False, 'message': 'Area not found'}), 404
+    
+    current_users = update(area)
+    status_hub.notify(tenant_id)
+    
+    return jsonify({
+        'success': True,
+        'area_id': area['id'],
+        'current_users': current_users,
+        'status': derive_status(current_users, area['capacity'], area['status'])
+    })
+
+# Posted by the front desk or a door device signed in as staff; members cannot move the counts
+
+@bp.route('/check-in', methods=['POST'])
+@tenant_required
+@role_required('admin', 'staff')
+def check_in():
+    """API endpoint to record a member entering a gym area"""
+    return _occupancy_event(occupancy.check_in)
+
+@bp.route('/check-out', methods=['POST'])
+@tenant_required
+@role_required('admin', 'staff')
+def check_out():
+    """API endpoint to record a member leaving a gym area"""
+    return _occupancy_event(occupancy.check_out)
+
 @bp.route('/start-workout', methods=['POST'])
 def start_workout():
     """API endpoint to log workout start"""
@@ -65,8 +188,8 @@ def start_workout():
         'session_id': workout_session.id,
         'workout': {
             'id': workout.id,
-            'name_en': workout.name_en,
-            'name_el': workout.name_el
+            'name_en': workout.text('name', 'en'),
+            'name_el': workout.text('name', 'el')
         }
     })
 
@@ -87,16 +210,14 @@ def complete_workout():
     if not workout_session or workout_session.user_id != user_id:
         return jsonify({'success': False, 'message': 'Invalid workout session'}), 404
     
-    # Complete the session
-    workout_session.end_time = datetime.utcnow()
-    workout_session.duration_seconds = int((workout_session.end_time - workout_session.start_time).total_seconds())
-    workout_session.calories_burned = request.json.get('calories_burned', workout_session.workout_program.calories if workout_session.workout_program else 0)
-    workout_session.status = 'completed'
+    calories = request.json.get('calories_burned', workout_session.workout_program.calories if workout_session.workout_program else 0)
+    user = get_current_user()
     
-    # Update user stats
-    user = User.query.get(user_id)
-    user.total_workouts += 1
-    user.calories_burned += workout_session.calories_burned
+    # Completes the session and updates the member's counters atomically
+    stats = complete_session(workout_session, calories, user.tenant_id,
+                             tenant_zone(tenants.settings(user.tenant_id)))
+    if stats is None:
+        return jsonify({'success': False, 'message': 'Workout already completed'}), 409
     
     db.session.commit()
     
@@ -106,11 +227,34 @@ def complete_workout():
     return jsonify({
         'success': True,
         'message': 'Workout completed successfully!',
+        'stats': stats
+    })
+
+@bp.route('/member-stats')
+def get_member_stats():
+    """API endpoint for the member's totals and weekly/monthly rollups"""
+    user = get_current_user()
+    if not user:
+        return jsonify({'success': False, 'message': 'Authentication required'}), 401
+    
+    period = request.args.get('period', 'week')
+    limit = min(request.args.get('limit', 12, type=int), 60)
+    
+    try:
+        periods = rollups(user.id, period, limit)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    zone = tenant_zone(tenants.settings(user.tenant_id))
+    return jsonify({
+        'success': True,
         'stats': {
             'total_workouts': user.total_workouts,
             'calories_burned': user.calories_burned,
-            'streak_days': user.streak_days
-        }
+            'streak_days': current_streak(user.streak_days, user.last_workout_date, local_today(zone))
+        },
+        'period': period,
+        'rollups': periods
     })
 
 @bp.route('/book-room', methods=['POST'])
@@ -130,45 +274,235 @@ def book_room():
     # Parse time
     try:
         booking_time = datetime.strptime(data['time'], '%H:%M').time()
+        duration = int(data['duration'])
     except ValueError:
         return jsonify({'success': False, 'message': 'Invalid time format'}), 400
     
-    # Create booking
-    booking = Booking(
-        user_id=user_id,
-        gym_area_id=data['room_id'],
-        booking_date=date.today(),
-        start_time=booking_time,
-        duration_minutes=int(data['duration']),
-        trainer_name=data.get('trainer', ''),
-        price=float(data['price']),
-        status='confirmed'
-    )
+    if duration <= 0:
+        return jsonify({'success': False, 'message': 'Invalid duration'}), 400
+    if not ends_by_midnight(booking_time, duration):
+        return jsonify({'success': False, 'message': 'Bookings must end by midnight'}), 400
     
-    # Check for conflicts
-    conflict = Booking.query.filter_by(
-        gym_area_id=booking.gym_area_id,
-        booking_date=booking.booking_date,
-        start_time=booking.start_time,
-        status='confirmed'
-    ).first()
+    if data['room_id'] not in _bookable_rooms({data['room_id']}):
+        return jsonify({'success': False, 'message': 'Room not found'}), 404
     
-    if conflict:
+    # Overlaps are rejected by the database, so concurrent requests cannot double-book
+    try:
+        booking = reservations.book(
+            user_id,
+            data['room_id'],
+            date.today(),
+            booking_time,
+            duration,
+            trainer_name=data.get('trainer', ''),
+            price=float(data['price'])
+        )
+    except SlotUnavailable:
         return jsonify({'success': False, 'message': 'Time slot already booked'}), 400
-    
-    db.session.add(booking)
-    db.session.commit()
+    except BookingContention:
+        return _slot_busy()
     
     return jsonify({
         'success': True,
         'message': 'Room booked successfully!',
-        'booking': {
-            'id': booking.id,
-            'date': booking.booking_date.isoformat(),
-            'time': booking.start_time.strftime('%H:%M'),
-            'duration': booking.duration_minutes,
-            'price': booking.price
-        }
+        'booking': _booking_payload(booking)
+    })
+
+def _booking_payload(booking):
+    return {
+        'id': booking.id,
+        'room_id': booking.gym_area_id,
+        'date': booking.booking_date.isoformat(),
+        'time': booking.start_time.strftime('%H:%M'),
+        'duration': booking.duration_minutes,
+        'price': booking.price
+    }
+
+def _slot_busy():
+    response = jsonify({'success': False, 'message': 'This slot is busy, please try again'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def _booking_fields(data):
+    """Booking columns from a request's room_id/time/duration/price/trainer; raises ValueError"""
+    duration = int(data['duration'])
+    if duration <= 0:
+        raise ValueError('Invalid duration')
+    start_time = datetime.strptime(data['time'], '%H:%M').time()
+    if not ends_by_midnight(start_time, duration):
+        raise ValueError('Bookings must end by midnight')
+    return {
+        'gym_area_id': str(data['room_id']),
+        'start_time': start_time,
+        'duration_minutes': duration,
+        'trainer_name': data.get('trainer', ''),
+        'price': float(data['price'])
+    }
+
+def _tenant_today():
+    """Today in the user's gym, which may be a day off the server's date"""
+    return local_today(tenant_zone(tenants.settings(session.get('tenant_id'))))
+
+def _bookable_rooms(room_ids):
+    """The ids among room_ids of bookable rooms in the user's gym"""
+    rows = db.session.query(GymArea.id).filter(
+        GymArea.id.in_(room_ids),
+        GymArea.tenant_id == session.get('tenant_id'),
+        GymArea.is_bookable.is_(True)
+    ).all()
+    return {row[0] for row in rows}
+
+@bp.route('/bookings/batch', methods=['POST'])
+def book_batch():
+    """API endpoint to book many rooms, days and times in one transaction"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    data = request.json or {}
+    entries = data.get('bookings')
+    max_items = current_app.config['BOOKING_BATCH_MAX_ITEMS']
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'success': False, 'message': 'Missing required fields'}), 400
+    if len(entries) > max_items:
+        return jsonify({'success': False, 'message': f'At most {max_items} bookings per request'}), 400
+    
+    # Validate everything before touching the database; report positions of bad entries
+    today = _tenant_today()
+    items, invalid = [], []
+    for position, entry in enumerate(entries):
+        try:
+            item = _booking_fields(entry)
+            item['booking_date'] = date.fromisoformat(entry['date'])
+            if item['booking_date'] < today:
+                raise ValueError('Date in the past')
+            items.append(item)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            invalid.append(position)
+    if not invalid:
+        rooms = _bookable_rooms({item['gym_area_id'] for item in items})
+        invalid = [position for position, item in enumerate(items) if item['gym_area_id'] not in rooms]
+    if invalid:
+        return jsonify({'success': False, 'message': 'Invalid bookings', 'invalid': invalid}), 400
+    
+    try:
+        bookings, skipped = reservations.book_many(user_id, items,
+                                                   skip_conflicts=bool(data.get('skip_conflicts')))
+    except SlotUnavailable as e:
+        return jsonify({'success': False, 'message': 'Time slot already booked',
+                        'conflicts': e.conflicts}), 400
+    except BookingContention:
+        return _slot_busy()
+    
+    return jsonify({
+        'success': True,
+        'message': f'{len(bookings)} bookings confirmed',
+        'bookings': [_booking_payload(booking) for booking in bookings],
+        'skipped': skipped
+    })
+
+def _series_payload(series):
+    return {
+        'id': series.id,
+        'room_id': series.gym_area_id,
+        'rrule': series.rrule,
+        'starts_on': series.starts_on.isoformat(),
+        'time': series.start_time.strftime('%H:%M'),
+        'duration': series.duration_minutes,
+        'price': series.price,
+        'status': series.status,
+        'booked_through': series.booked_through.isoformat() if series.booked_through else None
+    }
+
+def _own_series(series_id):
+    """(series, None) for the current user's series, else (None, error response)"""
+    series = db.session.get(BookingSeries, series_id)
+    if not series:
+        return None, (jsonify({'success': False, 'message': 'Series not found'}), 404)
+    if series.user_id != session.get('user_id'):
+        return None, (jsonify({'success': False, 'message': 'Unauthorized'}), 403)
+    return series, None
+
+@bp.route('/booking-series', methods=['GET', 'POST'])
+def booking_series():
+    """API endpoint to list the user's recurring bookings or start a new series"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    
+    if request.method == 'GET':
+        series = BookingSeries.query.filter_by(user_id=user_id).order_by(BookingSeries.created_at).all()
+        return jsonify({'success': True, 'series': [_series_payload(item) for item in series]})
+    
+    data = request.json or {}
+    if not all(field in data for field in ['room_id', 'time', 'duration', 'price', 'rrule']):
+        return jsonify({'success': False, 'message': 'Missing required fields'}), 400
+    try:
+        fields = _booking_fields(data)
+        rule = WeeklyRule.parse(str(data['rrule']))
+        today = _tenant_today()
+        starts_on = date.fromisoformat(data['start']) if data.get('start') else today
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'success': False, 'message': f'Invalid series: {e}'}), 400
+    if starts_on < today:
+        return jsonify({'success': False, 'message': 'Invalid series: start date in the past'}), 400
+    if fields['gym_area_id'] not in _bookable_rooms({fields['gym_area_id']}):
+        return jsonify({'success': False, 'message': 'Room not found'}), 404
+    
+    try:
+        series, bookings, skipped = recurring_bookings.create(
+            user_id, session.get('tenant_id'), fields.pop('gym_area_id'), rule, starts_on,
+            fields.pop('start_time'), fields.pop('duration_minutes'), **fields
+        )
+    except BookingContention:
+        return _slot_busy()
+    
+    return jsonify({
+        'success': True,
+        'message': f'Series created, {len(bookings)} bookings confirmed',
+        'series': _series_payload(series),
+        'bookings': [_booking_payload(booking) for booking in bookings],
+        'skipped': [day.isoformat() for day in skipped]
+    }), 201
+
+@bp.route('/booking-series/<series_id>/occurrences')
+def booking_series_occurrences(series_id):
+    """API endpoint to expand a series over a date window (default: the next 4 weeks)"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    series, error = _own_series(series_id)
+    if error:
+        return error
+    
+    try:
+        window_start = date.fromisoformat(request.args.get('from', _tenant_today().isoformat()))
+        window_end = date.fromisoformat(request.args['to']) if request.args.get('to') \
+            else window_start + timedelta(weeks=4)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid date format'}), 400
+    if window_end < window_start or (window_end - window_start).days > MAX_SERIES_WINDOW_DAYS:
+        return jsonify({'success': False,
+                        'message': f'Date range must cover 1 to {MAX_SERIES_WINDOW_DAYS} days'}), 400
+    
+    return jsonify({
+        'success': True,
+        'series': _series_payload(series),
+        'occurrences': list(recurring_bookings.occurrences(series, window_start, window_end))
+    })
+
+@bp.route('/booking-series/<series_id>/cancel', methods=['POST'])
+def cancel_booking_series(series_id):
+    """API endpoint to cancel a series and its upcoming bookings"""
+    if not session.get('user_id'):
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+    series, error = _own_series(series_id)
+    if error:
+        return error
+    
+    cancelled = recurring_bookings.cancel(series, _tenant_today())
+    return jsonify({
+        'success': True,
+        'message': f'Series cancelled, {cancelled} bookings cancelled'
     })
 
 @bp.route('/cancel-booking', methods=['POST'])
@@ -197,61 +531,152 @@ def cancel_booking():
         'message': 'Booking cancelled successfully!'
     })
 
+def _user_bookings_version():
+    """Newest change and count of the user's bookings, plus room names"""
+    user_id = session.get('user_id')
+    if not user_id:
+        return None
+    last_modified, count = bookings_stamp(user_id)
+    return (count, last_modified, catalog_cache.version(session.get('tenant_id'))), last_modified
+
 @bp.route('/user-bookings')
+@conditional(_user_bookings_version)
 def get_user_bookings():
     """API endpoint to get user's bookings"""
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({'success': False, 'message': 'Not authenticated'}), 401
     
-    bookings = Booking.query.filter_by(
-        user_id=user_id,
-        status='confirmed'
-    ).order_by(Booking.booking_date.desc(), Booking.start_time.desc()).all()
+    lang = request.args.get('lang', session.get('language', 'en'))
+    limit = min(request.args.get('limit', current_app.config['ITEMS_PER_PAGE'], type=int),
+                current_app.config['MAX_ITEMS_PER_PAGE'])
     
-    bookings_data = [{
-        'id': booking.id,
-        'room_id': booking.gym_area_id,
-        'room_name': booking.gym_area.name_en,  # TODO: Make language-aware
-        'date': booking.booking_date.isoformat(),
-        'time': booking.start_time.strftime('%H:%M'),
-        'duration': booking.duration_minutes,
-        'trainer': booking.trainer_name,
-        'price': booking.price
-    } for booking in bookings]
+    try:
+        date_from = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        date_to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+        rows, next_cursor = user_bookings(user_id, lang=lang, date_from=date_from, date_to=date_to,
+                                          limit=max(limit, 1), cursor=request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid filter or cursor'}), 400
     
     return jsonify({
         'success': True,
-        'bookings': bookings_data
+        'bookings': [format_booking(row) for row in rows],
+        'next_cursor': next_cursor
     })
 
+@bp.route('/areas')
+@tenant_required
+@conditional(lambda: (catalog_cache.version(current_tenant().id), None))
+def list_areas():
+    """API endpoint to list the gym's areas in one language"""
+    lang = request.args.get('lang', session.get('language', 'en'))
+    serialize = AREA_SCHEMA.serializer(lang, raw_json=True)
+    rows = db.session.execute(
+        AREA_SCHEMA.select(lang, raw_json=True)
+        .where(GymArea.tenant_id == current_tenant().id)
+        .order_by('name')
+    )
+    return jsonify({'success': True, 'areas': [serialize(row) for row in rows]})
+
+@bp.route('/workouts')
+@tenant_required
+@conditional(lambda: (catalog_cache.version(current_tenant().id), None))
+def list_workouts():
+    """API endpoint to list the gym's workout programs in one language"""
+    lang = request.args.get('lang', session.get('language', 'en'))
+    serialize = WORKOUT_SCHEMA.serializer(lang, raw_json=True)
+    rows = db.session.execute(
+        WORKOUT_SCHEMA.select(lang, raw_json=True)
+        .where(WorkoutProgram.tenant_id == current_tenant().id)
+        .order_by('name')
+    )
+    return jsonify({'success': True, 'workouts': [serialize(row) for row in rows]})
+
+def _room_today(room_id):
+    """(tenant settings, today's booked intervals) for a room of the current gym, or None.
+
+    Computed once per request for both the ETag and the response body.
+    """
+    if 'room_today' not in g:
+        g.room_today = None
+        tenant = current_tenant()
+        if tenant is not None and db.session.query(GymArea.id).filter(
+            GymArea.id == room_id, GymArea.tenant_id == tenant.id
+        ).first() is not None:
+            bucket = booking_index.bucket(room_id, date.today())
+            g.room_today = (tenant.settings, tuple(interval[:2] for interval in bucket.intervals))
+    return g.room_today
+
+def _available_slots_version(room_id):
+    """Opening hours, today's bookings of the room and the slots already started"""
+    granularity = request.args.get('granularity', 30, type=int)
+    room = _room_today(room_id)
+    if granularity <= 0 or room is None:
+        return None
+    settings, intervals = room
+    return slots_version(settings, intervals, granularity, datetime.now()), None
+
 @bp.route('/available-slots/<room_id>')
+@conditional(_available_slots_version)
 def get_available_slots(room_id):
     """API endpoint to get available time slots for a room"""
     today = date.today()
+    granularity = request.args.get('granularity', 30, type=int)
+    duration = request.args.get('duration', granularity, type=int)
     
-    # Get existing bookings for this room today
-    existing_bookings = Booking.query.filter_by(
-        gym_area_id=room_id,
-        booking_date=today,
-        status='confirmed'
-    ).all()
+    if granularity <= 0 or duration <= 0:
+        return jsonify({'success': False, 'message': 'Invalid slot size'}), 400
+    
+    room = _room_today(room_id)
+    if room is None:
+        return jsonify({'success': False, 'message': 'Room not found'}), 404
+    settings, intervals = room
+    
+    return jsonify({
+        'success': True,
+        'slots': day_slots(list(intervals), today, settings, granularity, duration, datetime.now())
+    })
+
+@bp.route('/availability')
+@tenant_required
+def get_availability():
+    """API endpoint to get slots for many rooms over a date range in one call"""
+    tenant = current_tenant()
+    tenant_id = tenant.id
+    
+    try:
+        start_date = date.fromisoformat(request.args.get('start', date.today().isoformat()))
+        if request.args.get('end'):
+            end_date = date.fromisoformat(request.args['end'])
+        else:
+            end_date = start_date + timedelta(days=request.args.get('days', 7, type=int) - 1)
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Invalid date format'}), 400
+    
+    granularity = request.args.get('granularity', 30, type=int)
+    duration = request.args.get('duration', granularity, type=int)
     
-    booked_times = {booking.start_time.strftime('%H:%M') for booking in existing_bookings}
+    if end_date < start_date or (end_date - start_date).days >= MAX_RANGE_DAYS:
+        return jsonify({'success': False,
+                        'message': f'Date range must cover 1 to {MAX_RANGE_DAYS} days'}), 400
+    if granularity <= 0 or duration <= 0:
+        return jsonify({'success': False, 'message': 'Invalid slot size'}), 400
     
-    # Generate available slots
-    slots = []
-    current_hour = datetime.now().hour
+    # Bookable rooms for this tenant, optionally narrowed to ?room_ids=a,b
+    query = db.session.query(GymArea.id).filter_by(tenant_id=tenant_id, is_bookable=True)
+    if request.args.get('room_ids'):
+        query = query.filter(GymArea.id.in_(request.args['room_ids'].split(',')))
+    area_ids = [row[0] for row in query.all()]
     
-    for hour in range(max(current_hour + 1, 8), 22):  # 8 AM to 10 PM
-        for minute in [0, 30]:
-            time_str = f"{hour:02d}:{minute:02d}"
-            slots.append({
-                'time': time_str,
-                'available': time_str not in booked_times
-            })
+    availability = compute_availability(area_ids, start_date, end_date, tenant.settings,
+                                        granularity, duration)
     
     return jsonify({
         'success': True,
-        'slots': slots
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'granularity': granularity,
+        'duration': duration,
+        'rooms': [{'room_id': area_id, 'days': days} for area_id, days in availability.items()]
     })
@@ -2,25 +2,42 @@
 Authentication Routes
 Handles login, logout, and session management
 """
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, make_response
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app import db
-from app.models import User, Tenant
-from app.utils.decorators import tenant_required
+from app.models import User
 from app.utils.translations import get_translations
+from app.utils.auth import identity_claims
+from app.utils.passwords import HashingBusy
+from app.services.tenancy import current_tenant
 
 bp = Blueprint('auth', __name__, url_prefix='')
 
+@bp.errorhandler(HashingBusy)
+def hashing_busy(error):
+    """Every password hashing slot is taken: ask the client to retry shortly"""
+    message = 'Too many sign-ins at once, please try again'
+    if request.path.startswith('/api/'):
+        response = jsonify({'success': False, 'message': message})
+    else:
+        lang = session.get('language', 'en')
+        t = get_translations(lang, current_tenant().id if current_tenant() else None)
+        response = make_response(render_template('login.html', error=message, t=t, lang=lang))
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
 @bp.route('/', methods=['GET', 'POST'])
 def login():
     """Login page and handler"""
     # Get language preference
     lang = request.args.get('lang', session.get('language', 'en'))
     session['language'] = lang
-    t = get_translations(lang)
+    t = get_translations(lang, current_tenant().id if current_tenant() else None)
     
-    # Get tenant from subdomain or header
-    tenant_id = request.headers.get('X-Tenant-ID') or session.get('tenant_id')
+    # Tenant resolved from subdomain, header or session
+    tenant = current_tenant()
+    tenant_id = tenant.id if tenant else None
     
     if request.method == 'POST':
         username = request.form.get('username')
@@ -41,9 +58,10 @@ def login():
             session['language'] = language
             session['role'] = user.role
             
-            # Update last login
+            # Update last login (and upgrade the hash if settings changed)
             user.last_login = db.func.now()
             user.language_preference = language
+            user.rehash_password_if_needed(password)
             db.session.commit()
             
             # Redirect based on role
@@ -63,7 +81,8 @@ def api_login():
     data = request.get_json()
     username = data.get('username')
     password = data.get('password')
-    tenant_id = request.headers.get('X-Tenant-ID')
+    tenant = current_tenant()
+    tenant_id = tenant.id if tenant else None
     
     if not username or not password:
         return jsonify({'success': False, 'message': 'Missing credentials'}), 400
@@ -75,12 +94,14 @@ def api_login():
     user = query.first()
     
     if user and user.check_password(password):
-        # Create JWT tokens
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        # Create JWT tokens (role/tenant claims let role_required skip the DB)
+        claims = identity_claims(user)
+        access_token = create_access_token(identity=user.id, additional_claims=claims)
+        refresh_token = create_refresh_token(identity=user.id, additional_claims=claims)
         
-        # Update last login
+        # Update last login (and upgrade the hash if settings changed)
         user.last_login = db.func.now()
+        user.rehash_password_if_needed(password)
         db.session.commit()
         
         return jsonify({
@@ -102,8 +123,11 @@ def api_login():
 @jwt_required(refresh=True)
 def api_refresh():
     """Refresh access token"""
-    current_user_id = get_jwt_identity()
-    access_token = create_access_token(identity=current_user_id)
+    # Claims are rebuilt from the database so role changes and deactivation take effect
+    user = User.query.filter_by(id=get_jwt_identity(), is_active=True).first()
+    if not user:
+        return jsonify({'success': False, 'message': 'User not found or inactive'}), 401
+    access_token = create_access_token(identity=user.id, additional_claims=identity_claims(user))
     return jsonify({'access_token': access_token}), 200
 
 @bp.route('/logout')
@@ -122,7 +146,7 @@ def api_logout():
 def register():
     """User registration (for gym members)"""
     lang = request.args.get('lang', session.get('language', 'en'))
-    t = get_translations(lang)
+    t = get_translations(lang, current_tenant().id if current_tenant() else None)
     
     if request.method == 'POST':
         # Get form data
@@ -131,7 +155,8 @@ def register():
         password = request.form.get('password')
         first_name = request.form.get('first_name')
         last_name = request.form.get('last_name')
-        tenant_id = request.headers.get('X-Tenant-ID') or session.get('tenant_id')
+        tenant = current_tenant()
+        tenant_id = tenant.id if tenant else None
         
         # Validate
         if not all([username, password, tenant_id]):
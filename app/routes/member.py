@@ -1,15 +1,35 @@
 """Member/Gym routes - Dashboard and member features"""
-from flask import Blueprint, render_template, session, redirect, url_for, request
-from app import db
-from app.models import User, GymArea, WorkoutProgram, Booking
+from flask import Blueprint, render_template, session, redirect, url_for, request, current_app
 from app.utils.translations import get_translations
 from app.utils.decorators import role_required
-import random
+from app.utils.auth import get_current_user
+from app.services.catalog import catalog_cache
+from app.services.booking_queries import user_bookings, format_booking, bookings_stamp
+from app.services.http_cache import conditional
+from app.services.fragments import fragment_cache
+from app.services.occupancy import occupancy
+from app.services.tenancy import tenants
+from app.services.member_stats import current_streak
+from app.utils.tenant_time import local_today, tenant_zone
 
 bp = Blueprint('member', __name__, url_prefix='/member')
 
+def _dashboard_version():
+    """Member stats, bookings, catalog and live counts behind the dashboard"""
+    user = get_current_user() if session.get('logged_in') else None
+    if not user:
+        return None
+    bookings_modified, bookings = bookings_stamp(user.id)
+    area_ids = [area['id'] for area in catalog_cache.areas(user.tenant_id)]
+    last_modified = max(filter(None, (user.updated_at, bookings_modified)), default=None)
+    lang = request.args.get('lang', session.get('language', 'en'))
+    return (user.updated_at, bookings, bookings_modified, local_today(tenant_zone(tenants.settings(user.tenant_id))),
+            get_translations(lang, user.tenant_id).version,
+            catalog_cache.version(user.tenant_id), sorted(occupancy.counts(area_ids).items())), last_modified
+
 @bp.route('/dashboard')
 @role_required('member', 'admin', 'staff')
+@conditional(_dashboard_version)
 def dashboard():
     """Member dashboard"""
     if not session.get('logged_in'):
@@ -18,103 +38,39 @@ def dashboard():
     # Get language
     lang = request.args.get('lang', session.get('language', 'en'))
     session['language'] = lang
-    t = get_translations(lang)
     
-    # Get current user
-    user_id = session.get('user_id')
-    user = User.query.get(user_id)
+    # Get current user (shared with role_required for this request)
+    user = get_current_user()
     
     if not user:
         return redirect(url_for('auth.login'))
+    t = get_translations(lang, user.tenant_id)
     
-    # Get gym areas for this tenant
-    areas = GymArea.query.filter_by(tenant_id=user.tenant_id).all()
-    
-    # Get workout programs
-    workouts = WorkoutProgram.query.filter_by(tenant_id=user.tenant_id).all()
-    
-    # Get user bookings
-    user_bookings = Booking.query.filter_by(
-        user_id=user.id,
-        status='confirmed'
-    ).order_by(Booking.booking_date.desc(), Booking.start_time.desc()).all()
+    # Most recent bookings, room names joined in the same query
+    rows, _ = user_bookings(user.id, lang=lang, limit=current_app.config['ITEMS_PER_PAGE'])
+    formatted_bookings = [format_booking(row) for row in rows]
     
-    # Format bookings for template
-    formatted_bookings = []
-    for booking in user_bookings:
-        formatted_bookings.append({
-            'id': booking.id,
-            'room_name': booking.gym_area.name_en if lang == 'en' else booking.gym_area.name_el,
-            'date': booking.booking_date.strftime('%Y-%m-%d'),
-            'time': booking.start_time.strftime('%H:%M'),
-            'duration': booking.duration_minutes,
-            'trainer': booking.trainer_name,
-            'price': booking.price
-        })
-    
-    # User stats
+    # User stats, maintained on workout completion
+    zone = tenant_zone(tenants.settings(user.tenant_id))
     stats = {
         'total_workouts': user.total_workouts,
         'calories_burned': user.calories_burned,
-        'streak_days': user.streak_days,
+        'streak_days': current_streak(user.streak_days, user.last_workout_date, local_today(zone)),
         'membership_level': user.membership_level
     }
     
-    # Simulate real-time updates to gym areas
-    for area in areas:
-        if random.random() < 0.1:  # 10% chance to update
-            change = random.randint(-2, 3)
-            area.current_users = max(0, min(area.capacity, area.current_users + change))
-            
-            # Update status based on capacity
-            usage_percent = area.current_users / area.capacity if area.capacity > 0 else 0
-            if usage_percent >= 1.0:
-                area.status = 'Full'
-            elif usage_percent >= 0.8:
-                area.status = 'Busy'
-            elif area.status == 'Maintenance':
-                pass  # Keep maintenance status
-            elif area.status == 'Class in Session':
-                pass  # Keep class status
-            else:
-                area.status = 'Available'
-    
-    db.session.commit()
-    
-    # Format areas for template
-    formatted_areas = []
-    for area in areas:
-        formatted_areas.append({
-            'id': area.id,
-            'name': {'en': area.name_en, 'el': area.name_el},
-            'status': area.status,
-            'capacity': area.capacity,
-            'current_users': area.current_users,
-            'equipment': {'en': area.equipment_en, 'el': area.equipment_el},
-            'icon': area.icon,
-            'color': area.color,
-            'bookable': area.is_bookable,
-            'trainers': {'en': area.trainers_en, 'el': area.trainers_el} if area.is_bookable else None,
-            'price_per_hour': area.price_per_hour
-        })
-    
-    # Format workouts for template
-    formatted_workouts = []
-    for workout in workouts:
-        formatted_workouts.append({
-            'id': workout.id,
-            'name': {'en': workout.name_en, 'el': workout.name_el},
-            'duration': workout.duration,
-            'difficulty': workout.difficulty,
-            'calories': workout.calories,
-            'exercises': workout.exercises,
-            'icon': workout.icon,
-            'color': workout.color
-        })
+    # Tenant-wide sections come from the fragment cache; the areas grid renders live counts
+    # and status per request around the cached parts of each card
+    areas = occupancy.with_live_state(catalog_cache.areas(user.tenant_id))
+    cards = fragment_cache.render_parts(user.tenant_id, 'partials/area_card.html', f'{lang}:{t.version}',
+                                        areas, ('title', 'details'), t=t, lang=lang)
+    workouts_html = fragment_cache.render(user.tenant_id, 'partials/workouts.html', f'{lang}:{t.version}',
+                                          workouts=catalog_cache.workouts(user.tenant_id), t=t, lang=lang)
     
     return render_template('dashboard.html',
-                         areas=formatted_areas,
-                         workouts=formatted_workouts,
+                         areas=areas,
+                         cards=cards,
+                         workouts_html=workouts_html,
                          stats=stats,
                          user_bookings=formatted_bookings,
                          t=t,
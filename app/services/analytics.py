@@ -0,0 +1,354 @@
+"""
+Analytics Rollups
+Hourly and daily booking/workout aggregates per tenant for owner reports
+"""
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import delete, event, func, inspect, select
+
+from app import db
+from app.models import Tenant, GymArea, User, Booking, WorkoutSession, BookingRollup, WorkoutRollup
+from app.services.availability import opening_hours_for
+from app.services.catalog import catalog_cache
+from app.services.tenancy import tenants
+from app.utils.tenant_time import tenant_zone, to_local
+from app.utils.serialization import in_language
+from app.utils.upsert import upsert
+
+# 'hod' rows hold hour-of-day totals per month: bucket_start is the first of
+# the month at that hour. Long-range peak hour reports read these instead
+# of every hourly row.
+GRAINS = ('hour', 'day', 'hod')
+BOOKING_KEYS = ('tenant_id', 'grain', 'bucket_start', 'gym_area_id')
+BOOKING_VALUES = ('bookings', 'cancellations', 'booked_minutes', 'revenue')
+WORKOUT_KEYS = ('tenant_id', 'grain', 'bucket_start', 'workout_program_id')
+WORKOUT_VALUES = ('sessions', 'calories_burned', 'duration_seconds')
+# Booking columns that move a booking between rollup buckets
+BOOKING_FIELDS = ('gym_area_id', 'booking_date', 'start_time', 'duration_minutes', 'price', 'status')
+MAX_REPORT_DAYS = 366
+WRITE_CHUNK = 5000
+
+# Area -> tenant never changes, so lookups are cached for the process
+_area_tenants = {}
+
+
+def _hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _month(moment):
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(moment):
+    return _month(_month(moment) + timedelta(days=32))
+
+
+def _hour_keys(tenant_id, hour, key_id):
+    return ((tenant_id, 'hour', hour, key_id), (tenant_id, 'hod', _month(hour).replace(hour=hour.hour), key_id))
+
+
+def _add(acc, key, values, sign=1):
+    totals = acc.setdefault(key, [0] * len(values))
+    for index, value in enumerate(values):
+        totals[index] += sign * value
+
+
+def add_booking(acc, tenant_id, area_id, booking_date, start_time, duration, price, status, sign=1):
+    """Accumulate one booking into {key: [bookings, cancellations, minutes, revenue]}.
+
+    Counts and revenue land on the start hour; booked minutes are split
+    over every hour the booking covers, up to the end of the day.
+    """
+    day = datetime.combine(booking_date, time.min)
+    start = datetime.combine(booking_date, start_time)
+    if status == 'cancelled':
+        for key in _hour_keys(tenant_id, _hour(start), area_id) + ((tenant_id, 'day', day, area_id),):
+            _add(acc, key, (0, 1, 0, 0.0), sign)
+        return
+
+    duration = duration or 0
+    revenue = float(price or 0)
+    _add(acc, (tenant_id, 'day', day, area_id), (1, 0, duration, revenue), sign)
+    end = min(start + timedelta(minutes=duration), day + timedelta(days=1))
+    hour = _hour(start)
+    first = True
+    while first or hour < end:
+        minutes = int((min(end, hour + timedelta(hours=1)) - max(start, hour)).total_seconds() // 60)
+        for key in _hour_keys(tenant_id, hour, area_id):
+            _add(acc, key, (1, 0, minutes, revenue) if first else (0, 0, minutes, 0.0), sign)
+        hour += timedelta(hours=1)
+        first = False
+
+
+def add_session(acc, tenant_id, program_id, local_start, calories, duration_seconds, sign=1):
+    """Accumulate one completed session into {key: [sessions, calories, seconds]}"""
+    values = (1, calories or 0, duration_seconds or 0)
+    day = datetime.combine(local_start.date(), time.min)
+    for key in _hour_keys(tenant_id, _hour(local_start), program_id or '') + (
+            (tenant_id, 'day', day, program_id or ''),):
+        _add(acc, key, values, sign)
+
+
+def _write(model, keys, value_names, acc, accumulate=True, connection=None):
+    rows = [dict(zip(keys, key), **dict(zip(value_names, values)))
+            for key, values in acc.items()]
+    for start in range(0, len(rows), WRITE_CHUNK):
+        upsert(model.__table__, rows[start:start + WRITE_CHUNK], keys, accumulate, connection)
+
+
+def record_session(tenant_id, program_id, local_start, calories, duration_seconds):
+    """Add a just-completed workout session to the rollups"""
+    acc = {}
+    add_session(acc, tenant_id, program_id, local_start, calories, duration_seconds)
+    _write(WorkoutRollup, WORKOUT_KEYS, WORKOUT_VALUES, acc)
+
+
+# Bookings made through the ORM update the rollups in the same transaction,
+# so a rolled back booking never shows up in reports.
+
+def _area_tenant(connection, area_id):
+    tenant_id = _area_tenants.get(area_id)
+    if tenant_id is None:
+        tenant_id = connection.execute(select(GymArea.tenant_id).where(GymArea.id == area_id)).scalar()
+        if tenant_id is not None:
+            _area_tenants[area_id] = tenant_id
+    return tenant_id
+
+
+def _booking_values(target, previous=False):
+    if not previous:
+        return [getattr(target, field) for field in BOOKING_FIELDS]
+    state = inspect(target)
+    values = []
+    for field in BOOKING_FIELDS:
+        history = state.attrs[field].history
+        values.append(history.deleted[0] if history.deleted else getattr(target, field))
+    return values
+
+
+def _apply_booking(connection, changes):
+    acc = {}
+    for values, sign in changes:
+        area_id = values[0]
+        tenant_id = _area_tenant(connection, area_id)
+        if tenant_id is not None:
+            add_booking(acc, tenant_id, *values, sign=sign)
+    _write(BookingRollup, BOOKING_KEYS, BOOKING_VALUES, acc, connection=connection)
+
+
+@event.listens_for(Booking, 'after_insert')
+def _booking_inserted(mapper, connection, target):
+    _apply_booking(connection, [(_booking_values(target), 1)])
+
+
+@event.listens_for(Booking, 'after_update')
+def _booking_updated(mapper, connection, target):
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in BOOKING_FIELDS):
+        return
+    _apply_booking(connection, [(_booking_values(target, previous=True), -1),
+                                (_booking_values(target), 1)])
+
+
+@event.listens_for(Booking, 'after_delete')
+def _booking_deleted(mapper, connection, target):
+    _apply_booking(connection, [(_booking_values(target, previous=True), -1)])
+
+
+def rebuild(tenant_id=None, date_from=None, date_to=None, batch_size=5000):
+    """Recompute rollups from the raw tables for a tenant-local date range.
+
+    Use after bulk imports or data fixes that bypass the ORM. Without a
+    range every day is rebuilt. The range is widened to whole months so
+    the monthly hour-of-day rows stay exact. Returns the number of
+    tenants rebuilt.
+    """
+    if date_from:
+        date_from = date_from.replace(day=1)
+    if date_to:
+        date_to = _next_month(datetime.combine(date_to, time.min)).date() - timedelta(days=1)
+    tenants = db.session.query(Tenant.id, Tenant.settings)
+    if tenant_id:
+        tenants = tenants.filter(Tenant.id == tenant_id)
+
+    count = 0
+    for tid, settings in tenants.all():
+        zone = tenant_zone(settings)
+        start = datetime.combine(date_from, time.min) if date_from else None
+        end = datetime.combine(date_to + timedelta(days=1), time.min) if date_to else None
+
+        for model in (BookingRollup, WorkoutRollup):
+            stmt = delete(model).where(model.tenant_id == tid)
+            if start:
+                stmt = stmt.where(model.bucket_start >= start)
+            if end:
+                stmt = stmt.where(model.bucket_start < end)
+            db.session.execute(stmt)
+
+        bookings = select(
+            Booking.gym_area_id, Booking.booking_date, Booking.start_time,
+            Booking.duration_minutes, Booking.price, Booking.status
+        ).join(GymArea, GymArea.id == Booking.gym_area_id).where(GymArea.tenant_id == tid)
+        if date_from:
+            bookings = bookings.where(Booking.booking_date >= date_from)
+        if date_to:
+            bookings = bookings.where(Booking.booking_date <= date_to)
+        acc = {}
+        for row in db.session.execute(bookings.execution_options(stream_results=True, yield_per=batch_size)):
+            add_booking(acc, tid, *row)
+        _write(BookingRollup, BOOKING_KEYS, BOOKING_VALUES, acc, accumulate=False)
+
+        # Session times are UTC; widen the range by a day and filter on local time
+        sessions = select(
+            WorkoutSession.workout_program_id, WorkoutSession.start_time,
+            WorkoutSession.calories_burned, WorkoutSession.duration_seconds
+        ).join(User, User.id == WorkoutSession.user_id).where(
+            User.tenant_id == tid, WorkoutSession.status == 'completed'
+        )
+        if start:
+            sessions = sessions.where(WorkoutSession.start_time >= start - timedelta(days=1))
+        if end:
+            sessions = sessions.where(WorkoutSession.start_time < end + timedelta(days=1))
+        acc = {}
+        for program_id, started_at, calories, seconds in db.session.execute(
+                sessions.execution_options(stream_results=True, yield_per=batch_size)):
+            local_start = to_local(started_at, zone)
+            if (start and local_start < start) or (end and local_start >= end):
+                continue
+            add_session(acc, tid, program_id, local_start, calories, seconds)
+        _write(WorkoutRollup, WORKOUT_KEYS, WORKOUT_VALUES, acc, accumulate=False)
+
+        db.session.commit()
+        count += 1
+    return count
+
+
+def tenant_report(tenant_id, date_from, date_to, lang='en'):
+    """Revenue, utilization, popular programs and peak hours for a date range.
+
+    Every figure is read from the rollup tables with range scans on their
+    (tenant, grain, bucket_start) primary keys, never from raw rows.
+    """
+    if date_to < date_from:
+        raise ValueError('to must not be before from')
+    if (date_to - date_from).days >= MAX_REPORT_DAYS:
+        raise ValueError(f'Date range is limited to {MAX_REPORT_DAYS} days')
+
+    start = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to + timedelta(days=1), time.min)
+
+    def booking_rows(grain, *columns, group_by):
+        return db.session.execute(select(
+            *columns,
+            func.sum(BookingRollup.bookings), func.sum(BookingRollup.cancellations),
+            func.sum(BookingRollup.booked_minutes), func.sum(BookingRollup.revenue)
+        ).where(
+            BookingRollup.tenant_id == tenant_id, BookingRollup.grain == grain,
+            BookingRollup.bucket_start >= start, BookingRollup.bucket_start < end
+        ).group_by(group_by)).all()
+
+    def workout_rows(grain, *columns, group_by):
+        return db.session.execute(select(
+            *columns,
+            func.sum(WorkoutRollup.sessions), func.sum(WorkoutRollup.calories_burned),
+            func.sum(WorkoutRollup.duration_seconds)
+        ).where(
+            WorkoutRollup.tenant_id == tenant_id, WorkoutRollup.grain == grain,
+            WorkoutRollup.bucket_start >= start, WorkoutRollup.bucket_start < end
+        ).group_by(group_by)).all()
+
+    # Daily series
+    days = {}
+    day = date_from
+    while day <= date_to:
+        days[day] = {'date': day.isoformat(), 'bookings': 0, 'cancellations': 0,
+                     'revenue': 0.0, 'sessions': 0}
+        day += timedelta(days=1)
+    for bucket, bookings, cancellations, minutes, revenue in booking_rows(
+            'day', BookingRollup.bucket_start, group_by=BookingRollup.bucket_start):
+        days[bucket.date()].update(bookings=bookings, cancellations=cancellations,
+                                   revenue=round(revenue or 0, 2))
+    for bucket, sessions, calories, seconds in workout_rows(
+            'day', WorkoutRollup.bucket_start, group_by=WorkoutRollup.bucket_start):
+        days[bucket.date()]['sessions'] = sessions
+
+    # Utilization: booked minutes over opening minutes in the range
+    settings = tenants.settings(tenant_id)
+    open_minutes = 0
+    for day in days:
+        hours = opening_hours_for(settings, day)
+        if hours:
+            open_minutes += hours[1] - hours[0]
+
+    area_totals = {row[0]: row[1:] for row in booking_rows(
+        'day', BookingRollup.gym_area_id, group_by=BookingRollup.gym_area_id)}
+    areas = []
+    for area in catalog_cache.areas(tenant_id):
+        bookings, cancellations, minutes, revenue = area_totals.get(area['id'], (0, 0, 0, 0.0))
+        areas.append({
+            'id': area['id'],
+            'name': in_language(area['name'], lang),
+            'bookings': bookings,
+            'cancellations': cancellations,
+            'booked_minutes': minutes,
+            'revenue': round(revenue or 0, 2),
+            'utilization_percent': round(minutes / open_minutes * 100, 1) if open_minutes and area['bookable'] else None
+        })
+
+    program_names = {workout['id']: in_language(workout['name'], lang)
+                     for workout in catalog_cache.workouts(tenant_id)}
+    programs = [{
+        'id': program_id or None,
+        'name': program_names.get(program_id),
+        'sessions': sessions,
+        'calories_burned': calories,
+        'duration_minutes': (seconds or 0) // 60
+    } for program_id, sessions, calories, seconds in workout_rows(
+        'day', WorkoutRollup.workout_program_id, group_by=WorkoutRollup.workout_program_id)]
+    programs.sort(key=lambda program: program['sessions'], reverse=True)
+
+    # Peak hours: whole months from the 'hod' rows, partial months from hourly rows
+    first_full = start if start.day == 1 else _next_month(start)
+    last_full = _month(end)
+    if first_full < last_full:
+        spans = [('hod', first_full, last_full), ('hour', start, first_full), ('hour', last_full, end)]
+    else:
+        spans = [('hour', start, end)]
+    hours = {hour: {'hour': hour, 'bookings': 0, 'booked_minutes': 0, 'sessions': 0} for hour in range(24)}
+    for grain, span_start, span_end in spans:
+        if span_start >= span_end:
+            continue
+        hour_of_day = func.extract('hour', BookingRollup.bucket_start).label('hour')
+        for hour, bookings, minutes in db.session.execute(select(
+            hour_of_day, func.sum(BookingRollup.bookings), func.sum(BookingRollup.booked_minutes)
+        ).where(
+            BookingRollup.tenant_id == tenant_id, BookingRollup.grain == grain,
+            BookingRollup.bucket_start >= span_start, BookingRollup.bucket_start < span_end
+        ).group_by(hour_of_day)):
+            hours[int(hour)]['bookings'] += bookings
+            hours[int(hour)]['booked_minutes'] += minutes
+        hour_of_day = func.extract('hour', WorkoutRollup.bucket_start).label('hour')
+        for hour, sessions in db.session.execute(select(
+            hour_of_day, func.sum(WorkoutRollup.sessions)
+        ).where(
+            WorkoutRollup.tenant_id == tenant_id, WorkoutRollup.grain == grain,
+            WorkoutRollup.bucket_start >= span_start, WorkoutRollup.bucket_start < span_end
+        ).group_by(hour_of_day)):
+            hours[int(hour)]['sessions'] += sessions
+
+    series = list(days.values())
+    return {
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'totals': {
+            'bookings': sum(day['bookings'] for day in series),
+            'cancellations': sum(day['cancellations'] for day in series),
+            'revenue': round(sum(day['revenue'] for day in series), 2),
+            'sessions': sum(day['sessions'] for day in series)
+        },
+        'daily': series,
+        'areas': areas,
+        'programs': programs,
+        'peak_hours': list(hours.values())
+    }
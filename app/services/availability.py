@@ -0,0 +1,134 @@
+"""
+Availability Service
+Computes free/occupied booking slots for many gym areas over a date range
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from app.models import Booking
+from app.services.booking_index import time_to_minutes, parse_time, format_minutes
+
+DEFAULT_OPENING_HOURS = '08:00-22:00'
+MAX_RANGE_DAYS = 31
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def parse_hours_range(value):
+    """Parse 'HH:MM-HH:MM' into (open, close) minutes, or None if closed"""
+    if not value:
+        return None
+    opens, closes = [part.strip() for part in value.split('-')]
+    open_min = parse_time(opens)
+    close_min = 24 * 60 if closes in ('00:00', '24:00') else parse_time(closes)
+    return (open_min, close_min) if close_min > open_min else None
+
+
+def opening_hours_for(settings, day):
+    """Return (open, close) minutes for a date from tenant settings.
+
+    `settings['opening_hours']` is either a single 'HH:MM-HH:MM' range used
+    every day, or a dict keyed by weekday ('mon'..'sun') where a missing or
+    empty entry means the gym is closed that day. A malformed entry (not
+    such a string) also counts as closed.
+    """
+    hours = (settings or {}).get('opening_hours', DEFAULT_OPENING_HOURS)
+    if isinstance(hours, dict):
+        hours = hours.get(WEEKDAYS[day.weekday()])
+    try:
+        return parse_hours_range(hours)
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def slots_version(settings, intervals, granularity, now):
+    """What a room's slots for today depend on: opening hours, bookings and slots already started"""
+    hours = opening_hours_for(settings, now.date())
+    started = (now.hour * 60 + now.minute - hours[0]) // granularity if hours else None
+    return now.date(), hours, started, tuple(intervals)
+
+
+def occupancy_mask(intervals, open_min, close_min, granularity):
+    """Build a bitmap with bit i set when slot i overlaps any interval.
+
+    Slot i covers [open + i * granularity, open + (i + 1) * granularity).
+    """
+    slot_count = (close_min - open_min) // granularity
+    mask = 0
+    for start, end in intervals:
+        first = max(0, (start - open_min) // granularity)
+        last = min(slot_count, -(-(end - open_min) // granularity))
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def free_start_mask(occupied, slot_count, slots_needed):
+    """Bitmap of slots where `slots_needed` consecutive free slots begin"""
+    if slots_needed > slot_count:
+        return 0
+    free = ~occupied & ((1 << slot_count) - 1)
+    starts = free
+    for shift in range(1, slots_needed):
+        starts &= free >> shift
+    return starts & ((1 << (slot_count - slots_needed + 1)) - 1)
+
+
+def day_slots(intervals, day, settings, granularity, duration, now=None):
+    """Return the list of {'time', 'available'} slots for one area and date"""
+    hours = opening_hours_for(settings, day)
+    if hours is None:
+        return []
+    open_min, close_min = hours
+    slot_count = (close_min - open_min) // granularity
+    occupied = occupancy_mask(intervals, open_min, close_min, granularity)
+    starts = free_start_mask(occupied, slot_count, -(-duration // granularity))
+
+    # Slots that already started today cannot be booked
+    if now is not None and day == now.date():
+        elapsed = time_to_minutes(now.time()) - open_min
+        if elapsed >= 0:
+            starts &= ~((1 << min(slot_count, elapsed // granularity + 1)) - 1)
+
+    return [{
+        'time': format_minutes(open_min + i * granularity),
+        'available': bool(starts >> i & 1)
+    } for i in range(slot_count)]
+
+
+def load_intervals(area_ids, start_date, end_date):
+    """Fetch confirmed bookings for many areas and days in a single query"""
+    if not area_ids:
+        return {}
+    rows = Booking.query.with_entities(
+        Booking.gym_area_id, Booking.booking_date, Booking.start_time, Booking.duration_minutes
+    ).filter(
+        Booking.gym_area_id.in_(area_ids),
+        Booking.booking_date >= start_date,
+        Booking.booking_date <= end_date,
+        Booking.status == 'confirmed'
+    ).all()
+
+    intervals = defaultdict(list)
+    for area_id, booking_date, start_time, duration in rows:
+        start = time_to_minutes(start_time)
+        intervals[(area_id, booking_date)].append((start, start + duration))
+    return intervals
+
+
+def compute_availability(area_ids, start_date, end_date, settings, granularity,
+                         duration=None, now=None):
+    """Compute slots for every area and every day in [start_date, end_date]"""
+    duration = duration or granularity
+    intervals = load_intervals(area_ids, start_date, end_date)
+    days = [start_date + timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)]
+    now = now or datetime.now()
+
+    return {
+        area_id: [{
+            'date': day.isoformat(),
+            'slots': day_slots(intervals.get((area_id, day), ()), day, settings,
+                               granularity, duration, now)
+        } for day in days]
+        for area_id in area_ids
+    }
@@ -0,0 +1,263 @@
+"""
+Benchmark Suite
+Drives the real app through the Flask test client and reports
+latency percentiles, throughput and query counts per endpoint
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import urlsplit
+import http.client
+import json
+import os
+import random
+import threading
+import time
+
+from sqlalchemy import event
+
+from app import db
+from app.models import Tenant, User, GymArea, Booking
+from app.services.synthetic_data import SYNTHETIC_PASSWORD, SUBDOMAIN_PREFIX
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class BenchmarkRunner:
+    """Runs each scenario `iterations` times against a synthetic tenant"""
+
+    def __init__(self, app, iterations=100, seed=1, subdomain=None):
+        self.app = app
+        self.iterations = iterations
+        self.rng = random.Random(seed)
+        self.subdomain = subdomain or f'{SUBDOMAIN_PREFIX}1'
+        self._statements = 0
+
+    def _count_statement(self, *args):
+        self._statements += 1
+
+    def _fixture(self):
+        with self.app.app_context():
+            tenant = Tenant.query.filter_by(subdomain=self.subdomain).first()
+            if tenant is None:
+                raise RuntimeError(f"No tenant '{self.subdomain}'; run 'flask generate-data' first")
+            member = User.query.filter_by(tenant_id=tenant.id, role='member').order_by(User.username).first()
+            area = GymArea.query.filter_by(tenant_id=tenant.id, is_bookable=True).first()
+            return tenant.id, member.username, area.id if area else None
+
+    def scenarios(self, room_id):
+        """(name, method, path factory, request kwargs factory) per endpoint"""
+        def book_payload():
+            return {'json': {'room_id': room_id, 'duration': 30, 'price': 0,
+                             'time': f'{self.rng.randint(6, 21):02d}:{self.rng.choice([0, 30]):02d}'}}
+
+        scenarios = [
+            ('auth.login', 'post', lambda: '/', lambda: {
+                'data': {'username': self.username, 'password': SYNTHETIC_PASSWORD},
+                'headers': {'X-Tenant-ID': self.tenant_id}}),
+            ('member.dashboard', 'get', lambda: '/member/dashboard', dict),
+            ('api.gym_status', 'get', lambda: '/api/gym-status', dict),
+            ('api.get_user_bookings', 'get', lambda: '/api/user-bookings', dict),
+        ]
+        if room_id:
+            scenarios += [
+                ('api.get_available_slots', 'get', lambda: f'/api/available-slots/{room_id}', dict),
+                ('api.book_room', 'post', lambda: '/api/book-room', book_payload),
+            ]
+        return scenarios
+
+    def run(self):
+        """Return {scenario: stats} for every scenario"""
+        self.tenant_id, self.username, room_id = self._fixture()
+        client = self.app.test_client()
+        client.post('/', data={'username': self.username, 'password': SYNTHETIC_PASSWORD},
+                    headers={'X-Tenant-ID': self.tenant_id})
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._count_statement)
+        try:
+            return {name: self._run_scenario(client, method, path, kwargs)
+                    for name, method, path, kwargs in self.scenarios(room_id)}
+        finally:
+            event.remove(engine, 'before_cursor_execute', self._count_statement)
+
+    def _run_scenario(self, client, method, path, kwargs):
+        call = getattr(client, method)
+        call(path(), **kwargs())  # warm-up, not measured
+
+        latencies, statuses = [], {}
+        self._statements = 0
+        started = time.perf_counter()
+        for _ in range(self.iterations):
+            t0 = time.perf_counter()
+            response = call(path(), **kwargs())
+            latencies.append(time.perf_counter() - t0)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'requests': self.iterations,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'p99_ms': percentile(latencies, 99) * 1000,
+            'throughput_rps': self.iterations / elapsed if elapsed else 0.0,
+            'queries_per_request': self._statements / self.iterations,
+            'statuses': {str(code): count for code, count in sorted(statuses.items())}
+        }
+
+
+def load_baseline(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'created_at': date.today().isoformat(), 'results': results}, f, indent=2)
+
+
+def format_report(results, baseline=None):
+    """Human readable table, with % change against a stored baseline"""
+    previous = (baseline or {}).get('results', {})
+    lines = [f"{'endpoint':28} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'queries':>8}  statuses"]
+    for name, stats in results.items():
+        line = (f"{name:28} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f} "
+                f"{stats['throughput_rps']:9.1f} {stats['queries_per_request']:8.1f}  {stats['statuses']}")
+        base = previous.get(name)
+        if base and base['p95_ms']:
+            change = (stats['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100
+            line += f"  p95 {change:+.1f}% vs baseline"
+            if stats['queries_per_request'] != base['queries_per_request']:
+                line += f", queries {base['queries_per_request']:.1f} -> {stats['queries_per_request']:.1f}"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def http_load(base_url, path, requests=1000, concurrency=32, headers=None):
+    """Drive a running server over HTTP from `concurrency` keep-alive clients"""
+    target = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+    per_client = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def client(count):
+        connection = connection_class(target.netloc, timeout=30)
+        latencies, statuses = [], {}
+        for _ in range(count):
+            t0 = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers or {})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                status = 'error'
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+        connection.close()
+        return latencies, statuses
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, [count for count in per_client if count]))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    statuses = {}
+    for _, client_statuses in results:
+        for status, count in client_statuses.items():
+            statuses[str(status)] = statuses.get(str(status), 0) + count
+    return {
+        'requests': len(latencies),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'statuses': dict(sorted(statuses.items()))
+    }
+
+
+def format_comparison(results):
+    """Side-by-side table of http_load results keyed by (server, path)"""
+    lines = [f"{'server':8} {'path':40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9}  statuses"]
+    for (server, path), stats in results.items():
+        lines.append(f"{server:8} {path:40} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} "
+                     f"{stats['p99_ms']:9.2f} {stats['throughput_rps']:9.1f}  {stats['statuses']}")
+    return '\n'.join(lines)
+
+
+def booking_stress(app, requests=200, subdomain=None, duration=60):
+    """Fire `requests` simultaneous bookings of one free slot through the app.
+
+    Each request runs on its own thread, session and database connection
+    and all are released together by a barrier. Returns the statuses, the
+    latency percentiles and how many confirmed bookings the slot ended up
+    with, which must be exactly one. The bookings made are removed again.
+    """
+    from app.services.booking_index import booking_index, format_minutes
+
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain=subdomain or f'{SUBDOMAIN_PREFIX}1').first()
+        if tenant is None:
+            raise RuntimeError("Tenant not found; run 'flask generate-data' first")
+        area = GymArea.query.filter_by(tenant_id=tenant.id, is_bookable=True).first()
+        members = [user.id for user in User.query.filter_by(tenant_id=tenant.id, role='member')
+                   .order_by(User.username).limit(requests)]
+        if area is None or not members:
+            raise RuntimeError('The tenant needs a bookable area and members')
+        today = date.today()
+        start = next((minute for minute in range(6 * 60, 24 * 60 - duration, 30)
+                      if not booking_index.overlaps(area.id, today, minute, minute + duration)), None)
+        if start is None:
+            raise RuntimeError('No free slot left today in the first bookable area')
+        # Let every request find the slot free, so the database has to settle it
+        booking_index.discard(area.id, today)
+        area_id, slot = area.id, format_minutes(start)
+
+    barrier = threading.Barrier(requests)
+
+    def book(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session.update({'logged_in': True, 'user_id': user_id, 'tenant_id': tenant.id})
+        barrier.wait()
+        t0 = time.perf_counter()
+        response = client.post('/api/book-room', json={'room_id': area_id, 'time': slot,
+                                                       'duration': duration, 'price': 0})
+        return time.perf_counter() - t0, response.status_code, (response.get_json() or {}).get('booking')
+
+    with ThreadPoolExecutor(max_workers=requests) as pool:
+        results = list(pool.map(book, [members[i % len(members)] for i in range(requests)]))
+
+    booking_ids = [created['id'] for _, _, created in results if created]
+    with app.app_context():
+        confirmed = Booking.query.filter_by(gym_area_id=area_id, booking_date=today, status='confirmed').filter(
+            Booking.start_time == datetime.strptime(slot, '%H:%M').time()).count()
+        # ORM deletes, so the booking index and rollups follow
+        for booking in Booking.query.filter(Booking.id.in_(booking_ids)):
+            db.session.delete(booking)
+        db.session.commit()
+
+    latencies = sorted(latency for latency, _, _ in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': requests,
+        'slot': f'{today.isoformat()} {slot} ({duration} min)',
+        'statuses': dict(sorted(statuses.items())),
+        'confirmed_bookings': confirmed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0
+    }
@@ -0,0 +1,310 @@
+"""
+Booking Interval Index
+In-memory overlap detection for confirmed bookings, per gym area and date
+"""
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Booking
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(value):
+    """Convert a datetime.time to minutes since midnight"""
+    return value.hour * 60 + value.minute
+
+
+def parse_time(value):
+    """Parse an 'HH:MM' string into minutes since midnight"""
+    return time_to_minutes(datetime.strptime(value, '%H:%M').time())
+
+
+def ends_by_midnight(start_time, duration_minutes):
+    """Whether a booking stays within its date, as the per-date overlap checks assume"""
+    return time_to_minutes(start_time) + duration_minutes <= MINUTES_PER_DAY
+
+
+def format_minutes(minutes):
+    """Format minutes since midnight as 'HH:MM'"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class IntervalBucket:
+    """Sorted half-open intervals [start, end) for one gym area on one date.
+
+    Intervals are kept ordered by start together with a running maximum of
+    their ends, so an overlap query is a single bisect: the only intervals
+    that can overlap [start, end) are the ones starting before `end`, and
+    one of them overlaps iff the largest end among them is after `start`.
+
+    Adding or removing an interval finds its position by bisection and
+    updates the running maximum only as far as it changes. Confirmed
+    bookings of one area never overlap, so that stops at the next interval.
+    """
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals)
+        self.built_at = time.monotonic()
+        self._by_id = {interval[2]: interval for interval in self.intervals}
+        self.starts = [interval[0] for interval in self.intervals]
+        self.max_ends = []
+        running = None
+        for interval in self.intervals:
+            running = interval[1] if running is None else max(running, interval[1])
+            self.max_ends.append(running)
+
+    def overlaps(self, start, end):
+        """Return True if [start, end) intersects any stored interval"""
+        idx = bisect_left(self.starts, end)
+        return idx > 0 and self.max_ends[idx - 1] > start
+
+    def add(self, start, end, booking_id):
+        interval = (start, end, booking_id)
+        existing = self._by_id.get(booking_id)
+        if existing == interval:
+            return
+        if existing is not None:
+            self.remove(booking_id)
+        idx = bisect_left(self.intervals, interval)
+        self.intervals.insert(idx, interval)
+        self.starts.insert(idx, start)
+        self.max_ends.insert(idx, end if idx == 0 else max(self.max_ends[idx - 1], end))
+        self._by_id[booking_id] = interval
+        # Later maxima only grow, up to the first one already past `end`
+        for later in range(idx + 1, len(self.max_ends)):
+            if self.max_ends[later] >= end:
+                break
+            self.max_ends[later] = end
+
+    def remove(self, booking_id):
+        interval = self._by_id.pop(booking_id, None)
+        if interval is None:
+            return
+        idx = bisect_left(self.intervals, interval)
+        del self.intervals[idx], self.starts[idx], self.max_ends[idx]
+        # Recompute the maxima that may have come from the removed end, until one is unchanged
+        running = self.max_ends[idx - 1] if idx > 0 else None
+        for later in range(idx, len(self.intervals)):
+            end = self.intervals[later][1]
+            running = end if running is None else max(running, end)
+            if self.max_ends[later] == running:
+                break
+            self.max_ends[later] = running
+
+    def __len__(self):
+        return len(self.intervals)
+
+
+class BookingIndex:
+    """Process-local index of confirmed bookings keyed by (gym_area_id, date).
+
+    Buckets are built lazily with one query the first time an area/date is
+    looked at, kept in sync with bookings committed through this process via
+    SQLAlchemy events, and rebuilt after BOOKING_INDEX_TTL seconds so that
+    bookings written by other workers are picked up.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.max_buckets = 10000
+        self._buckets = OrderedDict()
+        self._lock = threading.RLock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('BOOKING_INDEX_TTL', self.ttl)
+        self.max_buckets = app.config.get('BOOKING_INDEX_MAX_BUCKETS', self.max_buckets)
+        app.extensions['booking_index'] = self
+
+    @staticmethod
+    def bucket_query(gym_area_id, booking_date):
+        """Confirmed bookings of one area and date, as one SELECT"""
+        return select(Booking.id, Booking.start_time, Booking.duration_minutes).where(
+            Booking.gym_area_id == gym_area_id,
+            Booking.booking_date == booking_date,
+            Booking.status == 'confirmed'
+        )
+
+    @staticmethod
+    def build(rows):
+        """IntervalBucket from bucket_query rows"""
+        return IntervalBucket(
+            (time_to_minutes(start), time_to_minutes(start) + duration, booking_id)
+            for booking_id, start, duration in rows
+        )
+
+    def bucket(self, gym_area_id, booking_date):
+        """Return the (possibly freshly built) bucket for an area and date"""
+        bucket = self.cached(gym_area_id, booking_date)
+        if bucket is None:
+            bucket = self.store(gym_area_id, booking_date, self.build(
+                db.session.execute(self.bucket_query(gym_area_id, booking_date))))
+        return bucket
+
+    def prefetch(self, keys):
+        """Build the missing buckets for many (gym_area_id, date) keys with one query"""
+        missing = {key for key in keys if self.cached(*key) is None}
+        if not missing:
+            return
+        rows = {key: [] for key in missing}
+        result = db.session.execute(
+            select(Booking.gym_area_id, Booking.booking_date,
+                   Booking.id, Booking.start_time, Booking.duration_minutes).where(
+                Booking.gym_area_id.in_({area_id for area_id, _ in missing}),
+                Booking.booking_date.in_({booking_date for _, booking_date in missing}),
+                Booking.status == 'confirmed'
+            )
+        )
+        for area_id, booking_date, *row in result:
+            if (area_id, booking_date) in rows:
+                rows[(area_id, booking_date)].append(row)
+        for key, bucket_rows in rows.items():
+            self.store(*key, self.build(bucket_rows))
+
+    def cached(self, gym_area_id, booking_date):
+        """The bucket for an area and date if built within the TTL, else None"""
+        key = (gym_area_id, booking_date)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and time.monotonic() - bucket.built_at < self.ttl:
+                self._buckets.move_to_end(key)
+                return bucket
+        return None
+
+    def store(self, gym_area_id, booking_date, bucket):
+        key = (gym_area_id, booking_date)
+        with self._lock:
+            self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return bucket
+
+    def has_conflict(self, gym_area_id, booking_date, start_time, duration_minutes):
+        """Check whether [start_time, start_time + duration) overlaps a confirmed booking"""
+        start = time_to_minutes(start_time)
+        return self.overlaps(gym_area_id, booking_date, start, start + duration_minutes)
+
+    def overlaps(self, gym_area_id, booking_date, start, end):
+        """Overlap check with start/end given in minutes since midnight"""
+        bucket = self.bucket(gym_area_id, booking_date)
+        with self._lock:
+            return bucket.overlaps(start, end)
+
+    def add(self, gym_area_id, booking_date, start, end, booking_id):
+        with self._lock:
+            bucket = self._buckets.get((gym_area_id, booking_date))
+            if bucket is not None:
+                bucket.add(start, end, booking_id)
+
+    def remove(self, gym_area_id, booking_date, booking_id):
+        with self._lock:
+            bucket = self._buckets.get((gym_area_id, booking_date))
+            if bucket is not None:
+                bucket.remove(booking_id)
+
+    def discard(self, gym_area_id, booking_date):
+        """Drop one bucket so the next lookup rebuilds it from the database"""
+        with self._lock:
+            self._buckets.pop((gym_area_id, booking_date), None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+booking_index = BookingIndex()
+
+
+# Keep the index in sync with committed bookings. Changes are collected
+# while the session flushes and only applied once the transaction commits,
+# so a rolled back booking never shows up in the index.
+
+def _interval_state(booking, use_history):
+    """Return (gym_area_id, date, start, end, status) before or after a flush"""
+    state = inspect(booking)
+    values = {}
+    for attr in ('gym_area_id', 'booking_date', 'start_time', 'duration_minutes', 'status'):
+        history = state.attrs[attr].history
+        if use_history and history.deleted:
+            values[attr] = history.deleted[0]
+        else:
+            values[attr] = getattr(booking, attr)
+    start = time_to_minutes(values['start_time'])
+    return (values['gym_area_id'], values['booking_date'], start,
+            start + values['duration_minutes'], values['status'])
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    """No-op; registered only for its active_history flag"""
+
+
+# The old interval is needed to drop a booking from its bucket; without
+# active history an attribute set while expired (after a commit or
+# rollback) would not record the value it replaced.
+for _attr in ('gym_area_id', 'booking_date', 'start_time', 'duration_minutes', 'status'):
+    event.listen(getattr(Booking, _attr), 'set', _keep_old_value, active_history=True)
+
+
+def _pending(target):
+    session = Session.object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault('booking_index_pending', [])
+
+
+@event.listens_for(Booking, 'after_insert')
+def _booking_inserted(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    area_id, booking_date, start, end, status = _interval_state(target, use_history=False)
+    if status == 'confirmed':
+        pending.append(('add', area_id, booking_date, start, end, target.id))
+
+
+@event.listens_for(Booking, 'after_update')
+def _booking_updated(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    old = _interval_state(target, use_history=True)
+    new = _interval_state(target, use_history=False)
+    if old == new:
+        return
+    if old[4] == 'confirmed':
+        pending.append(('remove', old[0], old[1], target.id))
+    if new[4] == 'confirmed':
+        pending.append(('add', new[0], new[1], new[2], new[3], target.id))
+
+
+@event.listens_for(Booking, 'after_delete')
+def _booking_deleted(mapper, connection, target):
+    pending = _pending(target)
+    if pending is None:
+        return
+    old = _interval_state(target, use_history=True)
+    pending.append(('remove', old[0], old[1], target.id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_pending(session):
+    for operation in session.info.pop('booking_index_pending', []):
+        if operation[0] == 'add':
+            booking_index.add(*operation[1:])
+        else:
+            booking_index.remove(*operation[1:])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop('booking_index_pending', None)
@@ -0,0 +1,90 @@
+"""
+Booking Queries
+Shared, N+1-free booking listings with date filters and keyset pagination
+"""
+import base64
+from datetime import date, time
+
+from sqlalchemy import or_, and_, func
+
+from app import db
+from app.models import Booking, GymArea
+from app.utils.serialization import Schema, localized
+
+BOOKING_SCHEMA = Schema(
+    id=Booking.id,
+    room_id=Booking.gym_area_id,
+    room_name=localized(GymArea, 'name', key=Booking.gym_area_id),
+    date=Booking.booking_date,
+    time=Booking.start_time,
+    duration=Booking.duration_minutes,
+    trainer=Booking.trainer_name,
+    price=Booking.price
+)
+
+
+def encode_cursor(booking_date, start_time, booking_id):
+    raw = f"{booking_date.isoformat()}|{start_time.strftime('%H:%M:%S')}|{booking_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor into (date, time, id); raises ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        booking_date, start_time, booking_id = raw.split('|', 2)
+        return date.fromisoformat(booking_date), time.fromisoformat(start_time), booking_id
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def user_bookings(user_id, lang='en', status='confirmed', date_from=None, date_to=None,
+                  limit=20, cursor=None):
+    """Return (rows, next_cursor) for a user's bookings, newest first.
+
+    Rows are plain tuples of BOOKING_SCHEMA columns from a single query
+    that joins only the room name in `lang`, so no GymArea objects (or
+    rows) are loaded.
+    """
+    query = BOOKING_SCHEMA.join(db.session.query(*BOOKING_SCHEMA.columns(lang)), lang).filter(
+        Booking.user_id == user_id,
+        Booking.status == status
+    )
+
+    if date_from:
+        query = query.filter(Booking.booking_date >= date_from)
+    if date_to:
+        query = query.filter(Booking.booking_date <= date_to)
+
+    if cursor:
+        last_date, last_time, last_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Booking.booking_date < last_date,
+            and_(Booking.booking_date == last_date, Booking.start_time < last_time),
+            and_(Booking.booking_date == last_date, Booking.start_time == last_time,
+                 Booking.id < last_id)
+        ))
+
+    rows = query.order_by(
+        Booking.booking_date.desc(), Booking.start_time.desc(), Booking.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date, last.time, last.id)
+    return rows, next_cursor
+
+
+def bookings_stamp(user_id):
+    """(newest updated_at, count) of a user's bookings, for HTTP validators"""
+    return db.session.query(func.max(Booking.updated_at), func.count(Booking.id)).filter(
+        Booking.user_id == user_id
+    ).one()
+
+
+def format_booking(row):
+    """Template/API representation of a user_bookings row"""
+    # Rows carry one room name column whatever the language, so one serializer fits all
+    return BOOKING_SCHEMA.dump(row, 'en')
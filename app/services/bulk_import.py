@@ -0,0 +1,340 @@
+"""
+Bulk Import Service
+Streams member and booking rosters from CSV/JSONL into the database in chunks
+"""
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from datetime import datetime, date
+import io
+import json
+import uuid
+
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from app import db
+from app.models import User, GymArea, Booking
+from app.services.analytics import rebuild
+from app.services.booking_index import booking_index, IntervalBucket, ends_by_midnight, time_to_minutes
+from app.services.reservations import is_overlap_error
+from app.utils.passwords import passwords, HASHERS
+
+MEMBER_ROLES = ('member', 'staff')
+BOOKING_STATUSES = ('confirmed', 'cancelled', 'completed')
+MAX_REPORTED_ERRORS = 100
+
+
+class InvalidRecord:
+    """A line that could not be read as a record; the importers report it as an error"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+def read_records(stream, fmt=None):
+    """Yield (line number, dict or InvalidRecord) from a CSV or JSON Lines stream"""
+    fmt = fmt or ('jsonl' if getattr(stream, 'name', '').endswith(('.jsonl', '.json')) else 'csv')
+    if fmt == 'jsonl':
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, InvalidRecord(f'invalid JSON: {e.msg}')
+                continue
+            if not isinstance(record, dict):
+                yield line_no, InvalidRecord('expected a JSON object')
+                continue
+            yield line_no, record
+    else:
+        # Line 1 is the header row
+        for line_no, row in enumerate(csv.DictReader(stream), start=2):
+            yield line_no, {key: (value.strip() or None) if isinstance(value, str) else value
+                            for key, value in row.items()}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def is_integrity_error(error):
+    """Whether a write broke a constraint (SQLAlchemy's error, or the driver's own from COPY)"""
+    if isinstance(error, IntegrityError):
+        return True
+    orig = getattr(error, 'orig', error)
+    return str(getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None) or '').startswith('23')
+
+
+def _hash_password(args):
+    """Process pool worker: hash one password with the given hasher settings"""
+    name, params, password = args
+    return HASHERS[name](**params).hash(password)
+
+
+def _copy_value(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def write_rows(table, rows):
+    """Insert plain dict rows: COPY FROM STDIN on PostgreSQL, executemany elsewhere"""
+    if not rows:
+        return
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        columns = list(rows[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+    else:
+        connection.execute(insert(table), rows)
+
+
+class ImportResult:
+    """Counts and the first errors of an import run"""
+
+    def __init__(self):
+        self.inserted = 0
+        self.skipped = 0
+        self.errors = []
+
+    def error(self, line_no, message, rows=1):
+        self.skipped += rows
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, message))
+
+
+class BulkImporter:
+    """Validates records a chunk at a time and writes each chunk in one batch.
+
+    Each chunk is committed on its own, so memory stays flat and a bad row
+    only skips that row. With `dry_run` nothing is written.
+    """
+
+    def __init__(self, tenant, chunk_size=1000, workers=None, dry_run=False):
+        self.tenant = tenant
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.dry_run = dry_run
+
+    def import_members(self, records, default_password=None):
+        result = ImportResult()
+        seen_usernames, seen_emails = set(), set()
+        hasher = (passwords.hasher.name, passwords.hash_params)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in chunked(records, self.chunk_size):
+                chunk = self._readable(chunk, result)
+                usernames = [record.get('username') for _, record in chunk if record.get('username')]
+                emails = [record.get('email') for _, record in chunk if record.get('email')]
+                existing = {row[0] for row in db.session.query(User.username).filter(
+                    User.tenant_id == self.tenant.id, User.username.in_(usernames))}
+                existing_emails = {row[0] for row in db.session.query(User.email).filter(
+                    User.tenant_id == self.tenant.id, User.email.in_(emails))}
+
+                valid, plain_passwords = [], []
+                for line_no, record in chunk:
+                    username = record.get('username')
+                    email = record.get('email')
+                    role = record.get('role') or 'member'
+                    password = record.get('password') or default_password
+                    if not username:
+                        result.error(line_no, 'username is required')
+                    elif username in existing or username in seen_usernames:
+                        result.error(line_no, f"username '{username}' already exists")
+                    elif email and (email in existing_emails or email in seen_emails):
+                        result.error(line_no, f"email '{email}' already exists")
+                    elif role not in MEMBER_ROLES:
+                        result.error(line_no, f"invalid role '{role}'")
+                    elif not password:
+                        result.error(line_no, 'password is required (or pass --default-password)')
+                    else:
+                        seen_usernames.add(username)
+                        if email:
+                            seen_emails.add(email)
+                        valid.append((username, email, role, record))
+                        plain_passwords.append(password)
+
+                hashes = list(pool.map(_hash_password,
+                                       [hasher + (password,) for password in plain_passwords],
+                                       chunksize=max(1, len(plain_passwords) // 32)))
+                now = datetime.utcnow()
+                rows = [{
+                    'id': str(uuid.uuid4()),
+                    'tenant_id': self.tenant.id,
+                    'username': username,
+                    'email': email,
+                    'password_hash': password_hash,
+                    'member_id': record.get('member_id'),
+                    'role': role,
+                    'first_name': record.get('first_name'),
+                    'last_name': record.get('last_name'),
+                    'phone': record.get('phone'),
+                    'photo_url': None,
+                    'total_workouts': 0,
+                    'calories_burned': 0,
+                    'streak_days': 0,
+                    'membership_level': record.get('membership_level') or 'Basic',
+                    'is_active': True,
+                    'language_preference': record.get('language_preference') or 'en',
+                    'created_at': now,
+                    'updated_at': now,
+                    'last_login': None
+                } for (username, email, role, record), password_hash in zip(valid, hashes)]
+                try:
+                    self._write(User.__table__, rows, result)
+                except Exception as e:  # DBAPIError, or the driver's own error from COPY
+                    # A user written since the chunk was checked, or another constraint
+                    db.session.rollback()
+                    if not is_integrity_error(e):
+                        raise
+                    result.error(chunk[0][0], f'{len(rows)} rows from this line on not written: '
+                                              'a username or email is already taken', rows=len(rows))
+                    seen_usernames.difference_update(row['username'] for row in rows)
+                    seen_emails.difference_update(row['email'] for row in rows)
+        return result
+
+    def import_bookings(self, records, check_overlaps=True):
+        result = ImportResult()
+        # Rooms by id or by name in any configured language
+        areas = {}
+        for area in GymArea.query.options(selectinload(GymArea.texts)).filter_by(tenant_id=self.tenant.id).all():
+            areas[area.id] = area
+            for lang in current_app.config.get('LANGUAGES', ['en']):
+                name = area.text('name', lang)
+                if name:
+                    areas.setdefault(name, area)
+        # Confirmed intervals per (area, date), existing bookings plus imported rows
+        buckets = {}
+        # (area, date) of every written row, whose index buckets are out of date afterwards
+        written = set()
+        first_day = last_day = None
+
+        for chunk in chunked(records, self.chunk_size):
+            chunk = self._readable(chunk, result)
+            usernames = {record.get('username') for _, record in chunk if record.get('username')}
+            given_ids = {record.get('user_id') for _, record in chunk if record.get('user_id')}
+            users = dict(db.session.query(User.username, User.id).filter(
+                User.tenant_id == self.tenant.id, User.username.in_(usernames)))
+            user_ids = {row[0] for row in db.session.query(User.id).filter(
+                User.tenant_id == self.tenant.id, User.id.in_(given_ids))}
+
+            rows = []
+            now = datetime.utcnow()
+            for line_no, record in chunk:
+                if record.get('username'):
+                    user_id = users.get(record['username'])
+                else:
+                    user_id = record.get('user_id') if record.get('user_id') in user_ids else None
+                area = areas.get(record.get('room_id')) or areas.get(record.get('room_name'))
+                status = record.get('status') or 'confirmed'
+                try:
+                    booking_date = date.fromisoformat(record['date'])
+                    start_time = datetime.strptime(record['time'], '%H:%M').time()
+                    duration = int(record['duration'])
+                    price = float(record['price']) if record.get('price') not in (None, '') else None
+                except (KeyError, TypeError, ValueError):
+                    result.error(line_no, 'date (YYYY-MM-DD), time (HH:MM), duration and price must be valid')
+                    continue
+
+                if not user_id:
+                    result.error(line_no, 'unknown user')
+                    continue
+                if area is None:
+                    result.error(line_no, 'unknown room')
+                    continue
+                if duration <= 0 or not ends_by_midnight(start_time, duration) or status not in BOOKING_STATUSES:
+                    result.error(line_no, 'invalid duration (bookings end by midnight) or status')
+                    continue
+                if price is None:
+                    price = (area.price_per_hour or 0) * duration / 60
+
+                if check_overlaps and status == 'confirmed':
+                    key = (area.id, booking_date)
+                    if key not in buckets:
+                        buckets[key] = IntervalBucket(booking_index.bucket(area.id, booking_date).intervals)
+                    start = time_to_minutes(start_time)
+                    if buckets[key].overlaps(start, start + duration):
+                        result.error(line_no, 'overlaps an existing booking')
+                        continue
+                    booking_id = str(uuid.uuid4())
+                    buckets[key].add(start, start + duration, booking_id)
+                else:
+                    booking_id = str(uuid.uuid4())
+
+                first_day = min(first_day or booking_date, booking_date)
+                last_day = max(last_day or booking_date, booking_date)
+                rows.append({
+                    'id': booking_id,
+                    'user_id': user_id,
+                    'gym_area_id': area.id,
+                    'booking_date': booking_date,
+                    'start_time': start_time,
+                    'duration_minutes': duration,
+                    'trainer_name': record.get('trainer'),
+                    'price': price,
+                    'status': status,
+                    'created_at': now,
+                    'updated_at': now
+                })
+            keys = {(row['gym_area_id'], row['booking_date']) for row in rows}
+            try:
+                self._write(Booking.__table__, rows, result)
+            except Exception as e:  # DBAPIError, or the driver's own error from COPY
+                # Without the overlap check (or against a concurrent booking) the database has the last word
+                db.session.rollback()
+                if not is_overlap_error(e):
+                    raise
+                result.error(chunk[0][0], f'{len(rows)} rows from this line on not written: '
+                                          'a confirmed booking overlaps another', rows=len(rows))
+                # Drop the rolled back rows' intervals; the buckets are rebuilt from the database
+                for key in keys:
+                    buckets.pop(key, None)
+                    booking_index.discard(*key)
+            else:
+                written |= keys
+
+        # Bulk writes bypass the ORM events that keep the index and rollups in sync
+        for key in written:
+            booking_index.discard(*key)
+        if first_day and not self.dry_run:
+            rebuild(self.tenant.id, first_day, last_day)
+        return result
+
+    @staticmethod
+    def _readable(chunk, result):
+        """Records of a chunk, reporting the lines that could not be read"""
+        readable = []
+        for line_no, record in chunk:
+            if isinstance(record, InvalidRecord):
+                result.error(line_no, record.message)
+            else:
+                readable.append((line_no, record))
+        return readable
+
+    def _write(self, table, rows, result):
+        if self.dry_run:
+            result.inserted += len(rows)
+            return
+        write_rows(table, rows)
+        db.session.commit()
+        result.inserted += len(rows)
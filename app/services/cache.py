@@ -0,0 +1,189 @@
+"""
+Cache Backends
+Small key/value caches with TTL used by the service layer
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry TTL (one copy per worker)"""
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileSystemCache:
+    """JSON-file cache in a directory shared by all workers on a host.
+
+    Entries whose key went out of use (e.g. an older catalog version) are
+    never read again, so every set has a SWEEP_PROBABILITY chance to sweep
+    the directory: expired entries are deleted and, past `max_entries`,
+    the least recently written ones.
+    """
+
+    SWEEP_PROBABILITY = 1 / 64
+
+    def __init__(self, cache_dir, default_ttl=300, max_entries=1024):
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, key):
+        try:
+            entry = self._read(self._path(key))
+        except (OSError, ValueError):
+            return None
+        if entry['expires_at'] is not None and entry['expires_at'] <= time.time():
+            self.delete(key)
+            return None
+        return entry['value']
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        entry = {'expires_at': time.time() + ttl if ttl else None, 'value': value}
+        # Write to a temp file and rename so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+        if random.random() < self.SWEEP_PROBABILITY:
+            self.sweep()
+
+    def _entries(self):
+        """(mtime, path) of every entry file, oldest first"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                # Entry files are named by their key's sha1; skip temp files and subdirectories
+                if len(item.name) == 40 and item.is_file():
+                    try:
+                        entries.append((item.stat().st_mtime, item.path))
+                    except OSError:
+                        pass
+        entries.sort()
+        return entries
+
+    def sweep(self):
+        """Delete expired entries, then the oldest ones beyond max_entries; returns how many"""
+        now = time.time()
+        kept, removed = [], 0
+        for mtime, path in self._entries():
+            try:
+                expires_at = self._read(path)['expires_at']
+            except (OSError, ValueError, KeyError, TypeError):
+                expires_at = now  # unreadable: drop it
+            if expires_at is not None and expires_at <= now:
+                removed += self._remove(path)
+            else:
+                kept.append(path)
+        for path in kept[:max(0, len(kept) - self.max_entries)]:
+            removed += self._remove(path)
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return 1
+        except OSError:
+            return 0
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+
+
+class RedisCache:
+    """Redis-backed cache shared by all workers and hosts (requires `redis`)"""
+
+    def __init__(self, url, default_ttl=300, prefix='gym:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RedisCache requires the redis package (pip install redis)')
+        self.client = redis.Redis.from_url(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def create_cache(backend, default_ttl=300, max_entries=1024, cache_dir=None, redis_url=None):
+    """Build a cache backend from its configuration name"""
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    if backend == 'filesystem':
+        return FileSystemCache(cache_dir, default_ttl=default_ttl, max_entries=max_entries)
+    if backend == 'redis':
+        return RedisCache(redis_url, default_ttl=default_ttl)
+    raise ValueError(f'Unknown cache backend: {backend}')
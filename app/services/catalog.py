@@ -0,0 +1,227 @@
+"""
+Catalog Cache
+Tenant-scoped read-through cache for gym areas and workout programs
+"""
+import threading
+import uuid
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import GymArea, WorkoutProgram, LocalizedText
+from app.services.cache import create_cache
+from app.utils.serialization import Schema, localized
+
+# Columns written by occupancy snapshots and not part of the catalog
+LIVE_AREA_COLUMNS = {'current_users', 'updated_at'}
+
+
+def serialize_area(area):
+    """Static, language-complete representation of a gym area"""
+    return {
+        'id': area.id,
+        'name': area.localized('name'),
+        'capacity': area.capacity,
+        'status': area.status,
+        'equipment': area.localized('equipment'),
+        'icon': area.icon,
+        'color': area.color,
+        'bookable': area.is_bookable,
+        'trainers': area.localized('trainers') if area.is_bookable else None,
+        'price_per_hour': area.price_per_hour
+    }
+
+
+def serialize_workout(workout):
+    """Static, language-complete representation of a workout program"""
+    return {
+        'id': workout.id,
+        'name': workout.localized('name'),
+        'duration': workout.duration,
+        'difficulty': workout.difficulty,
+        'calories': workout.calories,
+        'exercises': workout.exercises,
+        'icon': workout.icon,
+        'color': workout.color
+    }
+
+
+# Single-language API listings; JSON columns can be passed through as raw text
+AREA_SCHEMA = Schema(
+    id=GymArea.id,
+    name=localized(GymArea, 'name'),
+    description=localized(GymArea, 'description'),
+    capacity=GymArea.capacity,
+    status=GymArea.status,
+    equipment=localized(GymArea, 'equipment'),
+    icon=GymArea.icon,
+    color=GymArea.color,
+    bookable=GymArea.is_bookable,
+    trainers=localized(GymArea, 'trainers'),
+    price_per_hour=GymArea.price_per_hour
+)
+
+WORKOUT_SCHEMA = Schema(
+    id=WorkoutProgram.id,
+    name=localized(WorkoutProgram, 'name'),
+    description=localized(WorkoutProgram, 'description'),
+    duration=WorkoutProgram.duration,
+    difficulty=WorkoutProgram.difficulty,
+    calories=WorkoutProgram.calories,
+    exercises=WorkoutProgram.exercises,
+    icon=WorkoutProgram.icon,
+    color=WorkoutProgram.color
+)
+
+
+class CatalogCache:
+    """Caches serialized catalogs per tenant under a version token.
+
+    Entries are stored as `catalog:<tenant>:<version>:<name>`. Any committed
+    change to a tenant's areas or programs replaces the tenant's version
+    token in the backend, and entries under the old token age out. With
+    the filesystem or redis backend every worker sees the new token at
+    once; with the memory backend only the worker that committed does,
+    and the others serve their entries until CATALOG_CACHE_TTL expires.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 300
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', self.ttl)
+        self.backend = create_cache(
+            app.config.get('CATALOG_CACHE_BACKEND', 'memory'),
+            default_ttl=self.ttl,
+            max_entries=app.config.get('CATALOG_CACHE_MAX_ENTRIES', 1024),
+            cache_dir=app.config.get('CATALOG_CACHE_DIR'),
+            redis_url=app.config.get('CATALOG_CACHE_REDIS_URL')
+        )
+        app.extensions['catalog_cache'] = self
+
+    def version(self, tenant_id):
+        """Token that changes whenever the tenant's catalog changes"""
+        key = f'catalog:{tenant_id}:version'
+        version = self.backend.get(key)
+        if version is None:
+            version = uuid.uuid4().hex
+            self.backend.set(key, version, ttl=0)
+        return version
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get_or_load(self, tenant_id, name, loader):
+        """Return the cached value for `name`, calling `loader()` on a miss"""
+        value = self.cached(tenant_id, name)
+        if value is None:
+            value = loader()
+            self.store(tenant_id, name, value)
+        return value
+
+    def cached(self, tenant_id, name):
+        """Cached value for `name`, or None on a miss"""
+        value = self.backend.get(f'catalog:{tenant_id}:{self.version(tenant_id)}:{name}')
+        self._count(value is not None)
+        return value
+
+    def store(self, tenant_id, name, value):
+        self.backend.set(f'catalog:{tenant_id}:{self.version(tenant_id)}:{name}', value, ttl=self.ttl)
+
+    def areas(self, tenant_id):
+        """Serialized gym areas for a tenant"""
+        return self.get_or_load(tenant_id, 'areas', lambda: [
+            serialize_area(area) for area in GymArea.query.options(selectinload(GymArea.texts))
+            .filter_by(tenant_id=tenant_id).all()
+        ])
+
+    def workouts(self, tenant_id):
+        """Serialized workout programs for a tenant"""
+        return self.get_or_load(tenant_id, 'workouts', lambda: [
+            serialize_workout(workout)
+            for workout in WorkoutProgram.query.options(selectinload(WorkoutProgram.texts))
+            .filter_by(tenant_id=tenant_id).all()
+        ])
+
+    def invalidate(self, tenant_id):
+        """Drop every cached catalog entry for a tenant"""
+        self.backend.set(f'catalog:{tenant_id}:version', uuid.uuid4().hex, ttl=0)
+        with self._lock:
+            self._invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations
+            }
+
+    def prometheus_lines(self):
+        """Cache counters for the /metrics endpoint"""
+        lines = []
+        for name, value in self.stats().items():
+            lines += [f'# TYPE gym_catalog_cache_{name}_total counter',
+                      f'gym_catalog_cache_{name}_total {value}']
+        return lines
+
+
+catalog_cache = CatalogCache()
+
+
+# Invalidate on committed catalog changes. Tenants touched during a flush
+# are remembered on the session and their version bumped after commit.
+
+def _mark_dirty(target, ignore=()):
+    session = Session.object_session(target)
+    if session is None:
+        return
+    if ignore:
+        state = inspect(target)
+        changed = {column.key for column in state.mapper.column_attrs
+                   if state.attrs[column.key].history.has_changes()}
+        if not changed - set(ignore):
+            return
+    session.info.setdefault('catalog_dirty', set()).add(target.tenant_id)
+
+
+@event.listens_for(GymArea, 'after_insert')
+@event.listens_for(GymArea, 'after_delete')
+@event.listens_for(WorkoutProgram, 'after_insert')
+@event.listens_for(WorkoutProgram, 'after_update')
+@event.listens_for(WorkoutProgram, 'after_delete')
+@event.listens_for(LocalizedText, 'after_insert')
+@event.listens_for(LocalizedText, 'after_update')
+@event.listens_for(LocalizedText, 'after_delete')
+def _catalog_changed(mapper, connection, target):
+    _mark_dirty(target)
+
+
+@event.listens_for(GymArea, 'after_update')
+def _area_updated(mapper, connection, target):
+    _mark_dirty(target, ignore=LIVE_AREA_COLUMNS)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_dirty(session):
+    if catalog_cache.backend is None:
+        session.info.pop('catalog_dirty', None)
+        return
+    for tenant_id in session.info.pop('catalog_dirty', ()):
+        catalog_cache.invalidate(tenant_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty(session):
+    session.info.pop('catalog_dirty', None)
@@ -0,0 +1,114 @@
+"""
+Database Tuning
+SQLite connection PRAGMAs and connection pool wait metrics
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from flask import has_app_context
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app import db
+from app.services.metrics import Histogram
+
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            database.record_timeout()
+            raise
+        finally:
+            database.record_wait(time.perf_counter() - started)
+
+
+class DatabaseTuning:
+    """Applies engine settings that SQLALCHEMY_ENGINE_OPTIONS cannot express.
+
+    `init_app` must run before `db.init_app`, so the timed pool class is in
+    place when Flask-SQLAlchemy creates the engine.
+    """
+
+    def __init__(self, app=None):
+        self.pragmas = []
+        self._lock = threading.Lock()
+        self._wait = Histogram(POOL_WAIT_BUCKETS)
+        self._timeouts = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        # In-memory SQLite gets a StaticPool from Flask-SQLAlchemy
+        if 'pool_size' in options:
+            options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+        self.pragmas = [
+            ('journal_mode', app.config.get('SQLITE_JOURNAL_MODE')),
+            ('synchronous', app.config.get('SQLITE_SYNCHRONOUS')),
+            ('mmap_size', app.config.get('SQLITE_MMAP_SIZE')),
+            ('busy_timeout', app.config.get('SQLITE_BUSY_TIMEOUT_MS')),
+        ]
+        app.extensions['database_tuning'] = self
+
+    def apply_pragmas(self, dbapi_connection):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas:
+                if value not in (None, ''):
+                    cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self._wait.observe(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def prometheus_lines(self):
+        """Pool checkout waits and current pool usage for the /metrics endpoint"""
+        pid = os.getpid()
+        lines = ['# HELP gym_db_pool_checkout_wait_seconds Time spent waiting for a pooled connection',
+                 '# TYPE gym_db_pool_checkout_wait_seconds histogram']
+        with self._lock:
+            hist = self._wait
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'gym_db_pool_checkout_wait_seconds_bucket{{pid="{pid}",le="{bound}"}} {count}')
+            lines += [f'gym_db_pool_checkout_wait_seconds_bucket{{pid="{pid}",le="+Inf"}} {hist.count}',
+                      f'gym_db_pool_checkout_wait_seconds_sum{{pid="{pid}"}} {hist.total:.6f}',
+                      f'gym_db_pool_checkout_wait_seconds_count{{pid="{pid}"}} {hist.count}',
+                      '# TYPE gym_db_pool_checkout_timeouts_total counter',
+                      f'gym_db_pool_checkout_timeouts_total{{pid="{pid}"}} {self._timeouts}']
+
+        pool = db.engine.pool if has_app_context() else None
+        if isinstance(pool, QueuePool):
+            lines += ['# TYPE gym_db_pool_size gauge',
+                      f'gym_db_pool_size{{pid="{pid}"}} {pool.size()}',
+                      '# TYPE gym_db_pool_checked_out gauge',
+                      f'gym_db_pool_checked_out{{pid="{pid}"}} {pool.checkedout()}',
+                      '# TYPE gym_db_pool_overflow gauge',
+                      f'gym_db_pool_overflow{{pid="{pid}"}} {pool.overflow()}']
+        return lines
+
+
+database = DatabaseTuning()
+
+
+@event.listens_for(Engine, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        database.apply_pragmas(dbapi_connection)
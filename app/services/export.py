@@ -0,0 +1,193 @@
+"""
+Data Export Service
+Streams a tenant's bookings, workout sessions and members as CSV, JSONL or Parquet
+"""
+import csv
+from datetime import date, datetime, time
+import io
+import json
+
+from sqlalchemy import select
+
+from app import db
+from app.models import User, GymArea, WorkoutProgram, Booking, WorkoutSession
+from app.utils.serialization import localized
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def _outerjoin(stmt, joins):
+    for target, onclause in joins:
+        stmt = stmt.outerjoin(target, onclause)
+    return stmt
+
+
+def _bookings(tenant_id, date_from, date_to):
+    room_name, joins = localized(GymArea, 'name', key=Booking.gym_area_id).expression('en', 'room_name')
+    stmt = _outerjoin(select(
+        Booking.id, Booking.booking_date, Booking.start_time, Booking.duration_minutes,
+        Booking.status, Booking.price, Booking.trainer_name,
+        User.username, User.member_id,
+        Booking.gym_area_id.label('room_id'), room_name.label('room_name'),
+        Booking.created_at
+    ).join(User, User.id == Booking.user_id), joins).where(User.tenant_id == tenant_id)
+    if date_from:
+        stmt = stmt.where(Booking.booking_date >= date_from)
+    if date_to:
+        stmt = stmt.where(Booking.booking_date <= date_to)
+    return stmt.order_by(Booking.booking_date, Booking.start_time)
+
+
+def _sessions(tenant_id, date_from, date_to):
+    program_name, joins = localized(WorkoutProgram, 'name', key=WorkoutSession.workout_program_id).expression(
+        'en', 'program_name')
+    stmt = _outerjoin(select(
+        WorkoutSession.id, User.username, User.member_id,
+        WorkoutSession.workout_program_id.label('program_id'),
+        program_name.label('program_name'),
+        WorkoutSession.start_time, WorkoutSession.end_time, WorkoutSession.duration_seconds,
+        WorkoutSession.calories_burned, WorkoutSession.status
+    ).join(User, User.id == WorkoutSession.user_id), joins).where(User.tenant_id == tenant_id)
+    if date_from:
+        stmt = stmt.where(WorkoutSession.start_time >= datetime.combine(date_from, time.min))
+    if date_to:
+        stmt = stmt.where(WorkoutSession.start_time <= datetime.combine(date_to, time.max))
+    return stmt.order_by(WorkoutSession.start_time)
+
+
+def _members(tenant_id, date_from, date_to):
+    # Never export password hashes
+    stmt = select(
+        User.id, User.username, User.email, User.member_id, User.role,
+        User.first_name, User.last_name, User.phone, User.membership_level,
+        User.total_workouts, User.calories_burned, User.streak_days,
+        User.is_active, User.language_preference, User.created_at, User.last_login
+    ).where(User.tenant_id == tenant_id)
+    if date_from:
+        stmt = stmt.where(User.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        stmt = stmt.where(User.created_at <= datetime.combine(date_to, time.max))
+    return stmt.order_by(User.created_at)
+
+
+DATASETS = {
+    'bookings': _bookings,
+    'sessions': _sessions,
+    'members': _members,
+}
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def iter_batches(dataset, tenant_id, date_from=None, date_to=None, batch_size=1000):
+    """Yield (columns, rows) batches from a server-side cursor"""
+    stmt = DATASETS[dataset](tenant_id, date_from, date_to)
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    columns = list(result.keys())
+    empty = True
+    for partition in result.partitions():
+        empty = False
+        yield columns, [[_plain(value) for value in row] for row in partition]
+    if empty:
+        # Still emit the header row
+        yield columns, []
+
+
+def csv_chunks(batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    for columns, rows in batches:
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def jsonl_chunks(batches):
+    for columns, rows in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n' for row in rows)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back as chunks"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def drain(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def parquet_chunks(batches):
+    """One Parquet row group per batch (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError('Parquet export requires the pyarrow package (pip install pyarrow)')
+
+    sink = _ChunkSink()
+    writer = None
+    for columns, rows in batches:
+        table = pa.Table.from_pylist([dict(zip(columns, row)) for row in rows])
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        writer.write_table(table.cast(writer.schema))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+WRITERS = {
+    'csv': csv_chunks,
+    'jsonl': jsonl_chunks,
+    'parquet': parquet_chunks,
+}
+
+
+def export_chunks(dataset, tenant_id, fmt='csv', date_from=None, date_to=None, batch_size=1000):
+    """Generator of encoded chunks; memory use depends on batch size only"""
+    if dataset not in DATASETS:
+        raise ValueError(f'Unknown dataset: {dataset}')
+    if fmt not in WRITERS:
+        raise ValueError(f'Unknown format: {fmt}')
+    if fmt == 'parquet':
+        # Fail before the response starts streaming
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise RuntimeError('Parquet export requires the pyarrow package (pip install pyarrow)')
+    return WRITERS[fmt](iter_batches(dataset, tenant_id, date_from, date_to, batch_size))
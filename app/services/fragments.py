@@ -0,0 +1,76 @@
+"""
+Fragment Cache
+Rendered HTML for the tenant-wide parts of pages, plus Jinja bytecode caching
+"""
+import hashlib
+import os
+
+from flask import get_template_attribute, render_template
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+
+from app.services.catalog import catalog_cache
+
+
+class FragmentCache:
+    """Renders partial templates once per tenant, language and catalog version.
+
+    Fragments are stored through the catalog cache, whose keys carry the
+    tenant's catalog version, so they are as fresh as the catalog: with
+    a shared (filesystem/redis) backend an edit retires them at once,
+    with the memory backend other workers may serve theirs for up to
+    CATALOG_CACHE_TTL. The template's source hash is part of the key, so
+    a deploy never serves fragments rendered by an older template from a
+    shared backend. Live state (occupancy, the user's own data) is never
+    part of a fragment; pages render it around the cached parts.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self._fingerprints = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('FRAGMENT_CACHE_ENABLED', True)
+        cache_dir = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR')
+        if cache_dir:
+            # Compiled templates shared by all workers, so new ones skip the compile step
+            os.makedirs(cache_dir, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+        self._app = app
+        app.extensions['fragment_cache'] = self
+
+    def _fingerprint(self, template_name):
+        fingerprint = self._fingerprints.get(template_name)
+        if fingerprint is None:
+            env = self._app.jinja_env
+            source = env.loader.get_source(env, template_name)[0]
+            fingerprint = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+            self._fingerprints[template_name] = fingerprint
+        return fingerprint
+
+    def _cached(self, tenant_id, template_name, key, loader):
+        if not self.enabled:
+            return loader()
+        name = f'fragment:{template_name}:{self._fingerprint(template_name)}:{key}'
+        return catalog_cache.get_or_load(tenant_id, name, loader)
+
+    def render(self, tenant_id, template_name, key, **context):
+        """HTML of `template_name`; `key` must cover everything in `context`
+        that is not part of the catalog (language, translations version)"""
+        return Markup(self._cached(tenant_id, template_name, key,
+                                   lambda: render_template(template_name, **context)))
+
+    def render_parts(self, tenant_id, template_name, key, items, parts, **context):
+        """HTML of the macros `parts` of `template_name` for each catalog item,
+        as {item id: {part: html}}, for pages that place live values between them"""
+        def load():
+            macros = [(part, get_template_attribute(template_name, part)) for part in parts]
+            return {item['id']: {part: str(macro(item, **context)) for part, macro in macros}
+                    for item in items}
+        return {item_id: {part: Markup(html) for part, html in rendered.items()}
+                for item_id, rendered in self._cached(tenant_id, template_name, key, load).items()}
+
+
+fragment_cache = FragmentCache()
@@ -0,0 +1,138 @@
+"""
+HTTP Caching
+Conditional GET (ETag / Last-Modified), Cache-Control policies and
+gzip/brotli compression of larger responses
+"""
+from functools import wraps
+import gzip
+import hashlib
+
+from flask import current_app, request, session
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/css', 'text/plain',
+                      'application/javascript', 'text/javascript')
+
+
+def etag_for(full_path, session, tenant_header, summary):
+    """Weak ETag value for a response summary, per URL, tenant, user and language"""
+    return hashlib.sha1(repr((
+        full_path, session.get('tenant_id'), session.get('user_id'),
+        session.get('language'), tenant_header, summary
+    )).encode('utf-8')).hexdigest()[:32]
+
+
+def conditional(validator):
+    """Answer GETs with 304 Not Modified while `validator()` is unchanged.
+
+    `validator(**view_args)` runs before the view and returns
+    (summary, last_modified): a cheap, hashable summary of everything the
+    response depends on and the newest updated_at behind it (or None).
+    Returning None skips caching. The ETag combines the summary with the
+    URL, tenant, user and language, so a matching If-None-Match is
+    answered without running the view.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return f(*args, **kwargs)
+            validated = validator(**kwargs)
+            if validated is None:
+                return f(*args, **kwargs)
+            summary, last_modified = validated
+
+            etag = etag_for(request.full_path, session,
+                            request.headers.get(current_app.config['TENANT_HEADER']), summary)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (last_modified is not None and request.if_modified_since is not None
+                                and last_modified.replace(microsecond=0) <= request.if_modified_since
+                                .replace(tzinfo=None))
+
+            if not_modified:
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return decorated_function
+    return decorator
+
+
+class HttpCache:
+    """Cache-Control per endpoint and response compression.
+
+    Policies come from HTTP_CACHE_CONTROL ({endpoint: header value}) and
+    apply to every response of that endpoint, including 304s. Bodies of
+    at least COMPRESS_MIN_SIZE bytes are compressed with brotli when the
+    client accepts it and the package is installed, else with gzip.
+    """
+
+    def __init__(self, app=None):
+        self.policies = {}
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_quality = 4
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.policies = dict(app.config.get('HTTP_CACHE_CONTROL') or {})
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.gzip_level = app.config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        app.after_request(self._after_request)
+        app.extensions['http_cache'] = self
+
+    def _apply_policy(self, response):
+        policy = self.policies.get(request.endpoint)
+        if policy and 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = policy
+        if response.headers.get('ETag'):
+            # Conditional responses differ per tenant and login
+            response.vary.update(('Cookie', current_app.config['TENANT_HEADER']))
+
+    def _after_request(self, response):
+        self._apply_policy(response)
+        if self.min_size and self._compressible(response):
+            self._compress(response)
+        return response
+
+    def _compressible(self, response):
+        return (response.status_code == 200
+                and not response.direct_passthrough
+                and not response.is_streamed
+                and 'Content-Encoding' not in response.headers
+                and response.mimetype in COMPRESSIBLE_TYPES)
+
+    def compress(self, body, accepted):
+        """(body, content encoding) for the client's Accept-Encoding; encoding None if unchanged"""
+        if brotli is not None and accepted['br']:
+            return brotli.compress(body, quality=self.brotli_quality), 'br'
+        if accepted['gzip']:
+            return gzip.compress(body, compresslevel=self.gzip_level, mtime=0), 'gzip'
+        return body, None
+
+    def _compress(self, response):
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return
+        response.vary.add('Accept-Encoding')
+        body, encoding = self.compress(body, request.accept_encodings)
+        if encoding:
+            response.set_data(body)
+            response.headers['Content-Encoding'] = encoding
+
+
+http_cache = HttpCache()
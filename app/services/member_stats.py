@@ -0,0 +1,204 @@
+"""
+Member Statistics
+Keeps workout totals, streaks and weekly/monthly rollups up to date
+"""
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import case, delete, func, select, update
+
+from app import db
+from app.models import Tenant, User, WorkoutSession, MemberStatPeriod
+from app.services.analytics import record_session
+from app.utils.tenant_time import tenant_zone, to_local, local_date, local_today
+from app.utils.upsert import upsert
+
+PERIODS = ('week', 'month')
+
+
+def period_start(day, period):
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def current_streak(streak_days, last_workout_date, today):
+    """Stored streak, or 0 once a whole day has passed without a workout"""
+    if last_workout_date is None or last_workout_date < today - timedelta(days=1):
+        return 0
+    return streak_days or 0
+
+
+def streak_ending(days):
+    """Length of the run of consecutive days ending at the last of sorted `days`"""
+    streak = 0
+    previous = None
+    for day in reversed(days):
+        if previous is not None and day != previous - timedelta(days=1):
+            break
+        streak += 1
+        previous = day
+    return streak
+
+
+def _upsert_periods(rows, accumulate=True):
+    upsert(MemberStatPeriod.__table__, rows, ('user_id', 'period', 'period_start'), accumulate)
+
+
+def record_completion(user_id, started_at, calories, duration_seconds, zone):
+    """Apply one completed workout to the user's counters and rollups.
+
+    A single UPDATE increments the totals and advances the streak, so
+    concurrent completions cannot lose each other's writes. A workout
+    dated before the latest one leaves the streak as is; run a recompute
+    after backfilling history.
+    """
+    day = local_date(started_at, zone)
+    calories = calories or 0
+    streak = func.coalesce(User.streak_days, 0)
+    stats = db.session.execute(
+        update(User).where(User.id == user_id).values(
+            total_workouts=func.coalesce(User.total_workouts, 0) + 1,
+            calories_burned=func.coalesce(User.calories_burned, 0) + calories,
+            streak_days=case(
+                (User.last_workout_date >= day, streak),
+                (User.last_workout_date == day - timedelta(days=1), streak + 1),
+                else_=1
+            ),
+            last_workout_date=case(
+                (User.last_workout_date > day, User.last_workout_date),
+                else_=day
+            )
+        ).returning(
+            User.total_workouts, User.calories_burned, User.streak_days, User.last_workout_date
+        ).execution_options(synchronize_session=False)
+    ).one()
+
+    _upsert_periods([{
+        'user_id': user_id,
+        'period': period,
+        'period_start': period_start(day, period),
+        'workouts': 1,
+        'calories_burned': calories,
+        'duration_seconds': duration_seconds or 0
+    } for period in PERIODS])
+
+    return {
+        'total_workouts': stats.total_workouts,
+        'calories_burned': stats.calories_burned,
+        'streak_days': current_streak(stats.streak_days, stats.last_workout_date, local_today(zone))
+    }
+
+
+def complete_session(workout_session, calories, tenant_id, zone):
+    """Mark an in-progress session completed and count it once.
+
+    Returns the updated stats, or None if the session was already completed.
+    """
+    user_id, started_at = workout_session.user_id, workout_session.start_time
+    program_id = workout_session.workout_program_id
+    end_time = datetime.utcnow()
+    duration = int((end_time - started_at).total_seconds())
+    result = db.session.execute(
+        update(WorkoutSession).where(
+            WorkoutSession.id == workout_session.id,
+            WorkoutSession.status == 'in_progress'
+        ).values(
+            end_time=end_time,
+            duration_seconds=duration,
+            calories_burned=calories,
+            status='completed',
+            updated_at=end_time
+        ).execution_options(synchronize_session=False)
+    )
+    db.session.expire(workout_session)
+    if result.rowcount != 1:
+        return None
+    record_session(tenant_id, program_id, to_local(started_at, zone), calories, duration)
+    return record_completion(user_id, started_at, calories, duration, zone)
+
+
+def recompute(tenant_id=None, batch_size=1000):
+    """Rebuild counters, streaks and rollups from all completed sessions.
+
+    Totals come from one ordered pass over the sessions of each tenant,
+    so this is safe to run after imports or backfills. Returns the number
+    of members updated.
+    """
+    tenants = db.session.query(Tenant.id, Tenant.settings)
+    if tenant_id:
+        tenants = tenants.filter(Tenant.id == tenant_id)
+
+    updated = 0
+    for tid, settings in tenants.all():
+        zone = tenant_zone(settings)
+        tenant_users = select(User.id).where(User.tenant_id == tid)
+        db.session.execute(delete(MemberStatPeriod).where(MemberStatPeriod.user_id.in_(tenant_users)))
+        db.session.execute(update(User).where(User.tenant_id == tid).values(
+            total_workouts=0, calories_burned=0, streak_days=0, last_workout_date=None
+        ))
+
+        sessions = db.session.execute(
+            select(WorkoutSession.user_id, WorkoutSession.start_time,
+                   WorkoutSession.calories_burned, WorkoutSession.duration_seconds)
+            .join(User, User.id == WorkoutSession.user_id)
+            .where(User.tenant_id == tid, WorkoutSession.status == 'completed')
+            .order_by(WorkoutSession.user_id, WorkoutSession.start_time)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        users, periods = [], []
+        for user_id, rows in groupby(sessions, key=lambda row: row.user_id):
+            totals = {'id': user_id, 'total_workouts': 0, 'calories_burned': 0}
+            days = []
+            buckets = {}
+            for row in rows:
+                day = local_date(row.start_time, zone)
+                totals['total_workouts'] += 1
+                totals['calories_burned'] += row.calories_burned or 0
+                if not days or days[-1] != day:
+                    days.append(day)
+                for period in PERIODS:
+                    rollup = buckets.setdefault((period, period_start(day, period)), [0, 0, 0])
+                    rollup[0] += 1
+                    rollup[1] += row.calories_burned or 0
+                    rollup[2] += row.duration_seconds or 0
+            totals['streak_days'] = streak_ending(days)
+            totals['last_workout_date'] = days[-1]
+            users.append(totals)
+            periods += [{
+                'user_id': user_id, 'period': period, 'period_start': start,
+                'workouts': workouts, 'calories_burned': calories, 'duration_seconds': seconds
+            } for (period, start), (workouts, calories, seconds) in buckets.items()]
+
+            if len(users) >= batch_size:
+                updated += _write_recomputed(users, periods)
+                users, periods = [], []
+        updated += _write_recomputed(users, periods)
+        db.session.commit()
+    return updated
+
+
+def _write_recomputed(users, periods):
+    if users:
+        db.session.execute(update(User), users)
+    _upsert_periods(periods, accumulate=False)
+    return len(users)
+
+
+def rollups(user_id, period='week', limit=12):
+    """Most recent weekly or monthly totals for a member"""
+    if period not in PERIODS:
+        raise ValueError(f'Unknown period: {period}')
+    rows = db.session.execute(
+        select(MemberStatPeriod.period_start, MemberStatPeriod.workouts,
+               MemberStatPeriod.calories_burned, MemberStatPeriod.duration_seconds)
+        .where(MemberStatPeriod.user_id == user_id, MemberStatPeriod.period == period)
+        .order_by(MemberStatPeriod.period_start.desc())
+        .limit(limit)
+    )
+    return [{
+        'period_start': row.period_start.isoformat(),
+        'workouts': row.workouts,
+        'calories_burned': row.calories_burned,
+        'duration_minutes': row.duration_seconds // 60
+    } for row in rows]
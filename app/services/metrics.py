@@ -0,0 +1,259 @@
+"""
+Metrics Service
+Per-endpoint latency, SQL statement counts and slow query samples
+"""
+from collections import defaultdict
+from contextvars import ContextVar
+import os
+import re
+import threading
+import time
+
+from flask import g, request, has_request_context, jsonify, Response, abort
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%\(\w+\)s|%s|:\w+|\$\d+')
+_PARAM_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+# Statement counts of a request served by the ASGI tier (no Flask request context)
+_async_request = ContextVar('metrics_async_request', default=None)
+
+
+def fingerprint(statement):
+    """Normalize SQL so that queries differing only in literals group together"""
+    sql = _STRING_RE.sub('?', statement)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _PARAM_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Records request and database timings and exposes them at /metrics.
+
+    Values are kept per process: with several gunicorn workers each worker
+    reports its own series, distinguished by the `pid` label. The views
+    require METRICS_TOKEN; without one they are only served in debug and
+    testing, and answer 404 elsewhere.
+    """
+
+    def __init__(self, app=None):
+        self.slow_query_threshold = 0.1
+        self.max_slow_queries = 100
+        self.token = None
+        self.open_access = False
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._latency = defaultdict(Histogram)
+        self._requests = defaultdict(int)
+        self._statements = defaultdict(int)
+        self._db_time = defaultdict(float)
+        self._slow_queries = {}
+        self._collectors = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_query_threshold = app.config.get('METRICS_SLOW_QUERY_THRESHOLD', self.slow_query_threshold)
+        self.token = app.config.get('METRICS_TOKEN')
+        self.open_access = bool(app.debug or app.testing)
+        app.extensions['metrics'] = self
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+        app.add_url_rule('/metrics/slow-queries', 'slow_queries', self._slow_queries_view)
+
+    def register_collector(self, collector):
+        """Add a callable returning extra Prometheus text lines"""
+        self._collectors.append(collector)
+
+    # Request hooks
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_time = 0.0
+
+    def _after_request(self, response):
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        for value in self._observe(request.endpoint or 'unmatched', request.method, response.status_code,
+                                   time.perf_counter() - started, g.get('sql_statements', 0),
+                                   g.get('sql_time', 0.0)):
+            response.headers.add('Server-Timing', value)
+        return response
+
+    def _observe(self, endpoint, method, status, duration, statements, sql_time):
+        """Record a finished request; returns its Server-Timing header values"""
+        with self._lock:
+            self._latency[(endpoint, method)].observe(duration)
+            self._requests[(endpoint, method, status)] += 1
+            self._statements[endpoint] += statements
+            self._db_time[endpoint] += sql_time
+        return [f'app;dur={duration * 1000:.1f}',
+                f'db;dur={sql_time * 1000:.1f};desc="{statements} queries"']
+
+    # Requests served by the ASGI tier, under the Flask endpoint names
+
+    def start_async_request(self, endpoint):
+        """Start timing a request in the current task; pass the result to finish_async_request"""
+        return _async_request.set({'endpoint': endpoint, 'started': time.perf_counter(),
+                                   'statements': 0, 'sql_time': 0.0})
+
+    def finish_async_request(self, token, method, status):
+        """Record the request started with `token`; returns its Server-Timing header values"""
+        stats = _async_request.get()
+        _async_request.reset(token)
+        return self._observe(stats['endpoint'], method, status, time.perf_counter() - stats['started'],
+                             stats['statements'], stats['sql_time'])
+
+    # Database hooks
+
+    def record_statement(self, statement, duration):
+        endpoint = None
+        if has_request_context() and 'metrics_started' in g:
+            g.sql_statements += 1
+            g.sql_time += duration
+            endpoint = request.endpoint
+        elif _async_request.get() is not None:
+            stats = _async_request.get()
+            stats['statements'] += 1
+            stats['sql_time'] += duration
+            endpoint = stats['endpoint']
+        if duration < self.slow_query_threshold:
+            return
+
+        key = fingerprint(statement)
+        with self._lock:
+            sample = self._slow_queries.get(key)
+            if sample is None:
+                if len(self._slow_queries) >= self.max_slow_queries:
+                    return
+                sample = self._slow_queries[key] = {
+                    'fingerprint': key, 'count': 0, 'total_seconds': 0.0,
+                    'max_seconds': 0.0, 'endpoints': set()
+                }
+            sample['count'] += 1
+            sample['total_seconds'] += duration
+            sample['max_seconds'] = max(sample['max_seconds'], duration)
+            if endpoint:
+                sample['endpoints'].add(endpoint)
+
+    # Views
+
+    def _check_token(self):
+        if not self.token:
+            if not self.open_access:
+                abort(404)
+        elif request.headers.get('Authorization') != f'Bearer {self.token}':
+            abort(401)
+
+    def _metrics_view(self):
+        self._check_token()
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def _slow_queries_view(self):
+        self._check_token()
+        with self._lock:
+            samples = sorted(self._slow_queries.values(), key=lambda s: s['total_seconds'], reverse=True)
+            samples = [dict(sample, endpoints=sorted(sample['endpoints'])) for sample in samples]
+        return jsonify({'threshold_seconds': self.slow_query_threshold, 'queries': samples})
+
+    def render(self):
+        """Prometheus text exposition of everything recorded so far"""
+        pid = os.getpid()
+        lines = [
+            '# HELP gym_http_request_duration_seconds Request latency per endpoint',
+            '# TYPE gym_http_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            for (endpoint, method), hist in sorted(self._latency.items()):
+                labels = f'endpoint="{_label(endpoint)}",method="{method}",pid="{pid}"'
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f'gym_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'gym_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f'gym_http_request_duration_seconds_sum{{{labels}}} {hist.total:.6f}')
+                lines.append(f'gym_http_request_duration_seconds_count{{{labels}}} {hist.count}')
+
+            lines += ['# HELP gym_http_requests_total Requests per endpoint and status',
+                      '# TYPE gym_http_requests_total counter']
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'gym_http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+                             f'status="{status}",pid="{pid}"}} {count}')
+
+            lines += ['# HELP gym_db_statements_total SQL statements executed per endpoint',
+                      '# TYPE gym_db_statements_total counter']
+            for endpoint, count in sorted(self._statements.items()):
+                lines.append(f'gym_db_statements_total{{endpoint="{_label(endpoint)}",pid="{pid}"}} {count}')
+
+            lines += ['# HELP gym_db_time_seconds_total Time spent in SQL per endpoint',
+                      '# TYPE gym_db_time_seconds_total counter']
+            for endpoint, seconds in sorted(self._db_time.items()):
+                lines.append(f'gym_db_time_seconds_total{{endpoint="{_label(endpoint)}",pid="{pid}"}} {seconds:.6f}')
+
+            lines += ['# HELP gym_db_slow_queries_total Statements slower than the slow query threshold',
+                      '# TYPE gym_db_slow_queries_total counter',
+                      f'gym_db_slow_queries_total{{pid="{pid}"}} '
+                      f'{sum(sample["count"] for sample in self._slow_queries.values())}']
+
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+# The start time lives on the statement's execution context, so a statement
+# that fails (after_cursor_execute never runs) leaves nothing behind
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'metrics_started', None)
+    if started is not None:
+        metrics.record_statement(statement, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    # Failed statements (e.g. an overlap rejected by the database) still took database time
+    started = getattr(exception_context.execution_context, 'metrics_started', None)
+    if started is not None and exception_context.statement is not None:
+        metrics.record_statement(exception_context.statement, time.perf_counter() - started)
@@ -0,0 +1,281 @@
+"""
+Occupancy Service
+Live per-area user counts fed by check-in/check-out events
+"""
+import atexit
+import os
+import threading
+import time
+
+from flask import has_app_context
+from sqlalchemy import and_, bindparam, case, func, update
+
+from app import db
+from app.models import GymArea
+
+# Statuses set by staff that take precedence over the live count
+MANUAL_STATUSES = ('Maintenance', 'Class in Session')
+
+
+def derive_status(current_users, capacity, base_status=None):
+    """Compute the displayed status of an area from its live count"""
+    if base_status in MANUAL_STATUSES:
+        return base_status
+    usage = current_users / capacity if capacity > 0 else 0
+    if usage >= 1.0:
+        return 'Full'
+    if usage >= 0.8:
+        return 'Busy'
+    return 'Available'
+
+
+def usage_percent(current_users, capacity):
+    return (current_users / capacity * 100) if capacity > 0 else 0
+
+
+class MemoryOccupancyStore:
+    """Counters held in this process (single worker / development).
+
+    The store keeps the raw change since the last flush (a delta) on top
+    of a database snapshot. Deltas are not clamped here: a check-out may
+    belong to a check-in counted elsewhere, so only the database clamps,
+    when the delta is added to gym_areas. Snapshots older than
+    `snapshot_ttl` are reloaded.
+    """
+
+    shared = False
+
+    def __init__(self, snapshot_ttl=30):
+        self.snapshot_ttl = snapshot_ttl
+        self._snapshots = {}
+        self._deltas = {}
+        self._lock = threading.Lock()
+
+    def _count(self, area_id, now):
+        snapshot = self._snapshots.get(area_id)
+        if snapshot is None or now - snapshot[1] >= self.snapshot_ttl:
+            return None
+        return snapshot[0] + self._deltas.get(area_id, 0)
+
+    def get_many(self, area_ids):
+        now = time.monotonic()
+        with self._lock:
+            return {area_id: self._count(area_id, now) for area_id in area_ids}
+
+    def seed(self, values):
+        """Set counts for areas that have none yet or whose snapshot is stale"""
+        now = time.monotonic()
+        with self._lock:
+            for area_id, count in values.items():
+                if self._count(area_id, now) is None:
+                    self._snapshots[area_id] = (count, now)
+
+    def incr(self, area_id, delta, capacity):
+        with self._lock:
+            snapshot = self._snapshots.setdefault(area_id, (0, time.monotonic()))
+            self._deltas[area_id] = self._deltas.get(area_id, 0) + delta
+            return max(0, min(capacity, snapshot[0] + self._deltas[area_id]))
+
+    def pop_dirty(self):
+        """Changes since the last flush, as {area_id: delta}"""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+            for area_id in deltas:
+                # Reload after the flush, with the other workers' changes
+                self._snapshots.pop(area_id, None)
+            return {area_id: delta for area_id, delta in deltas.items() if delta}
+
+
+class RedisOccupancyStore:
+    """Counters in Redis, shared by every worker (requires `redis`)"""
+
+    shared = True
+
+    # Clamped increment so concurrent check-ins never leave [0, capacity]
+    INCR_SCRIPT = """
+    local count = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0') + tonumber(ARGV[2])
+    count = math.max(0, math.min(tonumber(ARGV[3]), count))
+    redis.call('HSET', KEYS[1], ARGV[1], count)
+    redis.call('SADD', KEYS[2], ARGV[1])
+    return count
+    """
+
+    def __init__(self, url, prefix='gym:occupancy:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError('RedisOccupancyStore requires the redis package (pip install redis)')
+        self.client = redis.Redis.from_url(url)
+        self.counts_key = prefix + 'counts'
+        self.dirty_key = prefix + 'dirty'
+        self._incr = self.client.register_script(self.INCR_SCRIPT)
+
+    def get_many(self, area_ids):
+        if not area_ids:
+            return {}
+        values = self.client.hmget(self.counts_key, list(area_ids))
+        return {area_id: int(value) if value is not None else None
+                for area_id, value in zip(area_ids, values)}
+
+    def seed(self, values):
+        pipe = self.client.pipeline()
+        for area_id, count in values.items():
+            pipe.hsetnx(self.counts_key, area_id, count)
+        pipe.execute()
+
+    def incr(self, area_id, delta, capacity):
+        return int(self._incr(keys=[self.counts_key, self.dirty_key],
+                              args=[area_id, delta, capacity]))
+
+    def pop_dirty(self):
+        pipe = self.client.pipeline()
+        pipe.smembers(self.dirty_key)
+        pipe.delete(self.dirty_key)
+        members, _ = pipe.execute()
+        area_ids = [member.decode('utf-8') for member in members]
+        return {area_id: count for area_id, count in self.get_many(area_ids).items()
+                if count is not None}
+
+
+class Occupancy:
+    """Live occupancy backed by a counter store, flushed to gym_areas in batches"""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.store = MemoryOccupancyStore()
+        self.flush_interval = 30
+        self._last_flush = time.monotonic()
+        self._timer_pid = None
+        self._timer_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get('OCCUPANCY_FLUSH_INTERVAL', self.flush_interval)
+        if app.config.get('OCCUPANCY_BACKEND', 'memory') == 'redis':
+            self.store = RedisOccupancyStore(app.config['OCCUPANCY_REDIS_URL'])
+        elif app.config.get('WEB_CONCURRENCY', 1) > 1:
+            raise RuntimeError('OCCUPANCY_BACKEND=memory counts per worker process; '
+                               'set OCCUPANCY_BACKEND=redis to run more than one worker')
+        else:
+            self.store = MemoryOccupancyStore(snapshot_ttl=self.flush_interval)
+        app.extensions['occupancy'] = self
+
+    def counts(self, area_ids):
+        """Live counts for areas, seeded from the last database snapshot"""
+        if has_app_context():
+            # The async tier reads without one; its process flushes on the timer
+            self.flush_if_due()
+        counts = self.store.get_many(area_ids)
+        missing = [area_id for area_id, count in counts.items() if count is None]
+        if missing:
+            self.seed(db.session.query(GymArea.id, GymArea.current_users)
+                      .filter(GymArea.id.in_(missing)).all())
+            counts.update(self.store.get_many(missing))
+        return {area_id: max(0, count or 0) for area_id, count in counts.items()}
+
+    def missing(self, area_ids):
+        """Areas without a live count yet"""
+        return [area_id for area_id, count in self.store.get_many(area_ids).items() if count is None]
+
+    def seed(self, snapshot):
+        """Seed live counts from (area_id, current_users) rows"""
+        self.store.seed({area_id: count or 0 for area_id, count in snapshot})
+
+    def with_live_state(self, areas):
+        """Add current_users, status and usage_percent to serialized catalog areas"""
+        counts = self.counts([area['id'] for area in areas])
+        counts = {area['id']: min(counts[area['id']], area['capacity']) for area in areas}
+        return [dict(area,
+                     current_users=counts[area['id']],
+                     status=derive_status(counts[area['id']], area['capacity'], area.get('status')),
+                     usage_percent=usage_percent(counts[area['id']], area['capacity']))
+                for area in areas]
+
+    def check_in(self, area, count=1):
+        """Record users entering an area (serialized catalog dict)"""
+        self.counts([area['id']])
+        self._start_timer()
+        return self.store.incr(area['id'], count, area['capacity'])
+
+    def check_out(self, area, count=1):
+        """Record users leaving an area (serialized catalog dict)"""
+        self.counts([area['id']])
+        self._start_timer()
+        return self.store.incr(area['id'], -count, area['capacity'])
+
+    def flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _start_timer(self):
+        """Flush this process's changes every flush_interval and at exit, even when no event follows"""
+        if self._timer_pid == os.getpid() or self.app is None or self.app.testing:
+            return
+        with self._timer_lock:
+            if self._timer_pid == os.getpid():
+                return
+            # Once per process: threads do not survive gunicorn's fork
+            self._timer_pid = os.getpid()
+            threading.Thread(target=self._flush_periodically, name='occupancy-flush', daemon=True).start()
+            atexit.register(self._flush_in_context)
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_in_context()
+
+    def _flush_in_context(self):
+        try:
+            with self.app.app_context():
+                self.flush()
+        except Exception:
+            self.app.logger.exception('Occupancy flush failed')
+
+    def flush(self):
+        """Write changed counts and derived statuses to gym_areas in one batch"""
+        self._last_flush = time.monotonic()
+        dirty = self.store.pop_dirty()
+        if not dirty:
+            return 0
+
+        if not self.store.shared:
+            # Per-worker deltas: add them up in the database so workers never overwrite each other
+            db.session.execute(_ADD_USERS, [{'area_id': area_id, 'delta': delta}
+                                            for area_id, delta in dirty.items()])
+            db.session.commit()
+            return len(dirty)
+
+        rows = db.session.query(GymArea.id, GymArea.capacity, GymArea.status).filter(
+            GymArea.id.in_(list(dirty))
+        ).all()
+        db.session.execute(update(GymArea), [{
+            'id': area_id,
+            'current_users': dirty[area_id],
+            'status': derive_status(dirty[area_id], capacity, status)
+        } for area_id, capacity, status in rows])
+        db.session.commit()
+        return len(rows)
+
+
+def _add_users_statement():
+    """UPDATE adding a delta to current_users, clamped to [0, capacity], with derive_status in SQL"""
+    areas = GymArea.__table__
+    current = func.coalesce(areas.c.current_users, 0) + bindparam('delta')
+    count = case((current < 0, 0), (current > areas.c.capacity, areas.c.capacity), else_=current)
+    status = case(
+        (areas.c.status.in_(MANUAL_STATUSES), areas.c.status),
+        (and_(areas.c.capacity > 0, count >= areas.c.capacity), 'Full'),
+        # usage >= 0.8 without floating point
+        (and_(areas.c.capacity > 0, count * 5 >= areas.c.capacity * 4), 'Busy'),
+        else_='Available'
+    )
+    return update(areas).where(areas.c.id == bindparam('area_id')).values(
+        current_users=count, status=status)
+
+
+_ADD_USERS = _add_users_statement()
+
+
+occupancy = Occupancy()
@@ -0,0 +1,135 @@
+"""
+Recurring Bookings
+Weekly booking series, booked a few weeks ahead and expanded on demand
+"""
+from datetime import timedelta
+import uuid
+
+from app import db
+from app.models import Booking, BookingSeries
+from app.services.reservations import reservations
+from app.services.tenancy import tenants
+from app.utils.recurrence import WeeklyRule
+from app.utils.tenant_time import local_today, tenant_zone
+
+
+class RecurringBookings:
+    """Creates, extends and cancels recurring bookings.
+
+    A series stores only its rule. Occurrences become real bookings once
+    they are within BOOKING_SERIES_HORIZON_DAYS of today, all of a batch
+    in one transaction through reservations.book_many, so they hold
+    their slots like any other booking. Occurrences whose slot is already
+    taken are skipped and reported, not retried. Beyond the horizon,
+    occurrences are only generated for the window that is asked for.
+    """
+
+    def __init__(self, app=None):
+        self.horizon_days = 28
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.horizon_days = app.config.get('BOOKING_SERIES_HORIZON_DAYS', self.horizon_days)
+        app.extensions['recurring_bookings'] = self
+
+    def horizon(self, tenant_id):
+        """Last day whose occurrences are booked now (tenant-local)"""
+        return local_today(tenant_zone(tenants.settings(tenant_id))) + timedelta(days=self.horizon_days)
+
+    def create(self, user_id, tenant_id, gym_area_id, rule, starts_on, start_time, duration_minutes,
+               trainer_name='', price=0.0):
+        """Create a series and book its occurrences up to the horizon in one transaction.
+
+        Returns (series, bookings, dates skipped because the slot was taken).
+        """
+        # The id is set up front: occurrences refer to it before the first flush
+        series = BookingSeries(id=str(uuid.uuid4()), tenant_id=tenant_id, user_id=user_id,
+                               gym_area_id=gym_area_id, rrule=str(rule), starts_on=starts_on,
+                               start_time=start_time, duration_minutes=duration_minutes,
+                               trainer_name=trainer_name, price=price, status='active')
+        return (series,) + self._book_through(series, rule, self.horizon(tenant_id))
+
+    def extend(self, series, through=None):
+        """Book the series' occurrences up to `through` (default: the horizon).
+
+        Returns (bookings, dates skipped because the slot was taken).
+        """
+        through = through or self.horizon(series.tenant_id)
+        if series.status != 'active' or (series.booked_through and series.booked_through >= through):
+            return [], []
+        return self._book_through(series, WeeklyRule.parse(series.rrule), through)
+
+    def _book_through(self, series, rule, through):
+        first = series.booked_through + timedelta(days=1) if series.booked_through else series.starts_on
+        items = [dict(gym_area_id=series.gym_area_id, booking_date=day, start_time=series.start_time,
+                      duration_minutes=series.duration_minutes, trainer_name=series.trainer_name,
+                      price=series.price, series_id=series.id)
+                 for day in rule.occurrences(series.starts_on, first, through)]
+
+        def prepare():
+            # Runs again after a rollback, which expunges a new series and expires a stored one
+            db.session.add(series)
+            series.booked_through = through
+
+        bookings, skipped = reservations.book_many(series.user_id, items, skip_conflicts=True,
+                                                   prepare=prepare)
+        return bookings, [items[position]['booking_date'] for position in skipped]
+
+    def extend_all(self, tenant_id=None):
+        """Extend every active series (of one tenant); returns the number of bookings made"""
+        query = BookingSeries.query.filter_by(status='active')
+        if tenant_id:
+            query = query.filter_by(tenant_id=tenant_id)
+        created = 0
+        for series_id in [row[0] for row in query.with_entities(BookingSeries.id).all()]:
+            bookings, _ = self.extend(db.session.get(BookingSeries, series_id))
+            created += len(bookings)
+        return created
+
+    def occurrences(self, series, window_start, window_end):
+        """The series' occurrences in [window_start, window_end] with their booking state.
+
+        Each is a dict with the date, the booking id if one was made and a
+        state: the booking's status, 'unavailable' if the slot was taken
+        when the occurrence was booked, 'scheduled' if it is beyond what
+        has been booked so far, or 'cancelled' with the series.
+        """
+        bookings = {
+            booking_date: (booking_id, status)
+            for booking_date, booking_id, status in db.session.query(
+                Booking.booking_date, Booking.id, Booking.status
+            ).filter(
+                Booking.series_id == series.id,
+                Booking.booking_date >= window_start,
+                Booking.booking_date <= window_end
+            ).order_by(Booking.created_at)
+        }
+        rule = WeeklyRule.parse(series.rrule)
+        for day in rule.occurrences(series.starts_on, window_start, window_end):
+            booking_id, state = bookings.get(day, (None, None))
+            if booking_id is None:
+                if series.booked_through and day <= series.booked_through:
+                    state = 'unavailable'
+                elif series.status != 'active':
+                    state = 'cancelled'
+                else:
+                    state = 'scheduled'
+            yield {'date': day.isoformat(), 'booking_id': booking_id, 'status': state}
+
+    def cancel(self, series, from_date):
+        """Cancel a series and its confirmed occurrences from `from_date` on; returns how many"""
+        bookings = Booking.query.filter(
+            Booking.series_id == series.id,
+            Booking.booking_date >= from_date,
+            Booking.status == 'confirmed'
+        ).all()
+        # Through the ORM so the booking index sees each cancellation
+        for booking in bookings:
+            booking.status = 'cancelled'
+        series.status = 'cancelled'
+        db.session.commit()
+        return len(bookings)
+
+
+recurring_bookings = RecurringBookings()
@@ -0,0 +1,244 @@
+"""
+Reservations
+Atomic booking creation: database-enforced exclusion of overlapping
+confirmed bookings, per-slot claiming and bounded retries with jitter
+"""
+import random
+import threading
+import time
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.exc import DBAPIError
+
+from app import db
+from app.models import Booking
+from app.services.booking_index import IntervalBucket, booking_index, ends_by_midnight, time_to_minutes
+
+# Name of the PostgreSQL exclusion constraint and the SQLite triggers;
+# it appears in the error message of every rejected overlapping write
+OVERLAP_CONSTRAINT = 'bookings_confirmed_no_overlap'
+
+# serialization_failure, deadlock_detected, lock_not_available
+RETRYABLE_SQLSTATES = {'40001', '40P01', '55P03'}
+
+POSTGRESQL_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist',
+    f"ALTER TABLE bookings ADD CONSTRAINT {OVERLAP_CONSTRAINT} EXCLUDE USING gist ("
+    "gym_area_id WITH =, "
+    "tsrange(booking_date + start_time, booking_date + start_time + duration_minutes * interval '1 minute') WITH &&"
+    ") WHERE (status = 'confirmed')",
+]
+
+# SQLite runs one writer at a time, so an overlap check inside the writing
+# statement cannot race with another booking. It compares bookings of the
+# same date only, which matches the tsrange constraint because bookings
+# end by midnight (see book_many)
+_SQLITE_OVERLAP = (
+    "SELECT RAISE(ABORT, '" + OVERLAP_CONSTRAINT + "') WHERE EXISTS ("
+    "SELECT 1 FROM bookings AS other "
+    "WHERE other.gym_area_id = NEW.gym_area_id AND other.booking_date = NEW.booking_date "
+    "AND other.status = 'confirmed' AND other.id != NEW.id "
+    "AND substr(other.start_time, 1, 2) * 60 + substr(other.start_time, 4, 2) "
+    "< substr(NEW.start_time, 1, 2) * 60 + substr(NEW.start_time, 4, 2) + NEW.duration_minutes "
+    "AND substr(other.start_time, 1, 2) * 60 + substr(other.start_time, 4, 2) + other.duration_minutes "
+    "> substr(NEW.start_time, 1, 2) * 60 + substr(NEW.start_time, 4, 2));"
+)
+SQLITE_DDL = [
+    f"CREATE TRIGGER {OVERLAP_CONSTRAINT}_insert BEFORE INSERT ON bookings "
+    f"WHEN NEW.status = 'confirmed' BEGIN {_SQLITE_OVERLAP} END",
+    f"CREATE TRIGGER {OVERLAP_CONSTRAINT}_update "
+    f"BEFORE UPDATE OF gym_area_id, booking_date, start_time, duration_minutes, status ON bookings "
+    f"WHEN NEW.status = 'confirmed' BEGIN {_SQLITE_OVERLAP} END",
+]
+
+# Tables created with db.create_all() (development, tests) get the same
+# guarantees as migrated databases
+for _statement in POSTGRESQL_DDL:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+for _statement in SQLITE_DDL:
+    event.listen(Booking.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
+class SlotUnavailable(Exception):
+    """The requested time overlaps a confirmed booking.
+
+    `conflicts` holds the positions of the overlapping items of a batch.
+    """
+
+    def __init__(self, conflicts=()):
+        super().__init__(conflicts)
+        self.conflicts = list(conflicts)
+
+
+class BookingContention(Exception):
+    """The slot stayed contended through every retry"""
+
+
+def _sqlstate(error):
+    orig = getattr(error, 'orig', None)
+    return getattr(orig, 'sqlstate', None) or getattr(orig, 'pgcode', None)
+
+
+def is_overlap_error(error):
+    """Whether a DBAPIError is the database rejecting an overlapping booking"""
+    return OVERLAP_CONSTRAINT in str(getattr(error, 'orig', error))
+
+
+def is_retryable_error(error):
+    """Serialization failures, deadlocks and lock timeouts (SQLite: a busy database)"""
+    if _sqlstate(error) in RETRYABLE_SQLSTATES:
+        return True
+    message = str(getattr(error, 'orig', error))
+    return 'database is locked' in message or 'database is busy' in message
+
+
+class _SlotBusy(Exception):
+    pass
+
+
+class Reservations:
+    """Creates bookings so that two confirmed bookings of an area never overlap.
+
+    The database is the arbiter: an exclusion constraint on PostgreSQL and
+    overlap-checking triggers on SQLite reject a conflicting write, however
+    it got there. In front of that, the booking index turns away requests
+    for slots already known to be taken, and on PostgreSQL each attempt
+    first claims its area and day with a transaction-scoped advisory lock
+    that is tried, never waited for (the SKIP LOCKED pattern): while one
+    request is writing, the others back off instead of piling up on row
+    locks. Serialization failures, deadlocks, lock timeouts and busy
+    claims are retried up to BOOKING_RETRY_ATTEMPTS times with full jitter.
+    """
+
+    def __init__(self, app=None):
+        self.attempts = 5
+        self.base_delay = 0.01
+        self.max_delay = 0.25
+        self.lock_timeout_ms = 2000
+        self._counts = {'created': 0, 'conflicts': 0, 'retries': 0, 'exhausted': 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.attempts = max(1, app.config.get('BOOKING_RETRY_ATTEMPTS', self.attempts))
+        self.base_delay = app.config.get('BOOKING_RETRY_BASE_DELAY', self.base_delay)
+        self.max_delay = app.config.get('BOOKING_RETRY_MAX_DELAY', self.max_delay)
+        self.lock_timeout_ms = app.config.get('BOOKING_LOCK_TIMEOUT_MS', self.lock_timeout_ms)
+        app.extensions['reservations'] = self
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number `attempt` (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _claim(self, gym_area_id, booking_date):
+        """Claim the area's day for this transaction without waiting (PostgreSQL only)"""
+        connection = db.session.connection()
+        if connection.dialect.name != 'postgresql':
+            return
+        connection.execute(text(f"SET LOCAL lock_timeout = '{int(self.lock_timeout_ms)}ms'"))
+        claimed = connection.execute(text('SELECT pg_try_advisory_xact_lock(hashtext(:key))'),
+                                     {'key': f'booking:{gym_area_id}:{booking_date.isoformat()}'}).scalar()
+        if not claimed:
+            raise _SlotBusy()
+
+    def book(self, user_id, gym_area_id, booking_date, start_time, duration_minutes, **fields):
+        """Create and commit a confirmed booking.
+
+        Raises SlotUnavailable if the time overlaps a confirmed booking and
+        BookingContention if the slot stayed busy through every retry.
+        """
+        bookings, _ = self.book_many(user_id, [dict(
+            gym_area_id=gym_area_id, booking_date=booking_date, start_time=start_time,
+            duration_minutes=duration_minutes, **fields
+        )])
+        return bookings[0]
+
+    def _check(self, items):
+        """Split item positions into (accepted, conflicts) against the index and each other"""
+        booking_index.prefetch({(item['gym_area_id'], item['booking_date']) for item in items})
+        accepted, conflicts, batch = [], [], {}
+        for position, item in enumerate(items):
+            key = (item['gym_area_id'], item['booking_date'])
+            start = time_to_minutes(item['start_time'])
+            end = start + item['duration_minutes']
+            bucket = batch.setdefault(key, IntervalBucket())
+            if booking_index.overlaps(*key, start, end) or bucket.overlaps(start, end):
+                conflicts.append(position)
+            else:
+                bucket.add(start, end, position)
+                accepted.append(position)
+        return accepted, conflicts
+
+    def book_many(self, user_id, items, skip_conflicts=False, prepare=None):
+        """Create confirmed bookings for many items in one transaction.
+
+        Items are dicts of Booking columns (gym_area_id, booking_date,
+        start_time, duration_minutes, price, ...). An item that overlaps a
+        confirmed booking or an earlier item raises SlotUnavailable with
+        the positions of all such items, or with `skip_conflicts` is left
+        out. `prepare` is called inside every attempt's transaction to
+        write rows that must commit together with the bookings.
+
+        Every booking must end by midnight, so that overlaps are a per-date
+        question for the index and the SQLite triggers just as they are for
+        the PostgreSQL constraint; otherwise ValueError is raised.
+
+        Returns (bookings in item order, positions of skipped items).
+        """
+        if not all(ends_by_midnight(item['start_time'], item['duration_minutes']) for item in items):
+            raise ValueError('Bookings must end by midnight')
+        keys = sorted({(item['gym_area_id'], item['booking_date']) for item in items})
+        attempt = 0
+        while True:
+            accepted, conflicts = self._check(items)
+            if conflicts and not skip_conflicts:
+                self._count('conflicts', len(conflicts))
+                raise SlotUnavailable(conflicts)
+            try:
+                for key in keys:
+                    self._claim(*key)
+                if prepare is not None:
+                    prepare()
+                bookings = [Booking(user_id=user_id, status='confirmed', **items[position])
+                            for position in accepted]
+                db.session.add_all(bookings)
+                db.session.commit()
+                self._count('created', len(bookings))
+                self._count('conflicts', len(conflicts))
+                return bookings, conflicts
+            except _SlotBusy:
+                db.session.rollback()
+            except DBAPIError as e:
+                db.session.rollback()
+                if not is_overlap_error(e) and not is_retryable_error(e):
+                    raise
+                # Written by another worker: this process' index is behind,
+                # and the rebuilt buckets show the new conflicts next time round
+                for key in keys:
+                    booking_index.discard(*key)
+            attempt += 1
+            if attempt >= self.attempts:
+                self._count('exhausted')
+                raise BookingContention()
+            self._count('retries')
+            time.sleep(self.backoff(attempt))
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def prometheus_lines(self):
+        """Booking outcome counters for the /metrics endpoint"""
+        lines = []
+        for name, value in self.stats().items():
+            lines += [f'# TYPE gym_booking_{name}_total counter',
+                      f'gym_booking_{name}_total {value}']
+        return lines
+
+
+reservations = Reservations()
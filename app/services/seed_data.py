@@ -3,8 +3,9 @@ Seed Data Service
 Populates database with demo data for development and testing
 """
 from app import db
-from app.models import Tenant, User, GymArea, WorkoutProgram
+from app.models import Tenant, User, GymArea, WorkoutProgram, LocalizedText
 from datetime import datetime, timedelta
+from sqlalchemy import insert
 
 def seed_all():
     """Seed all demo data"""
@@ -100,131 +101,150 @@ def create_gym_areas(tenant_id):
     """Create gym areas"""
     areas = [
         {
-            'name_en': 'Strength Training Zone',
-            'name_el': 'Ζώνη Προπόνησης Δύναμης',
+            'name': {'en': 'Strength Training Zone', 'el': 'Ζώνη Προπόνησης Δύναμης'},
             'capacity': 25,
             'current_users': 12,
             'status': 'Available',
-            'equipment_en': ['Dumbbells', 'Barbells', 'Benches', 'Squat Racks'],
-            'equipment_el': ['Αλτήρες', 'Μπάρες', 'Πάγκοι', 'Στάσεις Καθίσματος'],
+            'equipment': {
+                'en': ['Dumbbells', 'Barbells', 'Benches', 'Squat Racks'],
+                'el': ['Αλτήρες', 'Μπάρες', 'Πάγκοι', 'Στάσεις Καθίσματος']
+            },
             'icon': '💪',
             'color': '#8B0000',
             'is_bookable': True,
-            'trainers_en': ['Alex Strong', 'Maria Power', 'John Muscle'],
-            'trainers_el': ['Αλέξης Δυναμικός', 'Μαρία Δύναμη', 'Γιάννης Μυς'],
+            'trainers': {
+                'en': ['Alex Strong', 'Maria Power', 'John Muscle'],
+                'el': ['Αλέξης Δυναμικός', 'Μαρία Δύναμη', 'Γιάννης Μυς']
+            },
             'price_per_hour': 25
         },
         {
-            'name_en': 'Cardio Arena',
-            'name_el': 'Αρένα Καρδιοπροπόνησης',
+            'name': {'en': 'Cardio Arena', 'el': 'Αρένα Καρδιοπροπόνησης'},
             'capacity': 30,
             'current_users': 28,
             'status': 'Busy',
-            'equipment_en': ['Treadmills', 'Ellipticals', 'Bikes', 'Rowing Machines'],
-            'equipment_el': ['Διάδρομοι Τρεξίματος', 'Ελλειπτικά', 'Ποδήλατα', 'Κωπηλατικά'],
+            'equipment': {
+                'en': ['Treadmills', 'Ellipticals', 'Bikes', 'Rowing Machines'],
+                'el': ['Διάδρομοι Τρεξίματος', 'Ελλειπτικά', 'Ποδήλατα', 'Κωπηλατικά']
+            },
             'icon': '🏃',
             'color': '#FF4500',
             'is_bookable': False
         },
         {
-            'name_en': 'Functional Training',
-            'name_el': 'Λειτουργική Προπόνηση',
+            'name': {'en': 'Functional Training', 'el': 'Λειτουργική Προπόνηση'},
             'capacity': 20,
             'current_users': 8,
             'status': 'Available',
-            'equipment_en': ['Battle Ropes', 'Kettlebells', 'TRX', 'Medicine Balls'],
-            'equipment_el': ['Σχοινιά Μάχης', 'Κουδούνια', 'TRX', 'Μπάλες Ιατρικής'],
+            'equipment': {
+                'en': ['Battle Ropes', 'Kettlebells', 'TRX', 'Medicine Balls'],
+                'el': ['Σχοινιά Μάχης', 'Κουδούνια', 'TRX', 'Μπάλες Ιατρικής']
+            },
             'icon': '🔥',
             'color': '#FF8C00',
             'is_bookable': True,
-            'trainers_en': ['Sofia Fit', 'Mike Cross', 'Anna Athletic'],
-            'trainers_el': ['Σοφία Φιτ', 'Μάικ Κρος', 'Άννα Αθλητική'],
+            'trainers': {
+                'en': ['Sofia Fit', 'Mike Cross', 'Anna Athletic'],
+                'el': ['Σοφία Φιτ', 'Μάικ Κρος', 'Άννα Αθλητική']
+            },
             'price_per_hour': 30
         },
         {
-            'name_en': 'Yoga & Mindfulness',
-            'name_el': 'Γιόγκα & Διαλογισμός',
+            'name': {'en': 'Yoga & Mindfulness', 'el': 'Γιόγκα & Διαλογισμός'},
             'capacity': 15,
             'current_users': 15,
             'status': 'Class in Session',
-            'equipment_en': ['Yoga Mats', 'Blocks', 'Straps', 'Meditation Cushions'],
-            'equipment_el': ['Στρώματα Γιόγκα', 'Τούβλα', 'Ιμάντες', 'Μαξιλάρια Διαλογισμού'],
+            'equipment': {
+                'en': ['Yoga Mats', 'Blocks', 'Straps', 'Meditation Cushions'],
+                'el': ['Στρώματα Γιόγκα', 'Τούβλα', 'Ιμάντες', 'Μαξιλάρια Διαλογισμού']
+            },
             'icon': '🧘',
             'color': '#4B0082',
             'is_bookable': True,
-            'trainers_en': ['Elena Zen', 'David Peace', 'Lisa Harmony'],
-            'trainers_el': ['Έλενα Ζεν', 'Δαυίδ Ειρήνη', 'Λίζα Αρμονία'],
+            'trainers': {
+                'en': ['Elena Zen', 'David Peace', 'Lisa Harmony'],
+                'el': ['Έλενα Ζεν', 'Δαυίδ Ειρήνη', 'Λίζα Αρμονία']
+            },
             'price_per_hour': 20
         },
         {
-            'name_en': 'Boxing Arena',
-            'name_el': 'Αρένα Πυγμαχίας',
+            'name': {'en': 'Boxing Arena', 'el': 'Αρένα Πυγμαχίας'},
             'capacity': 12,
             'current_users': 3,
             'status': 'Available',
-            'equipment_en': ['Heavy Bags', 'Speed Bags', 'Boxing Gloves', 'Pads'],
-            'equipment_el': ['Βαριά Σάκια', 'Σάκια Ταχύτητας', 'Γάντια Πυγμαχίας', 'Πάντες'],
+            'equipment': {
+                'en': ['Heavy Bags', 'Speed Bags', 'Boxing Gloves', 'Pads'],
+                'el': ['Βαριά Σάκια', 'Σάκια Ταχύτητας', 'Γάντια Πυγμαχίας', 'Πάντες']
+            },
             'icon': '🥊',
             'color': '#DC143C',
             'is_bookable': True,
-            'trainers_en': ['Rocky Fighter', 'Muhammad Strike', 'Tyson Power'],
-            'trainers_el': ['Ρόκι Μαχητής', 'Μουχάμεντ Χτύπημα', 'Τάισον Δύναμη'],
+            'trainers': {
+                'en': ['Rocky Fighter', 'Muhammad Strike', 'Tyson Power'],
+                'el': ['Ρόκι Μαχητής', 'Μουχάμεντ Χτύπημα', 'Τάισον Δύναμη']
+            },
             'price_per_hour': 35
         },
         {
-            'name_en': 'Swimming Pool',
-            'name_el': 'Πισίνα',
+            'name': {'en': 'Swimming Pool', 'el': 'Πισίνα'},
             'capacity': 40,
             'current_users': 0,
             'status': 'Maintenance',
-            'equipment_en': ['Olympic Pool', 'Lanes', 'Diving Board', 'Jacuzzi'],
-            'equipment_el': ['Ολυμπιακή Πισίνα', 'Διαδρομές', 'Βατήρας', 'Τζακούζι'],
+            'equipment': {
+                'en': ['Olympic Pool', 'Lanes', 'Diving Board', 'Jacuzzi'],
+                'el': ['Ολυμπιακή Πισίνα', 'Διαδρομές', 'Βατήρας', 'Τζακούζι']
+            },
             'icon': '🏊',
             'color': '#191970',
             'is_bookable': False
         },
         {
-            'name_en': 'Pilates Studio',
-            'name_el': 'Στούντιο Πιλάτες',
+            'name': {'en': 'Pilates Studio', 'el': 'Στούντιο Πιλάτες'},
             'capacity': 12,
             'current_users': 4,
             'status': 'Available',
-            'equipment_en': ['Reformer Machines', 'Pilates Mats', 'Magic Circles', 'Resistance Bands'],
-            'equipment_el': ['Μηχανές Reformer', 'Στρώματα Πιλάτες', 'Μαγικοί Κύκλοι', 'Λάστιχα Αντίστασης'],
+            'equipment': {
+                'en': ['Reformer Machines', 'Pilates Mats', 'Magic Circles', 'Resistance Bands'],
+                'el': ['Μηχανές Reformer', 'Στρώματα Πιλάτες', 'Μαγικοί Κύκλοι', 'Λάστιχα Αντίστασης']
+            },
             'icon': '🤸‍♀️',
             'color': '#8B008B',
             'is_bookable': True,
-            'trainers_en': ['Grace Balance', 'Emma Core', 'Sophia Stretch'],
-            'trainers_el': ['Γκρέις Ισορροπία', 'Έμμα Κορμός', 'Σοφία Τέντωμα'],
+            'trainers': {
+                'en': ['Grace Balance', 'Emma Core', 'Sophia Stretch'],
+                'el': ['Γκρέις Ισορροπία', 'Έμμα Κορμός', 'Σοφία Τέντωμα']
+            },
             'price_per_hour': 28
         },
         {
-            'name_en': 'Martial Arts Dojo',
-            'name_el': 'Ντότζο Πολεμικών Τεχνών',
+            'name': {'en': 'Martial Arts Dojo', 'el': 'Ντότζο Πολεμικών Τεχνών'},
             'capacity': 16,
             'current_users': 2,
             'status': 'Available',
-            'equipment_en': ['Mats', 'Makiwara Boards', 'Wooden Dummies', 'Weapons Rack'],
-            'equipment_el': ['Στρώματα', 'Πίνακες Makiwara', 'Ξύλινα Ομοιώματα', 'Στάση Όπλων'],
+            'equipment': {
+                'en': ['Mats', 'Makiwara Boards', 'Wooden Dummies', 'Weapons Rack'],
+                'el': ['Στρώματα', 'Πίνακες Makiwara', 'Ξύλινα Ομοιώματα', 'Στάση Όπλων']
+            },
             'icon': '🥋',
             'color': '#B22222',
             'is_bookable': True,
-            'trainers_en': ['Sensei Tanaka', 'Master Lee', 'Sifu Chen'],
-            'trainers_el': ['Σενσέι Τανάκα', 'Μάστερ Λι', 'Σίφου Τσεν'],
+            'trainers': {
+                'en': ['Sensei Tanaka', 'Master Lee', 'Sifu Chen'],
+                'el': ['Σενσέι Τανάκα', 'Μάστερ Λι', 'Σίφου Τσεν']
+            },
             'price_per_hour': 40
         }
     ]
     
-    for area_data in areas:
-        area = GymArea(tenant_id=tenant_id, **area_data)
-        db.session.add(area)
+    rows, texts = GymArea.split_texts(dict(area_data, tenant_id=tenant_id) for area_data in areas)
+    db.session.execute(insert(GymArea), rows)
+    db.session.execute(insert(LocalizedText), texts)
 
 def create_workout_programs(tenant_id):
     """Create workout programs"""
     programs = [
         {
-            'name_en': 'Beast Mode Strength',
-            'name_el': 'Προπόνηση Δύναμης Θηρίου',
+            'name': {'en': 'Beast Mode Strength', 'el': 'Προπόνηση Δύναμης Θηρίου'},
             'duration': '45 min',
             'difficulty': 'Advanced',
             'calories': 400,
@@ -264,8 +284,7 @@ def create_workout_programs(tenant_id):
             ]
         },
         {
-            'name_en': 'Cardio Burn',
-            'name_el': 'Καύση Καρδιοπροπόνησης',
+            'name': {'en': 'Cardio Burn', 'el': 'Καύση Καρδιοπροπόνησης'},
             'duration': '30 min',
             'difficulty': 'Intermediate',
             'calories': 350,
@@ -299,8 +318,7 @@ def create_workout_programs(tenant_id):
             ]
         },
         {
-            'name_en': 'Functional Flow',
-            'name_el': 'Λειτουργική Ροή',
+            'name': {'en': 'Functional Flow', 'el': 'Λειτουργική Ροή'},
             'duration': '40 min',
             'difficulty': 'Beginner',
             'calories': 280,
@@ -341,6 +359,6 @@ def create_workout_programs(tenant_id):
         }
     ]
     
-    for program_data in programs:
-        program = WorkoutProgram(tenant_id=tenant_id, **program_data)
-        db.session.add(program)
+    rows, texts = WorkoutProgram.split_texts(dict(program_data, tenant_id=tenant_id) for program_data in programs)
+    db.session.execute(insert(WorkoutProgram), rows)
+    db.session.execute(insert(LocalizedText), texts)
@@ -0,0 +1,168 @@
+"""
+Gym Status Stream
+Per-tenant fan-out hub pushing occupancy changes to SSE and long-poll clients
+"""
+from collections import deque
+import os
+import threading
+import time
+import uuid
+
+from app import db
+from app.services.catalog import catalog_cache
+from app.services.occupancy import occupancy
+
+
+def status_payload(area):
+    """Public status fields of an area with live state applied"""
+    return {
+        'id': area['id'],
+        'name': area['name'],
+        'status': area['status'],
+        'capacity': area['capacity'],
+        'current_users': area['current_users'],
+        'usage_percent': area['usage_percent']
+    }
+
+
+class TenantChannel:
+    """Latest status of one tenant plus a short log of numbered deltas"""
+
+    def __init__(self, log_size):
+        self.condition = threading.Condition()
+        self.seq = 0
+        self.state = None
+        self.events = deque(maxlen=log_size)
+        self.polled_at = 0.0
+        self.stale = True
+
+
+class StatusHub:
+    """Computes each tenant's status once per poll interval and shares it.
+
+    Clients never query on their own: whichever waiting client wakes first
+    refreshes the channel, records the changed areas under a new sequence
+    number and wakes everyone else. Only primitives from `threading` are
+    used, so the hub also cooperates with gevent workers.
+    """
+
+    def __init__(self, app=None):
+        self.poll_interval = 2
+        self.heartbeat = 15
+        self.max_duration = 300
+        self.log_size = 256
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._epoch = None
+        self._epoch_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.poll_interval = app.config.get('STATUS_STREAM_POLL_INTERVAL', self.poll_interval)
+        self.heartbeat = app.config.get('STATUS_STREAM_HEARTBEAT', self.heartbeat)
+        self.max_duration = app.config.get('STATUS_STREAM_MAX_DURATION', self.max_duration)
+        app.extensions['status_hub'] = self
+
+    def hold_limit(self, environ):
+        """Longest a request may wait for changes, in seconds.
+
+        A sync worker (wsgi.multithread false) serves one request at a
+        time, so there SSE and long-poll requests are answered at once and
+        clients reconnect instead of holding the worker.
+        """
+        return self.max_duration if environ.get('wsgi.multithread', True) else 0
+
+    @property
+    def epoch(self):
+        """Boot id of this process: sequence numbers are only comparable within one process"""
+        if self._epoch_pid != os.getpid():
+            self._epoch, self._epoch_pid = uuid.uuid4().hex[:12], os.getpid()
+        return self._epoch
+
+    def event_id(self, seq):
+        """Id sent to clients for `seq`, as `<epoch>-<seq>`"""
+        return f'{self.epoch}-{seq}'
+
+    def parse_event_id(self, value):
+        """Sequence number of an id from this process, or None (the client needs a snapshot)"""
+        epoch, _, seq = (value or '').rpartition('-')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def channel(self, tenant_id):
+        with self._lock:
+            channel = self._channels.get(tenant_id)
+            if channel is None:
+                channel = self._channels[tenant_id] = TenantChannel(self.log_size)
+            return channel
+
+    def notify(self, tenant_id):
+        """Mark a tenant's status as changed and wake its subscribers"""
+        channel = self.channel(tenant_id)
+        with channel.condition:
+            channel.stale = True
+            channel.condition.notify_all()
+
+    def _refresh(self, tenant_id, channel):
+        """Recompute the tenant status if due (caller holds the condition)"""
+        if not channel.stale and time.monotonic() - channel.polled_at < self.poll_interval:
+            return
+        areas = [status_payload(area)
+                 for area in occupancy.with_live_state(catalog_cache.areas(tenant_id))]
+        # Do not keep a pooled connection checked out between polls
+        db.session.close()
+
+        channel.polled_at = time.monotonic()
+        channel.stale = False
+        state = {area['id']: area for area in areas}
+        if channel.state is None:
+            channel.state = state
+            return
+
+        changes = [{
+            'id': area['id'],
+            'current_users': area['current_users'],
+            'status': area['status'],
+            'usage_percent': area['usage_percent']
+        } for area_id, area in state.items() if channel.state.get(area_id) != area]
+        channel.state = state
+        if changes:
+            channel.seq += 1
+            channel.events.append((channel.seq, changes))
+            channel.condition.notify_all()
+
+    def snapshot(self, tenant_id):
+        """Return (seq, areas) with the full current status"""
+        channel = self.channel(tenant_id)
+        with channel.condition:
+            self._refresh(tenant_id, channel)
+            return channel.seq, list(channel.state.values())
+
+    def _events_since(self, channel, seq):
+        if seq == channel.seq:
+            return []
+        if seq > channel.seq or not channel.events or channel.events[0][0] > seq + 1:
+            return None
+        return [event for event in channel.events if event[0] > seq]
+
+    def wait(self, tenant_id, seq, timeout):
+        """Block until there are deltas after `seq` or `timeout` passes.
+
+        Returns a list of (seq, changes), an empty list on timeout, or None
+        if `seq` is no longer in the log and the client needs a snapshot.
+        """
+        channel = self.channel(tenant_id)
+        deadline = time.monotonic() + timeout
+        with channel.condition:
+            while True:
+                self._refresh(tenant_id, channel)
+                events = self._events_since(channel, seq)
+                remaining = deadline - time.monotonic()
+                if events is None or events or remaining <= 0:
+                    return events
+                channel.condition.wait(min(remaining, self.poll_interval))
+
+
+status_hub = StatusHub()
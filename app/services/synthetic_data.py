@@ -0,0 +1,200 @@
+"""
+Synthetic Data Generator
+Deterministic, scalable tenants/members/bookings for load testing
+"""
+from datetime import date, datetime, time, timedelta
+import random
+import uuid
+
+from sqlalchemy import insert
+
+from app import db
+from app.models import Tenant, User, GymArea, WorkoutProgram, Booking, WorkoutSession, LocalizedText
+from app.services.booking_index import IntervalBucket, time_to_minutes
+from app.utils.passwords import passwords
+
+SYNTHETIC_PASSWORD = 'bench123'
+SUBDOMAIN_PREFIX = 'bench-'
+
+AREA_TYPES = [
+    ('Strength Zone', 'Ζώνη Δύναμης', '💪'),
+    ('Cardio Arena', 'Αρένα Καρδιο', '🏃'),
+    ('Yoga Studio', 'Στούντιο Γιόγκα', '🧘'),
+    ('Spin Room', 'Αίθουσα Spinning', '🚴'),
+    ('Boxing Ring', 'Ρινγκ Πυγμαχίας', '🥊'),
+    ('Pool', 'Πισίνα', '🏊'),
+]
+
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+
+
+class SyntheticDataGenerator:
+    """Generates a reproducible data set of any size.
+
+    The same seed, sizes and anchor date always yield the same rows (ids
+    included). Rows are written with multi-row INSERTs in chunks instead of
+    one ORM object at a time.
+    """
+
+    def __init__(self, tenants=1, members=100, areas=6, programs=6, months=3,
+                 bookings_per_month=4, sessions_per_month=8, seed=42,
+                 anchor=None, chunk_size=5000):
+        self.tenants = tenants
+        self.members = members
+        self.areas = areas
+        self.programs = programs
+        self.months = months
+        self.bookings_per_month = bookings_per_month
+        self.sessions_per_month = sessions_per_month
+        self.anchor = anchor or date.today()
+        self.chunk_size = chunk_size
+        self.rng = random.Random(seed)
+        self.counts = {}
+
+    def _id(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def _insert(self, model, rows):
+        for start in range(0, len(rows), self.chunk_size):
+            db.session.execute(insert(model), rows[start:start + self.chunk_size])
+        self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+
+    def _insert_translated(self, model, rows):
+        rows, texts = model.split_texts(rows)
+        self._insert(model, rows)
+        self._insert(LocalizedText, texts)
+
+    def generate(self):
+        """Insert the whole data set and return row counts per table"""
+        # One hash shared by every synthetic user keeps generation fast
+        password_hash = passwords.hash(SYNTHETIC_PASSWORD)
+        for index in range(self.tenants):
+            self._generate_tenant(index, password_hash)
+            db.session.commit()
+        return self.counts
+
+    def _generate_tenant(self, index, password_hash):
+        now = datetime.utcnow()
+        tenant_id = self._id()
+        self._insert(Tenant, [{
+            'id': tenant_id,
+            'name': f'Benchmark Gym {index + 1}',
+            'subdomain': f'{SUBDOMAIN_PREFIX}{index + 1}',
+            'email': f'owner{index + 1}@bench.example',
+            'subscription_plan': 'premium',
+            'subscription_status': 'active',
+            'subscription_start': now,
+            'settings': {'timezone': 'Europe/Athens', 'currency': 'EUR',
+                         'opening_hours': '06:00-23:00', 'languages': ['en', 'el']},
+            'created_at': now,
+            'updated_at': now
+        }])
+
+        users = [{
+            'id': self._id(), 'tenant_id': tenant_id, 'username': 'admin',
+            'email': f'admin{index + 1}@bench.example', 'password_hash': password_hash,
+            'role': 'admin', 'is_active': True, 'created_at': now, 'updated_at': now
+        }]
+        for member in range(self.members):
+            users.append({
+                'id': self._id(), 'tenant_id': tenant_id, 'username': f'member{member + 1}',
+                'email': f'member{member + 1}.{index + 1}@bench.example',
+                'password_hash': password_hash, 'member_id': f'{member + 1:06d}',
+                'role': 'member', 'first_name': 'Member', 'last_name': str(member + 1),
+                'total_workouts': 0, 'calories_burned': 0, 'streak_days': 0,
+                'membership_level': self.rng.choice(['Basic', 'Premium']),
+                'is_active': True, 'language_preference': self.rng.choice(['en', 'el']),
+                'created_at': now, 'updated_at': now
+            })
+        self._insert(User, users)
+        member_ids = [user['id'] for user in users[1:]]
+
+        areas = []
+        for area in range(self.areas):
+            name_en, name_el, icon = AREA_TYPES[area % len(AREA_TYPES)]
+            suffix = f' {area // len(AREA_TYPES) + 1}' if area >= len(AREA_TYPES) else ''
+            capacity = self.rng.randint(10, 40)
+            areas.append({
+                'id': self._id(), 'tenant_id': tenant_id,
+                'name': {'en': name_en + suffix, 'el': name_el + suffix},
+                'capacity': capacity, 'current_users': self.rng.randint(0, capacity),
+                'status': 'Available', 'icon': icon, 'color': '#8B0000',
+                'equipment': {'en': ['Dumbbells', 'Mats'], 'el': ['Αλτήρες', 'Στρώματα']},
+                'is_bookable': area % 2 == 0, 'price_per_hour': float(self.rng.choice([0, 15, 25])),
+                'trainers': {'en': ['Coach A', 'Coach B'], 'el': ['Προπονητής Α', 'Προπονητής Β']},
+                'created_at': now, 'updated_at': now
+            })
+        self._insert_translated(GymArea, areas)
+        bookable_ids = [area['id'] for area in areas if area['is_bookable']]
+
+        programs = []
+        for program in range(self.programs):
+            programs.append({
+                'id': self._id(), 'tenant_id': tenant_id,
+                'name': {'en': f'Program {program + 1}', 'el': f'Πρόγραμμα {program + 1}'},
+                'duration': f'{self.rng.choice([30, 45, 60])} min',
+                'difficulty': self.rng.choice(DIFFICULTIES),
+                'calories': self.rng.randint(200, 700), 'icon': '🔥', 'color': '#8B0000',
+                'exercises': [{'en': 'Squats', 'el': 'Καθίσματα'}, {'en': 'Push-ups', 'el': 'Κάμψεις'}],
+                'created_at': now, 'updated_at': now
+            })
+        self._insert_translated(WorkoutProgram, programs)
+
+        self._generate_activity(member_ids, bookable_ids, programs)
+
+    def _generate_activity(self, member_ids, area_ids, programs):
+        days = self.months * 30
+        first_day = self.anchor - timedelta(days=days)
+        now = datetime.utcnow()
+
+        bookings = []
+        # Confirmed intervals per (area, day): the database rejects overlapping confirmed bookings
+        taken = {}
+        if area_ids:
+            per_member = self.bookings_per_month * self.months
+            for user_id in member_ids:
+                for _ in range(per_member):
+                    # A few bookings land in the coming two weeks
+                    day = first_day + timedelta(days=self.rng.randint(0, days + 14))
+                    booking = {
+                        'id': self._id(), 'user_id': user_id,
+                        'gym_area_id': self.rng.choice(area_ids), 'booking_date': day,
+                        'start_time': time(self.rng.randint(6, 21), self.rng.choice([0, 30])),
+                        'duration_minutes': self.rng.choice([30, 60, 90]),
+                        'price': float(self.rng.choice([0, 15, 25])),
+                        'status': 'confirmed' if self.rng.random() < 0.9 else 'cancelled',
+                        'created_at': now, 'updated_at': now
+                    }
+                    if booking['status'] == 'confirmed':
+                        bucket = taken.setdefault((booking['gym_area_id'], day), IntervalBucket())
+                        start = time_to_minutes(booking['start_time'])
+                        if bucket.overlaps(start, start + booking['duration_minutes']):
+                            booking['status'] = 'cancelled'
+                        else:
+                            bucket.add(start, start + booking['duration_minutes'], booking['id'])
+                    bookings.append(booking)
+                if len(bookings) >= self.chunk_size:
+                    self._insert(Booking, bookings)
+                    bookings = []
+            self._insert(Booking, bookings)
+
+        sessions = []
+        per_member = self.sessions_per_month * self.months
+        for user_id in member_ids:
+            for _ in range(per_member):
+                program = self.rng.choice(programs) if programs else None
+                started = datetime.combine(first_day + timedelta(days=self.rng.randint(0, days)),
+                                           time(self.rng.randint(6, 21), self.rng.randint(0, 59)))
+                seconds = self.rng.randint(20, 90) * 60
+                sessions.append({
+                    'id': self._id(), 'user_id': user_id,
+                    'workout_program_id': program['id'] if program else None,
+                    'start_time': started, 'end_time': started + timedelta(seconds=seconds),
+                    'duration_seconds': seconds,
+                    'calories_burned': program['calories'] if program else 300,
+                    'status': 'completed', 'created_at': now, 'updated_at': now
+                })
+            if len(sessions) >= self.chunk_size:
+                self._insert(WorkoutSession, sessions)
+                sessions = []
+        self._insert(WorkoutSession, sessions)
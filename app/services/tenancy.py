@@ -0,0 +1,188 @@
+"""
+Tenant Resolution
+Maps the request's subdomain, tenant header or session to a cached tenant record
+"""
+from types import SimpleNamespace
+
+from flask import g, jsonify, request, session
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import Session
+
+from app.models import Tenant
+from app.services.cache import MemoryCache
+
+# Subscription states that lock a gym out of the app
+INACTIVE_STATUSES = ('suspended', 'cancelled')
+# Paths served without a tenant gate
+EXEMPT_PREFIXES = ('/static/', '/metrics', '/logout')
+# Cached marker for keys that match no tenant
+MISSING = {}
+
+
+def tenant_record(tenant):
+    """The cached subset of a tenant row"""
+    return {
+        'id': tenant.id,
+        'subdomain': tenant.subdomain,
+        'name': tenant.name,
+        'status': tenant.subscription_status or 'active',
+        'plan': tenant.subscription_plan,
+        'settings': tenant.settings or {}
+    }
+
+
+def rejection(tenant, authenticated_tenant_id=None):
+    """(message, status code) if requests for this tenant must be refused.
+
+    `authenticated_tenant_id` is the gym of the logged-in session or
+    bearer token; a header or subdomain naming another gym is refused.
+    """
+    if tenant is None:
+        return 'Unknown gym', 404
+    if tenant.status in INACTIVE_STATUSES:
+        return 'This gym account is not active', 403
+    if authenticated_tenant_id and tenant.id != authenticated_tenant_id:
+        return 'Not a member of this gym', 403
+    return None
+
+
+def token_tenant_id(authorization):
+    """Gym claimed by a valid 'Bearer <token>' header (access or refresh), or None"""
+    scheme, _, token = (authorization or '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        return decode_token(token).get('tenant_id')
+    except (JWTExtendedException, PyJWTError):
+        return None
+
+
+class TenantResolver:
+    """Resolves the tenant once per request and stores it on `g.tenant`.
+
+    Lookups go through a bounded LRU+TTL cache keyed by tenant id and
+    subdomain, including misses, so unknown or suspended gyms are turned
+    away before any view runs. Updates in this process drop the entry at
+    once; other workers pick them up within the TTL. Once a session or
+    token belongs to a gym, the header and subdomain may only name that
+    gym.
+    """
+
+    def __init__(self, app=None):
+        self.cache = MemoryCache()
+        self.header = 'X-Tenant-ID'
+        self.base_domain = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.cache = MemoryCache(max_entries=app.config.get('TENANT_CACHE_MAX_ENTRIES', 1024),
+                                 default_ttl=app.config.get('TENANT_CACHE_TTL', 60))
+        self.header = app.config.get('TENANT_HEADER', self.header)
+        self.base_domain = (app.config.get('TENANT_BASE_DOMAIN') or '').lower().strip('.') or None
+        app.before_request(self._resolve)
+        app.extensions['tenant_resolver'] = self
+
+    def get(self, key):
+        """Tenant record by id or subdomain, or None"""
+        if not key:
+            return None
+        record = self.cached(key)
+        if record is None:
+            record = self.store(key, Tenant.query.filter(
+                or_(Tenant.id == key, Tenant.subdomain == key)).first())
+        return SimpleNamespace(**record) if record else None
+
+    def cached(self, key):
+        """Cached record dict, MISSING for a known miss, None if not cached"""
+        return self.cache.get(f'tenant:{key}')
+
+    def store(self, key, tenant):
+        """Cache a looked-up Tenant row (or None) and return its record"""
+        if tenant is None:
+            self.cache.set(f'tenant:{key}', MISSING)
+            return MISSING
+        record = tenant_record(tenant)
+        self.cache.set(f"tenant:{record['id']}", record)
+        self.cache.set(f"tenant:{record['subdomain']}", record)
+        return record
+
+    def settings(self, tenant_id):
+        """Tenant settings (timezone, opening hours, ...)"""
+        tenant = self.get(tenant_id)
+        return tenant.settings if tenant else {}
+
+    def invalidate(self, *keys):
+        for key in keys:
+            self.cache.delete(f'tenant:{key}')
+
+    def subdomain(self, host):
+        """'demo' for demo.<base domain>, None for the bare domain or other hosts"""
+        if not self.base_domain:
+            return None
+        host = host.split(':', 1)[0].lower()
+        if not host.endswith('.' + self.base_domain):
+            return None
+        name = host[:-len(self.base_domain) - 1]
+        return name if name and '.' not in name and name != 'www' else None
+
+    @staticmethod
+    def authenticated_tenant_id():
+        """Gym of the bearer token if one is sent, else of the logged-in session"""
+        if request.headers.get('Authorization'):
+            return token_tenant_id(request.headers['Authorization'])
+        return session.get('tenant_id')
+
+    def _resolve(self):
+        g.tenant = None
+        if request.path.startswith(EXEMPT_PREFIXES):
+            return None
+        key = request.headers.get(self.header) or self.subdomain(request.host)
+        authenticated = self.authenticated_tenant_id() if key else None
+        if not key:
+            key = session.get('tenant_id')
+            if key and self.get(key) is None:
+                # Gym was removed since login; continue as an anonymous visitor
+                session.clear()
+                return None
+        if not key:
+            return None
+
+        tenant = self.get(key)
+        rejected = rejection(tenant, authenticated)
+        if rejected:
+            message, code = rejected
+            return jsonify({'success': False, 'message': message}), code
+        g.tenant = tenant
+        return None
+
+
+tenants = TenantResolver()
+
+
+def current_tenant():
+    """The tenant resolved for this request, or None"""
+    return g.get('tenant')
+
+
+@event.listens_for(Tenant, 'after_update')
+@event.listens_for(Tenant, 'after_delete')
+def _tenant_changed(mapper, connection, target):
+    session_ = Session.object_session(target)
+    if session_ is not None:
+        # A renamed subdomain must stop resolving under its old name too
+        keys = {target.id, target.subdomain, *inspect(target).attrs.subdomain.history.deleted}
+        session_.info.setdefault('tenants_dirty', set()).update(keys)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_dirty(session_):
+    tenants.invalidate(*session_.info.pop('tenants_dirty', ()))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty(session_):
+    session_.info.pop('tenants_dirty', None)
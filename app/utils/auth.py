@@ -0,0 +1,53 @@
+"""
+Authentication helpers
+Request-scoped access to the current user and their role
+"""
+from types import SimpleNamespace
+from flask import g, session, request, current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from sqlalchemy.orm import load_only
+from app import db
+from app.models import User
+
+
+def identity_claims(user):
+    """Claims carried in JWTs so authorization needs no database lookup"""
+    return {'role': user.role, 'tenant_id': user.tenant_id}
+
+
+def _build_identity(user_id, role, tenant_id):
+    """Load the active user's role/tenant, or take them from a signed session or
+    token when AUTH_TRUST_CLAIMS is set"""
+    if not (role and tenant_id) or not current_app.config.get('AUTH_TRUST_CLAIMS', False):
+        user = User.query.options(
+            load_only(User.id, User.role, User.tenant_id)
+        ).filter_by(id=user_id, is_active=True).first()
+        if not user:
+            return None
+        role, tenant_id = user.role, user.tenant_id
+    return SimpleNamespace(id=user_id, role=role, tenant_id=tenant_id)
+
+
+def get_identity():
+    """Return the authenticated identity (id, role, tenant_id) or None.
+
+    Resolved once per request and cached on `flask.g`.
+    """
+    if 'identity' not in g:
+        identity = None
+        if request.headers.get('Authorization'):
+            verify_jwt_in_request()
+            claims = get_jwt()
+            identity = _build_identity(get_jwt_identity(), claims.get('role'), claims.get('tenant_id'))
+        elif session.get('user_id'):
+            identity = _build_identity(session['user_id'], session.get('role'), session.get('tenant_id'))
+        g.identity = identity
+    return g.identity
+
+
+def get_current_user():
+    """Return the full User row for this request, loaded at most once"""
+    if 'current_user' not in g:
+        identity = get_identity()
+        g.current_user = db.session.get(User, identity.id) if identity else None
+    return g.current_user
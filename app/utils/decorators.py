@@ -3,16 +3,16 @@ Custom decorators for the application
 """
 from functools import wraps
 from flask import session, request, abort, jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.models import User
+from app.utils.auth import get_identity
+from app.services.tenancy import current_tenant
 
 def tenant_required(f):
-    """Decorator to ensure tenant_id is present"""
+    """Decorator to ensure the request resolved to a tenant"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        tenant_id = request.headers.get('X-Tenant-ID') or session.get('tenant_id')
-        if not tenant_id:
-            if request.is_json:
+        # Set by the tenant resolver (subdomain, X-Tenant-ID header or session)
+        if current_tenant() is None:
+            if request.is_json or request.path.startswith('/api/'):
                 return jsonify({'success': False, 'message': 'Tenant ID required'}), 400
             abort(400, 'Tenant ID required')
         return f(*args, **kwargs)
@@ -23,18 +23,12 @@ def role_required(*roles):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            # Check if using JWT or session
-            if request.headers.get('Authorization'):
-                verify_jwt_in_request()
-                user_id = get_jwt_identity()
-                user = User.query.get(user_id)
-            else:
-                user_id = session.get('user_id')
-                if not user_id:
-                    abort(401, 'Authentication required')
-                user = User.query.get(user_id)
+            # JWT or session identity, cached for the rest of the request
+            if not request.headers.get('Authorization') and not session.get('user_id'):
+                abort(401, 'Authentication required')
+            identity = get_identity()
             
-            if not user or user.role not in roles:
+            if not identity or identity.role not in roles:
                 abort(403, 'Insufficient permissions')
             
             return f(*args, **kwargs)
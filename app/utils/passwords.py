@@ -0,0 +1,206 @@
+"""
+Password hashing
+Pluggable hashers with per-environment cost settings and rehash support
+"""
+from contextlib import contextmanager
+import threading
+import time
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class ScryptHasher:
+    """Werkzeug scrypt hashes ('scrypt:n:r:p$salt$hash')"""
+    name = 'scrypt'
+
+    def __init__(self, n=2 ** 15, r=8, p=1):
+        self.method = f'scrypt:{n}:{r}:{p}'
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, password, hashed):
+        return check_password_hash(hashed, password)
+
+    def identify(self, hashed):
+        return hashed.startswith('scrypt:')
+
+    def needs_rehash(self, hashed):
+        return hashed.split('$', 1)[0] != self.method
+
+
+class Pbkdf2Hasher(ScryptHasher):
+    """Werkzeug PBKDF2 hashes ('pbkdf2:sha256:iterations$salt$hash')"""
+    name = 'pbkdf2'
+
+    def __init__(self, iterations=600000, digest='sha256'):
+        self.method = f'pbkdf2:{digest}:{iterations}'
+
+    def identify(self, hashed):
+        return hashed.startswith('pbkdf2:')
+
+
+class BcryptHasher:
+    """bcrypt hashes ('$2b$rounds$...'), as used by Flask-Bcrypt"""
+    name = 'bcrypt'
+
+    def __init__(self, rounds=12):
+        try:
+            import bcrypt
+        except ImportError:
+            raise RuntimeError('BcryptHasher requires the bcrypt package (pip install bcrypt)')
+        self._bcrypt = bcrypt
+        self.rounds = rounds
+
+    @staticmethod
+    def _encode(password):
+        # bcrypt only uses the first 72 bytes of a password
+        return password.encode('utf-8')[:72]
+
+    def hash(self, password):
+        return self._bcrypt.hashpw(self._encode(password), self._bcrypt.gensalt(self.rounds)).decode('ascii')
+
+    def verify(self, password, hashed):
+        try:
+            return self._bcrypt.checkpw(self._encode(password), hashed.encode('ascii'))
+        except ValueError:
+            return False
+
+    def identify(self, hashed):
+        return hashed.startswith('$2')
+
+    def needs_rehash(self, hashed):
+        return int(hashed.split('$')[2]) != self.rounds
+
+
+class Argon2Hasher:
+    """Argon2id hashes ('$argon2id$...'), requires argon2-cffi"""
+    name = 'argon2'
+
+    def __init__(self, time_cost=3, memory_cost=65536, parallelism=4):
+        try:
+            from argon2 import PasswordHasher
+            from argon2.exceptions import VerificationError, InvalidHashError
+        except ImportError:
+            raise RuntimeError('Argon2Hasher requires the argon2-cffi package (pip install argon2-cffi)')
+        self._hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost,
+                                      parallelism=parallelism)
+        self._errors = (VerificationError, InvalidHashError)
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def verify(self, password, hashed):
+        try:
+            return self._hasher.verify(hashed, password)
+        except self._errors:
+            return False
+
+    def identify(self, hashed):
+        return hashed.startswith('$argon2')
+
+    def needs_rehash(self, hashed):
+        return self._hasher.check_needs_rehash(hashed)
+
+
+HASHERS = {
+    'scrypt': ScryptHasher,
+    'pbkdf2': Pbkdf2Hasher,
+    'bcrypt': BcryptHasher,
+    'argon2': Argon2Hasher,
+}
+
+
+class HashingBusy(Exception):
+    """Every hashing slot stayed taken for the whole queue timeout"""
+
+
+class PasswordManager:
+    """Hashes with the configured hasher and verifies any supported format.
+
+    Hashers for the other formats are built once in init_app, skipping
+    those whose package is not installed. At most `workers` hashes run at
+    once in a process; callers wait up to `queue_timeout` seconds for a
+    slot and then get HashingBusy.
+    """
+
+    def __init__(self, app=None):
+        self.hasher = ScryptHasher()
+        self.hash_params = {}
+        self.verifiers = [self.hasher]
+        self.queue_timeout = 5
+        self._slots = threading.BoundedSemaphore(2)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        name = app.config.get('PASSWORD_HASHER', 'scrypt')
+        if name not in HASHERS:
+            raise ValueError(f'Unknown password hasher: {name}')
+        self.hash_params = app.config.get('PASSWORD_HASH_PARAMS', {})
+        self.hasher = HASHERS[name](**self.hash_params)
+        self.verifiers = [self.hasher]
+        for other, hasher_cls in HASHERS.items():
+            if other != name:
+                try:
+                    self.verifiers.append(hasher_cls())
+                except RuntimeError:
+                    continue
+        self.queue_timeout = app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', self.queue_timeout)
+        self._slots = threading.BoundedSemaphore(app.config.get('PASSWORD_HASH_WORKERS', 2))
+        app.extensions['passwords'] = self
+
+    def _hasher_for(self, hashed):
+        return next((hasher for hasher in self.verifiers if hasher.identify(hashed)), None)
+
+    @contextmanager
+    def _slot(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy()
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        with self._slot():
+            return self.hasher.hash(password)
+
+    def verify(self, password, hashed):
+        """Check a password against a stored hash of any supported scheme"""
+        hasher = self._hasher_for(hashed or '')
+        if hasher is None:
+            return False
+        with self._slot():
+            return hasher.verify(password, hashed)
+
+    def needs_rehash(self, hashed):
+        """True if the hash was made with another scheme or other cost settings"""
+        return not self.hasher.identify(hashed) or self.hasher.needs_rehash(hashed)
+
+
+passwords = PasswordManager()
+
+
+def benchmark(configs, duration=1.0):
+    """Measure hashes per second for a list of (hasher name, params) pairs"""
+    results = []
+    for name, params in configs:
+        try:
+            hasher = HASHERS[name](**params)
+        except RuntimeError as e:
+            results.append({'hasher': name, 'params': params, 'error': str(e)})
+            continue
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < duration:
+            hasher.hash('benchmark-password')
+            count += 1
+        elapsed = time.perf_counter() - started
+        results.append({
+            'hasher': name,
+            'params': params,
+            'hashes_per_sec': count / elapsed,
+            'ms_per_hash': elapsed / count * 1000
+        })
+    return results
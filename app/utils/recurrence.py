@@ -0,0 +1,95 @@
+"""
+Recurrence rules
+RRULE-style weekly rules (INTERVAL, BYDAY, COUNT, UNTIL), expanded lazily
+"""
+from datetime import datetime, timedelta
+
+WEEKDAY_CODES = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+MAX_INTERVAL = 52
+
+
+class WeeklyRule:
+    """A weekly recurrence such as FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;UNTIL=20261231.
+
+    Only the rule is stored; occurrences are generated from the series'
+    first day when asked for, so an open-ended rule costs nothing until a
+    window of it is expanded. Without BYDAY the series repeats on the
+    weekday it starts on.
+    """
+
+    def __init__(self, interval=1, weekdays=None, count=None, until=None):
+        if not 1 <= interval <= MAX_INTERVAL:
+            raise ValueError(f'INTERVAL must be between 1 and {MAX_INTERVAL}')
+        if count is not None and count < 1:
+            raise ValueError('COUNT must be positive')
+        if count is not None and until is not None:
+            raise ValueError('COUNT and UNTIL cannot be combined')
+        self.interval = interval
+        self.weekdays = sorted(set(weekdays)) if weekdays else None
+        self.count = count
+        self.until = until
+
+    @classmethod
+    def parse(cls, text):
+        """Parse an RRULE string; raises ValueError unless it is a weekly rule we support"""
+        parts = {}
+        for part in text.strip().removeprefix('RRULE:').split(';'):
+            if not part:
+                continue
+            name, sep, value = part.partition('=')
+            name = name.strip().upper()
+            if not sep or name in parts:
+                raise ValueError(f'Invalid RRULE part: {part}')
+            parts[name] = value.strip().upper()
+
+        if parts.pop('FREQ', None) != 'WEEKLY':
+            raise ValueError('Only FREQ=WEEKLY rules are supported')
+        interval = int(parts.pop('INTERVAL', '1'))
+        weekdays = None
+        if 'BYDAY' in parts:
+            codes = parts.pop('BYDAY').split(',')
+            unknown = [code for code in codes if code not in WEEKDAY_CODES]
+            if unknown:
+                raise ValueError(f"Invalid BYDAY: {', '.join(unknown)}")
+            weekdays = [WEEKDAY_CODES.index(code) for code in codes]
+        count = int(parts.pop('COUNT')) if 'COUNT' in parts else None
+        until = datetime.strptime(parts.pop('UNTIL')[:8], '%Y%m%d').date() if 'UNTIL' in parts else None
+        if parts:
+            raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(parts))}")
+        return cls(interval, weekdays, count, until)
+
+    def __str__(self):
+        text = f'FREQ=WEEKLY;INTERVAL={self.interval}'
+        if self.weekdays:
+            text += ';BYDAY=' + ','.join(WEEKDAY_CODES[day] for day in self.weekdays)
+        if self.count is not None:
+            text += f';COUNT={self.count}'
+        if self.until is not None:
+            text += f";UNTIL={self.until.strftime('%Y%m%d')}"
+        return text
+
+    def occurrences(self, starts_on, window_start=None, window_end=None):
+        """Yield the series' dates within [window_start, window_end], in order.
+
+        COUNT is counted from `starts_on`, so occurrences before the window
+        still use up the count. Without an end (window, UNTIL or COUNT)
+        the generator does not stop.
+        """
+        weekdays = self.weekdays or [starts_on.weekday()]
+        ends = [day for day in (self.until, window_end) if day is not None]
+        last = min(ends) if ends else None
+        week = starts_on - timedelta(days=starts_on.weekday())
+        seen = 0
+        while True:
+            for weekday in weekdays:
+                day = week + timedelta(days=weekday)
+                if day < starts_on:
+                    continue
+                if last is not None and day > last:
+                    return
+                seen += 1
+                if self.count is not None and seen > self.count:
+                    return
+                if window_start is None or day >= window_start:
+                    yield day
+            week += timedelta(weeks=self.interval)
@@ -0,0 +1,269 @@
+"""
+Serialization
+Precompiled row schemas and an orjson-backed JSON provider for API responses
+"""
+from datetime import date, time
+from decimal import Decimal
+from functools import partial
+import json
+import uuid
+
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+from sqlalchemy import JSON, Date, DateTime, Text, Time, and_, cast, func, select
+from sqlalchemy.orm import aliased
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+# orjson 3.9+ embeds already-encoded JSON as is
+_Fragment = getattr(orjson, 'Fragment', None)
+
+
+class RawJSON(str):
+    """Text that is already valid JSON and is written to the output as is
+    (decoded first where the encoder cannot embed it)"""
+    __slots__ = ()
+
+
+def _raw(text):
+    return None if text is None else RawJSON(text)
+
+
+def _loads(text):
+    return None if text is None else json.loads(text)
+
+
+def _hhmm(value):
+    return None if value is None else f'{value.hour:02d}:{value.minute:02d}'
+
+
+def _iso(value):
+    return None if value is None else value.isoformat()
+
+
+def _default(obj):
+    """Types neither encoder handles natively, encoded as Flask's default provider does"""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, time):
+        return obj.isoformat()
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    # Subclasses of builtins reach here from orjson (OPT_PASSTHROUGH_SUBCLASS)
+    for base in (dict, list, str, int, float):
+        if isinstance(obj, base):
+            return base(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider using orjson when installed, the json module otherwise.
+
+    Output matches Flask's default provider: dates and datetimes are
+    written as HTTP dates, and API code formats the values it wants in
+    ISO 8601 itself. RawJSON values (e.g. JSON column text selected
+    without decoding) are embedded as orjson Fragments when orjson
+    supports them, and decoded first otherwise.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.backend = 'orjson' if orjson is not None and app.config.get('JSON_BACKEND', 'orjson') == 'orjson' \
+            else 'json'
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj, kwargs.get('indent'), kwargs.get('sort_keys', self.sort_keys)).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        body = self._encode(obj, 2 if pretty else None, self.sort_keys)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+    def _encode(self, obj, indent, sort_keys):
+        if self.backend == 'orjson':
+            # RawJSON (a str subclass) and dates go to `default`, dates to be formatted as Flask does
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS | orjson.OPT_PASSTHROUGH_DATETIME
+            if sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            if _Fragment is None:
+                obj = _decode_raw(obj)
+            return orjson.dumps(obj, default=_orjson_default, option=option)
+        # The json module encodes str subclasses itself, so RawJSON is decoded beforehand
+        return json.dumps(_decode_raw(obj), default=_default, ensure_ascii=self.ensure_ascii,
+                          sort_keys=sort_keys, indent=indent,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def _orjson_default(obj):
+    if isinstance(obj, RawJSON):
+        return _Fragment(obj)
+    return _default(obj)
+
+
+def _decode_raw(obj):
+    """RawJSON values decoded, for encoders that cannot embed them"""
+    if isinstance(obj, RawJSON):
+        return json.loads(obj)
+    if isinstance(obj, dict):
+        return {key: _decode_raw(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_decode_raw(value) for value in obj]
+    return obj
+
+
+class LocalizedField:
+    """A translated field of a Translatable model, read from localized_texts.
+
+    `key` is the column holding the entity id (the model's id by default,
+    e.g. Booking.gym_area_id to name a booking's room without joining
+    gym_areas). Each language costs one outer join on the text table's
+    primary key; languages missing a translation fall back to the first.
+    """
+
+    def __init__(self, model, name, languages=None, key=None):
+        self.model = model
+        self.name = name
+        self._languages = tuple(languages) if languages else None
+        self.key = key if key is not None else model.id
+        self.is_json = name in model.localized_json
+
+    @property
+    def languages(self):
+        """Supported languages, default first (LANGUAGES and DEFAULT_LANGUAGE unless given)"""
+        if self._languages:
+            return self._languages
+        default = current_app.config.get('DEFAULT_LANGUAGE', 'en')
+        return (default,) + tuple(lang for lang in current_app.config.get('LANGUAGES', ()) if lang != default)
+
+    def _join(self, lang, alias_name):
+        from app.models import LocalizedText
+        text = aliased(LocalizedText, name=alias_name)
+        return text, and_(text.entity_type == self.model.__tablename__, text.entity_id == self.key,
+                          text.field == self.name, text.lang == lang)
+
+    def expression(self, lang, label=None):
+        """(column, joins) for this field in `lang`; joins are (target, onclause) pairs"""
+        label = label or self.name
+        languages = self.languages
+        if lang not in languages:
+            lang = languages[0]
+        text, onclause = self._join(lang, f'lt_{label}_{lang}')
+        if lang == languages[0]:
+            return text.value, [(text, onclause)]
+        default, default_onclause = self._join(languages[0], f'lt_{label}_{languages[0]}')
+        return func.coalesce(text.value, default.value), [(text, onclause), (default, default_onclause)]
+
+
+def localized(model, name, languages=None, key=None):
+    """A model's translated field, first language as the default"""
+    return LocalizedField(model, name, languages, key)
+
+
+def in_language(values, lang):
+    """A {language: value} field in `lang`, falling back to the default language as localized() does"""
+    value = (values or {}).get(lang)
+    if value is None:
+        value = (values or {}).get(current_app.config.get('DEFAULT_LANGUAGE', 'en'))
+    return value
+
+
+class Schema:
+    """A fixed mapping from selected columns to an API dict.
+
+    Fields map output keys to columns, or to localized() fields.
+    `select(lang)` returns the SELECT for one language (or all of them
+    when lang is None), joined to just the translations it needs, and
+    `serializer(lang)` a function that turns such a row into a dict,
+    driven by (key, row index, converter) entries built once per
+    language. Dates become ISO 8601 and times 'HH:MM'; with raw_json,
+    JSON values are selected as text and passed through to the response
+    unparsed.
+    """
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self._compiled = {}
+
+    @property
+    def languages(self):
+        return next((field.languages for field in self.fields.values()
+                     if isinstance(field, LocalizedField)), ())
+
+    def columns(self, lang=None, raw_json=False):
+        return self._compile(lang, raw_json)[0]
+
+    def serializer(self, lang=None, raw_json=False):
+        return self._compile(lang, raw_json)[1]
+
+    def dump(self, row, lang=None, raw_json=False):
+        return self._compile(lang, raw_json)[1](row)
+
+    def join(self, query, lang=None, raw_json=False):
+        """Add the translation joins to a select() or Query of `columns(lang)`"""
+        for target, onclause in self._compile(lang, raw_json)[2]:
+            query = query.outerjoin(target, onclause)
+        return query
+
+    def select(self, lang=None, raw_json=False):
+        return self.join(select(*self.columns(lang, raw_json)), lang, raw_json)
+
+    def _compile(self, lang, raw_json):
+        compiled = self._compiled.get((lang, raw_json))
+        if compiled is not None:
+            return compiled
+        if lang is not None and lang not in self.languages:
+            # One compiled entry for every unknown (default language) code
+            lang = self.languages[0] if self.languages else None
+        key = (lang, raw_json)
+        if key not in self._compiled:
+            columns, joins = [], []
+
+            def select_column(label, column, converter=None):
+                if isinstance(column.type, Time):
+                    converter = _hhmm
+                elif isinstance(column.type, (Date, DateTime)):
+                    converter = _iso
+                elif raw_json and isinstance(column.type, JSON):
+                    column, converter = cast(column, Text), _raw
+                columns.append(column.label(label))
+                return label, len(columns) - 1, converter
+
+            def select_text(label, field, code):
+                column, field_joins = field.expression(code, label)
+                joins.extend(field_joins)
+                return select_column(label, column, (_raw if raw_json else _loads) if field.is_json else None)
+
+            # A field with all languages is (name, None, its per-language entries)
+            entries = []
+            for name, column in self.fields.items():
+                if not isinstance(column, LocalizedField):
+                    entries.append(select_column(name, column))
+                elif lang is not None:
+                    entries.append((name,) + select_text(name, column, lang)[1:])
+                else:
+                    entries.append((name, None, tuple(
+                        (code,) + select_text(f'{name}_{code}', column, code)[1:] for code in column.languages
+                    )))
+            self._compiled[key] = (columns, partial(_dump_row, tuple(entries)), joins)
+        return self._compiled[key]
+
+
+def _dump_row(entries, row):
+    """Dict of `row` laid out by Schema entries (key, index, converter)"""
+    return {key: _dump_row(converter, row) if index is None
+            else row[index] if converter is None else converter(row[index])
+            for key, index, converter in entries}
@@ -0,0 +1,31 @@
+"""
+Tenant time
+Tenant-local dates and times from the `timezone` tenant setting
+"""
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+DEFAULT_TIMEZONE = 'UTC'
+
+
+def tenant_zone(settings):
+    """ZoneInfo for a tenant's `timezone` setting, UTC if unset or unknown"""
+    name = (settings or {}).get('timezone') or DEFAULT_TIMEZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def to_local(utc_datetime, zone):
+    """Naive tenant-local time of a naive UTC timestamp"""
+    return utc_datetime.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+
+
+def local_date(utc_datetime, zone):
+    """Tenant-local calendar day of a naive UTC timestamp"""
+    return to_local(utc_datetime, zone).date()
+
+
+def local_today(zone):
+    return datetime.now(zone).date()
@@ -1,119 +1,231 @@
 """
 Translation utilities
-Centralized translations for the application
+Per-language catalogs compiled to gettext .mo files and loaded on first use
 """
+from bisect import bisect_left
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
 
-translations = {
-    'en': {
-        'gym_name': 'YourGym',
-        'subtitle': 'Premium Fitness Experience',
-        'member_id': '👤 Member ID',
-        'password': '🔒 Password',
-        'enter_gym': 'Enter Gym',
-        'invalid_credentials': 'Invalid credentials! Please try again.',
-        'welcome_title': 'Welcome to Your Fitness Journey',
-        'welcome_subtitle': 'Push your limits, achieve your goals, become legendary.',
-        'total_workouts': 'Total Workouts',
-        'calories_burned': 'Calories Burned',
-        'day_streak': 'Day Streak',
-        'membership': 'Membership',
-        'gym_areas': 'Gym Areas',
-        'featured_workouts': 'Featured Workouts',
-        'members': 'members',
-        'start_workout': 'Start Workout',
-        'workout_timer': 'Workout Timer',
-        'logout': 'Logout',
-        'language': 'Language',
-        'available': 'Available',
-        'busy': 'Busy',
-        'full': 'Full',
-        'maintenance': 'Maintenance',
-        'class_in_session': 'Class in Session',
-        'beginner': 'Beginner',
-        'intermediate': 'Intermediate',
-        'advanced': 'Advanced',
-        'sets': 'sets',
-        'reps': 'reps',
-        'rest': 'Rest',
-        'exercises': 'exercises',
-        'cal': 'cal',
-        'start': 'Start',
-        'pause': 'Pause',
-        'reset': 'Reset',
-        'book_room': 'Book Room',
-        'room_booking': 'Room Booking',
-        'available_slots': 'Available Time Slots',
-        'select_time': 'Select Time',
-        'book_now': 'Book Now',
-        'booking_success': 'Booking successful!',
-        'booking_failed': 'Booking failed. Please try again.',
-        'your_bookings': 'Your Bookings',
-        'cancel_booking': 'Cancel',
-        'room_schedule': 'Room Schedule',
-        'time_slot': 'Time Slot',
-        'duration': 'Duration',
-        'trainer': 'Trainer',
-        'price': 'Price',
-        'minutes': 'min',
-        'booked': 'Booked',
-        'cancel': 'Cancel'
-    },
-    'el': {
-        'gym_name': 'YourGym',
-        'subtitle': 'Εμπειρία Premium Γυμναστικής',
-        'member_id': '👤 Κωδικός Μέλους',
-        'password': '🔒 Κωδικός Πρόσβασης',
-        'enter_gym': 'Είσοδος στο Γυμναστήριο',
-        'invalid_credentials': 'Λάθος στοιχεία! Παρακαλώ δοκιμάστε ξανά.',
-        'welcome_title': 'Καλώς ήρθατε στο Ταξίδι της Γυμναστικής σας',
-        'welcome_subtitle': 'Ξεπεράστε τα όριά σας, πετύχετε τους στόχους σας, γίνετε θρύλοι.',
-        'total_workouts': 'Συνολικές Προπονήσεις',
-        'calories_burned': 'Θερμίδες που Κάηκαν',
-        'day_streak': 'Συνεχόμενες Ημέρες',
-        'membership': 'Συνδρομή',
-        'gym_areas': 'Χώροι Γυμναστηρίου',
-        'featured_workouts': 'Προτεινόμενες Προπονήσεις',
-        'members': 'μέλη',
-        'start_workout': 'Έναρξη Προπόνησης',
-        'workout_timer': 'Χρονόμετρο Προπόνησης',
-        'logout': 'Αποσύνδεση',
-        'language': 'Γλώσσα',
-        'available': 'Διαθέσιμο',
-        'busy': 'Πολυσύχναστο',
-        'full': 'Γεμάτο',
-        'maintenance': 'Συντήρηση',
-        'class_in_session': 'Μάθημα σε Εξέλιξη',
-        'beginner': 'Αρχάριος',
-        'intermediate': 'Μεσαίος',
-        'advanced': 'Προχωρημένος',
-        'sets': 'σετ',
-        'reps': 'επαναλήψεις',
-        'rest': 'Ανάπαυση',
-        'exercises': 'ασκήσεις',
-        'cal': 'θερμ',
-        'start': 'Έναρξη',
-        'pause': 'Παύση',
-        'reset': 'Επαναφορά',
-        'book_room': 'Κράτηση Αίθουσας',
-        'room_booking': 'Κράτηση Αίθουσας',
-        'available_slots': 'Διαθέσιμες Ώρες',
-        'select_time': 'Επιλογή Ώρας',
-        'book_now': 'Κράτηση Τώρα',
-        'booking_success': 'Η κράτηση ολοκληρώθηκε επιτυχώς!',
-        'booking_failed': 'Η κράτηση απέτυχε. Παρακαλώ δοκιμάστε ξανά.',
-        'your_bookings': 'Οι Κρατήσεις σας',
-        'cancel_booking': 'Ακύρωση',
-        'room_schedule': 'Πρόγραμμα Αίθουσας',
-        'time_slot': 'Ωριαίο Διάστημα',
-        'duration': 'Διάρκεια',
-        'trainer': 'Γυμναστής',
-        'price': 'Τιμή',
-        'minutes': 'λεπτά',
-        'booked': 'Κρατημένο',
-        'cancel': 'Ακύρωση'
-    }
-}
-
-def get_translations(lang='en'):
-    """Get translations for a specific language"""
-    return translations.get(lang, translations['en'])
+from app.services.cache import MemoryCache
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'translations')
+MO_MAGIC = 0x950412de
+LANGUAGE_RE = re.compile(r'^[a-z]{2,3}(?:_[A-Z]{2})?$')
+
+
+def write_mo(messages, path):
+    """Write {key: text} as a gettext .mo file with keys in byte order"""
+    items = sorted((key.encode('utf-8'), text.encode('utf-8')) for key, text in messages.items())
+    count = len(items)
+    keys_offset = 28
+    values_offset = keys_offset + count * 8
+    data_offset = values_offset + count * 8
+
+    key_table, value_table, data = [], [], bytearray()
+    for key, _ in items:
+        key_table.append((len(key), data_offset + len(data)))
+        data += key + b'\0'
+    for _, text in items:
+        value_table.append((len(text), data_offset + len(data)))
+        data += text + b'\0'
+
+    header = struct.pack('<7I', MO_MAGIC, 0, count, keys_offset, values_offset, 0, 0)
+    tables = b''.join(struct.pack('<2I', *entry) for entry in key_table + value_table)
+    # Write to a temp file and rename so readers never map a partial catalog
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(header + tables + bytes(data))
+    os.replace(tmp_path, path)
+
+
+class MoCatalog:
+    """Read-only view of a sorted .mo file.
+
+    The file is memory-mapped and looked up by binary search over its key
+    table, so a language costs no Python objects beyond the keys actually
+    requested, and all workers share the same pages.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, _, self._count, keys_offset, values_offset = struct.unpack_from('<5I', self._data)
+        if magic != MO_MAGIC:
+            raise ValueError(f'{path} is not a little-endian .mo file')
+        self._keys = _Table(self._data, keys_offset, self._count)
+        self._values_offset = values_offset
+
+    def get(self, key, default=None):
+        encoded = key.encode('utf-8')
+        index = bisect_left(self._keys, encoded)
+        if index == self._count or self._keys[index] != encoded:
+            return default
+        length, offset = struct.unpack_from('<2I', self._data, self._values_offset + index * 8)
+        return self._data[offset:offset + length].decode('utf-8')
+
+    def keys(self):
+        return [self._keys[i].decode('utf-8') for i in range(self._count)]
+
+
+class _Table:
+    """Sequence of the byte strings in a .mo offset table (for bisect)"""
+
+    def __init__(self, data, offset, count):
+        self._data = data
+        self._offset = offset
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        length, offset = struct.unpack_from('<2I', self._data, self._offset + index * 8)
+        return self._data[offset:offset + length]
+
+
+class Messages:
+    """Translations for one language (and tenant), resolved key by key.
+
+    Templates use it like the old dict (`t.gym_name`, `t['gym_name']`);
+    missing keys fall back to the default language and then render empty.
+    """
+
+    __slots__ = ('lang', 'version', '_overrides', '_catalog', '_fallback')
+
+    def __init__(self, lang, catalog, fallback, overrides=None):
+        self.lang = lang
+        self._catalog = catalog
+        self._fallback = fallback if fallback is not catalog else None
+        self._overrides = overrides or {}
+        self.version = hashlib.sha1(json.dumps(self._overrides, sort_keys=True).encode('utf-8')
+                                    ).hexdigest()[:12] if self._overrides else ''
+
+    def get(self, key, default=None):
+        value = self._overrides.get(key)
+        if value is None:
+            value = self._catalog.get(key)
+        if value is None and self._fallback is not None:
+            value = self._fallback.get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __getattr__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise AttributeError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+class Translations:
+    """Compiles catalogs from app/translations/<lang>.json and serves them.
+
+    A language is compiled (when its .mo is missing or older than the
+    source) and mapped the first time it is requested. Tenants can
+    override strings with `settings['translations'][<lang>]`; the merged
+    view is cached per tenant and language until the settings change.
+    """
+
+    def __init__(self, app=None):
+        self.source_dir = SOURCE_DIR
+        self.compiled_dir = None
+        self.default_language = 'en'
+        self._catalogs = {}
+        self._plain = {}
+        self._lock = threading.Lock()
+        self._merged = MemoryCache(max_entries=1024, default_ttl=0)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.compiled_dir = app.config.get('TRANSLATIONS_COMPILED_DIR') or \
+            os.path.join(app.instance_path, 'translations')
+        self.default_language = app.config.get('DEFAULT_LANGUAGE', self.default_language)
+        self._merged = MemoryCache(max_entries=app.config.get('TRANSLATIONS_CACHE_MAX_ENTRIES', 1024),
+                                   default_ttl=0)
+        app.extensions['translations'] = self
+
+    def languages(self):
+        """Languages with a source catalog"""
+        return sorted(name[:-5] for name in os.listdir(self.source_dir) if name.endswith('.json'))
+
+    def compile(self, lang):
+        """Compile one language's source catalog; returns the .mo path"""
+        source = os.path.join(self.source_dir, f'{lang}.json')
+        with open(source, 'r', encoding='utf-8') as f:
+            messages = json.load(f)
+        path = os.path.join(self.compiled_dir, f'{lang}.mo')
+        write_mo(messages, path)
+        return path
+
+    def catalog(self, lang):
+        """The compiled catalog for a language, or None if there is no such language"""
+        catalog = self._catalogs.get(lang)
+        if catalog is None:
+            with self._lock:
+                catalog = self._catalogs.get(lang)
+                if catalog is None:
+                    # Unknown languages are remembered as False
+                    catalog = self._catalogs[lang] = self._load(lang) or False
+        return catalog or None
+
+    def _load(self, lang):
+        source = os.path.join(self.source_dir, f'{lang}.json')
+        if not LANGUAGE_RE.match(lang) or not os.path.exists(source):
+            return None
+        path = os.path.join(self.compiled_dir, f'{lang}.mo')
+        if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source):
+            try:
+                path = self.compile(lang)
+            except OSError:
+                # Read-only deploy without `flask compile-translations`: use the source as is
+                with open(source, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        return MoCatalog(path)
+
+    def messages(self, lang=None, tenant_settings=None, tenant_id=None):
+        """Messages for a language, with the tenant's overrides if any"""
+        catalog = self.catalog(lang) if lang else None
+        if catalog is None:
+            lang, catalog = self.default_language, self.catalog(self.default_language)
+        fallback = self.catalog(self.default_language)
+
+        overrides = ((tenant_settings or {}).get('translations') or {}).get(lang)
+        if not overrides or not tenant_id:
+            messages = self._plain.get(lang)
+            if messages is None:
+                messages = self._plain[lang] = Messages(lang, catalog, fallback)
+            return messages
+
+        # Settings dicts are replaced, not mutated, when a tenant is updated
+        key = f'{tenant_id}:{lang}'
+        cached = self._merged.get(key)
+        if cached is None or cached[0] is not overrides:
+            cached = (overrides, Messages(lang, catalog, fallback, overrides))
+            self._merged.set(key, cached)
+        return cached[1]
+
+
+translations = Translations()
+
+
+def get_translations(lang='en', tenant_id=None):
+    """Get translations for a specific language (and tenant overrides)"""
+    if tenant_id is None:
+        return translations.messages(lang)
+    from app.services.tenancy import tenants
+    return translations.messages(lang, tenants.settings(tenant_id), tenant_id)
@@ -0,0 +1,30 @@
+"""
+Upsert helper
+INSERT ... ON CONFLICT for counter tables on PostgreSQL and SQLite
+"""
+from app import db
+
+
+def upsert(table, rows, keys, accumulate=True, connection=None):
+    """Insert rows, adding to (or replacing) the other columns on key conflicts.
+
+    With `accumulate` each counter becomes `column + excluded.column` in the
+    same statement, so concurrent writers never lose increments.
+    """
+    if not rows:
+        return
+    connection = connection if connection is not None else db.session.connection()
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f'Upserts are not supported on the {dialect} dialect')
+
+    stmt = insert(table)
+    values = {}
+    for column in rows[0]:
+        if column not in keys:
+            values[column] = (table.c[column] + stmt.excluded[column]) if accumulate else stmt.excluded[column]
+    connection.execute(stmt.on_conflict_do_update(index_elements=list(keys), set_=values), rows)
@@ -0,0 +1,13 @@
+"""
+Gym SaaS ASGI Entry Point
+Async views for /api/gym-status and /api/available-slots, Flask for everything else:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 4
+    gunicorn asgi:app -k uvicorn.workers.UvicornWorker --workers 4
+Needs asgiref, uvicorn and aiosqlite (SQLite) or asyncpg (PostgreSQL).
+"""
+from app.asgi import create_asgi_app
+from run import app as flask_app
+
+app = create_asgi_app(flask_app=flask_app)
+
+__all__ = ['app']
@@ -9,6 +9,10 @@ echo "🔨 Building Gym SaaS Application for Render..."
 echo "📦 Installing dependencies..."
 pip install -r requirements.txt
 
+# Compile translation catalogs
+echo "🌍 Compiling translations..."
+FLASK_APP=run.py flask compile-translations
+
 # Run database migrations with smart handling
 echo "🗄️  Running database migrations..."
 export FLASK_APP=run.py
@@ -7,6 +7,39 @@ from datetime import timedelta
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+
+def engine_options(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI, sized from the environment.
+
+    Every gunicorn worker has its own pool, so the database sees up to
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    """
+    if database_uri.startswith('sqlite'):
+        if database_uri in ('sqlite://', 'sqlite:///:memory:'):
+            return {}
+        # SQLite allows one writer at a time; PRAGMAs are applied per connection
+        return {
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 0)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        }
+
+    options = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        # Recycle before server/proxy idle timeouts; ping to drop dead connections
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
+    if database_uri.startswith('postgresql'):
+        options['connect_args'] = {
+            'application_name': os.getenv('DB_APPLICATION_NAME', 'gym-app'),
+            'options': f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))}",
+        }
+    return options
+
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -15,28 +48,126 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Authorize from role/tenant stored in the signed session or JWT claims instead of
+    # loading the user. Off by default: with it on, a demoted or deactivated user keeps
+    # their access until the session or access token expires
+    AUTH_TRUST_CLAIMS = os.getenv('AUTH_TRUST_CLAIMS', 'false').lower() == 'true'
+    
+    # Password hashing: scrypt, pbkdf2, bcrypt or argon2 (argon2-cffi)
+    # Existing hashes keep working and are upgraded on the next login
+    PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'scrypt')
+    PASSWORD_HASH_PARAMS = {}
+    # Hashes computed at once per worker process (memory-hard hashes are costly in bulk);
+    # further logins wait up to PASSWORD_HASH_QUEUE_TIMEOUT seconds, then get a 503
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+    
+    # SQLite connection PRAGMAs (WAL lets readers run alongside the single writer)
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    
+    # Async API tier (asgi.py); derived from the main database URL unless set
+    ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URL')
+    
     # Multi-tenancy settings
     TENANT_HEADER = 'X-Tenant-ID'
+    # Requests to <subdomain>.<TENANT_BASE_DOMAIN> resolve to that gym (e.g. gymapp.com)
+    TENANT_BASE_DOMAIN = os.getenv('TENANT_BASE_DOMAIN')
+    # Per-worker cache of tenant records used by the tenant resolver
+    TENANT_CACHE_TTL = int(os.getenv('TENANT_CACHE_TTL', 60))
+    TENANT_CACHE_MAX_ENTRIES = 1024
+    
+    # JSON responses: orjson (falls back to the json module if not installed) or json
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'orjson')
+    
+    # HTTP caching: Cache-Control per endpoint (ETags come from the views' validators)
+    HTTP_CACHE_CONTROL = {
+        'api.gym_status': 'private, no-cache',
+        'api.get_user_bookings': 'private, no-cache',
+        'api.get_available_slots': 'private, no-cache',
+        'api.list_areas': 'private, max-age=60',
+        'api.list_workouts': 'private, max-age=60',
+        'member.dashboard': 'private, no-cache',
+    }
+    # Responses from this size up are gzip/brotli compressed (0 disables; brotli needs the brotli package)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
     
     # Pagination
     ITEMS_PER_PAGE = 20
     MAX_ITEMS_PER_PAGE = 100
     
+    # Booking conflict index (seconds before a cached area/day is rebuilt)
+    BOOKING_INDEX_TTL = int(os.getenv('BOOKING_INDEX_TTL', 60))
+    BOOKING_INDEX_MAX_BUCKETS = 10000
+    # Booking writes retried on serialization failures, deadlocks and busy slots (full jitter, seconds)
+    BOOKING_RETRY_ATTEMPTS = int(os.getenv('BOOKING_RETRY_ATTEMPTS', 5))
+    BOOKING_RETRY_BASE_DELAY = 0.01
+    BOOKING_RETRY_MAX_DELAY = 0.25
+    # PostgreSQL lock_timeout inside a booking transaction
+    BOOKING_LOCK_TIMEOUT_MS = int(os.getenv('BOOKING_LOCK_TIMEOUT_MS', 2000))
+    # Bookings accepted by one batch request
+    BOOKING_BATCH_MAX_ITEMS = 100
+    # Recurring series: occurrences are booked this many days ahead
+    BOOKING_SERIES_HORIZON_DAYS = int(os.getenv('BOOKING_SERIES_HORIZON_DAYS', 28))
+    
+    # Catalog cache (gym areas / workout programs): memory, filesystem or redis
+    CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'memory')
+    CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 300))
+    CATALOG_CACHE_MAX_ENTRIES = 1024
+    CATALOG_CACHE_DIR = os.getenv('CATALOG_CACHE_DIR', os.path.join(basedir, '..', 'instance', 'cache'))
+    CATALOG_CACHE_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Dashboard fragments (area cards, workouts) cached per tenant/language/catalog version
+    FRAGMENT_CACHE_ENABLED = os.getenv('FRAGMENT_CACHE_ENABLED', 'true').lower() == 'true'
+    # Compiled Jinja templates shared by all workers (empty disables)
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv('TEMPLATE_BYTECODE_CACHE_DIR',
+                                            os.path.join(basedir, '..', 'instance', 'cache', 'jinja'))
+    
+    # Live occupancy counters: redis (shared by every worker; the production default) or memory
+    # (one process only: refused when WEB_CONCURRENCY > 1)
+    OCCUPANCY_BACKEND = os.getenv('OCCUPANCY_BACKEND', 'redis' if os.getenv('REDIS_URL') else 'memory')
+    OCCUPANCY_REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    OCCUPANCY_FLUSH_INTERVAL = int(os.getenv('OCCUPANCY_FLUSH_INTERVAL', 30))
+    
+    # Gunicorn worker processes (gunicorn reads the same variable for its --workers default)
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+    
+    # Gym status push (SSE / long-poll); streams need gthread or gevent workers (see Procfile),
+    # under sync workers they are answered at once and clients reconnect
+    STATUS_STREAM_POLL_INTERVAL = 2
+    STATUS_STREAM_HEARTBEAT = 15
+    STATUS_STREAM_MAX_DURATION = int(os.getenv('STATUS_STREAM_MAX_DURATION', 300))
+    
     # File uploads
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     
-    # Localization
+    # Instrumentation (/metrics, Server-Timing header)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    # Require 'Authorization: Bearer <token>'; without a token /metrics is only served in debug/testing
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    METRICS_SLOW_QUERY_THRESHOLD = float(os.getenv('METRICS_SLOW_QUERY_THRESHOLD', 0.1))
+    
+    # Localization (catalog sources in app/translations/<lang>.json)
     LANGUAGES = ['en', 'el']
     DEFAULT_LANGUAGE = 'en'
+    # Compiled .mo catalogs (default: instance/translations); built on first use or by `flask compile-translations`
+    TRANSLATIONS_COMPILED_DIR = os.getenv('TRANSLATIONS_COMPILED_DIR')
+    TRANSLATIONS_CACHE_MAX_ENTRIES = 1024
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv('DEV_DATABASE_URL', 
                                         'sqlite:///' + os.path.join(basedir, '..', 'gym_dev.db'))
-    SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    # Per-query timings are available from /metrics; echo only when asked to
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'false').lower() == 'true'
 
 class ProductionConfig(Config):
     """Production configuration"""
@@ -46,8 +177,12 @@ class ProductionConfig(Config):
     if database_url and database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql://', 1)
     SQLALCHEMY_DATABASE_URI = database_url
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(database_url)
     SQLALCHEMY_ECHO = False
     
+    # Several workers share the live counts through Redis
+    OCCUPANCY_BACKEND = os.getenv('OCCUPANCY_BACKEND', 'redis')
+    
     # Security settings for production
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
@@ -58,6 +193,10 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    
+    # Cheap hashes keep test logins fast
+    PASSWORD_HASHER = 'pbkdf2'
+    PASSWORD_HASH_PARAMS = {'iterations': 1000}
 
 config = {
     'development': DevelopmentConfig,
@@ -0,0 +1,66 @@
+"""Reject overlapping confirmed bookings in the database
+
+Revision ID: a7d2c9e4f6b1
+Revises: f3c8a1d5b7e9
+Create Date: 2026-10-18 22:41:05.804126
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2c9e4f6b1'
+down_revision = 'f3c8a1d5b7e9'
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = 'bookings_confirmed_no_overlap'
+
+SQLITE_OVERLAP = (
+    "SELECT RAISE(ABORT, '" + CONSTRAINT + "') WHERE EXISTS ("
+    "SELECT 1 FROM bookings AS other "
+    "WHERE other.gym_area_id = NEW.gym_area_id AND other.booking_date = NEW.booking_date "
+    "AND other.status = 'confirmed' AND other.id != NEW.id "
+    "AND substr(other.start_time, 1, 2) * 60 + substr(other.start_time, 4, 2) "
+    "< substr(NEW.start_time, 1, 2) * 60 + substr(NEW.start_time, 4, 2) + NEW.duration_minutes "
+    "AND substr(other.start_time, 1, 2) * 60 + substr(other.start_time, 4, 2) + other.duration_minutes "
+    "> substr(NEW.start_time, 1, 2) * 60 + substr(NEW.start_time, 4, 2));"
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        overlapping = op.get_bind().execute(sa.text(
+            "SELECT count(*) FROM bookings a JOIN bookings b ON a.gym_area_id = b.gym_area_id "
+            "AND a.id < b.id "
+            "AND a.status = 'confirmed' AND b.status = 'confirmed' "
+            "AND a.booking_date + a.start_time < b.booking_date + b.start_time + b.duration_minutes * interval '1 minute' "
+            "AND b.booking_date + b.start_time < a.booking_date + a.start_time + a.duration_minutes * interval '1 minute'"
+        )).scalar()
+        if overlapping:
+            raise RuntimeError(f'{overlapping} pairs of confirmed bookings overlap; '
+                               'cancel the duplicates before running this migration')
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.execute(
+            f"ALTER TABLE bookings ADD CONSTRAINT {CONSTRAINT} EXCLUDE USING gist ("
+            "gym_area_id WITH =, "
+            "tsrange(booking_date + start_time, booking_date + start_time + duration_minutes * interval '1 minute') WITH &&"
+            ") WHERE (status = 'confirmed')"
+        )
+    elif dialect == 'sqlite':
+        op.execute(f"CREATE TRIGGER {CONSTRAINT}_insert BEFORE INSERT ON bookings "
+                   f"WHEN NEW.status = 'confirmed' BEGIN {SQLITE_OVERLAP} END")
+        op.execute(f"CREATE TRIGGER {CONSTRAINT}_update "
+                   f"BEFORE UPDATE OF gym_area_id, booking_date, start_time, duration_minutes, status ON bookings "
+                   f"WHEN NEW.status = 'confirmed' BEGIN {SQLITE_OVERLAP} END")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(f'ALTER TABLE bookings DROP CONSTRAINT IF EXISTS {CONSTRAINT}')
+    elif dialect == 'sqlite':
+        op.execute(f'DROP TRIGGER IF EXISTS {CONSTRAINT}_update')
+        op.execute(f'DROP TRIGGER IF EXISTS {CONSTRAINT}_insert')
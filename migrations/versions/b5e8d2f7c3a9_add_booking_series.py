@@ -0,0 +1,59 @@
+"""Add recurring booking series
+
+Revision ID: b5e8d2f7c3a9
+Revises: a7d2c9e4f6b1
+Create Date: 2026-10-18 23:52:18.440917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e8d2f7c3a9'
+down_revision = 'a7d2c9e4f6b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('booking_series',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('tenant_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('gym_area_id', sa.String(length=36), nullable=False),
+    sa.Column('rrule', sa.String(length=200), nullable=False),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('trainer_name', sa.String(length=200), nullable=True),
+    sa.Column('price', sa.Float(), nullable=False),
+    sa.Column('booked_through', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['gym_area_id'], ['gym_areas.id'], ),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_booking_series_tenant_status', 'booking_series', ['tenant_id', 'status'], unique=False)
+    op.create_index('ix_booking_series_user_id', 'booking_series', ['user_id'], unique=False)
+
+    # Not batch mode: rebuilding bookings on SQLite would drop its overlap triggers
+    op.add_column('bookings', sa.Column('series_id', sa.String(length=36), nullable=True))
+    if op.get_bind().dialect.name != 'sqlite':
+        op.create_foreign_key('fk_bookings_series_id', 'bookings', 'booking_series',
+                              ['series_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_bookings_series_date', 'bookings', ['series_id', 'booking_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_bookings_series_date', table_name='bookings')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.drop_constraint('fk_bookings_series_id', 'bookings', type_='foreignkey')
+    op.drop_column('bookings', 'series_id')
+
+    op.drop_index('ix_booking_series_user_id', table_name='booking_series')
+    op.drop_index('ix_booking_series_tenant_status', table_name='booking_series')
+    op.drop_table('booking_series')
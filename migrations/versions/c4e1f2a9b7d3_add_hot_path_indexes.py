@@ -0,0 +1,42 @@
+"""Add indexes for hot query paths
+
+Revision ID: c4e1f2a9b7d3
+Revises: bacc78d5551a
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1f2a9b7d3'
+down_revision = 'bacc78d5551a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_username_active', 'users', ['username', 'is_active'], unique=False)
+    op.create_index('ix_gym_areas_tenant_id', 'gym_areas', ['tenant_id'], unique=False)
+    op.create_index('ix_workout_programs_tenant_id', 'workout_programs', ['tenant_id'], unique=False)
+    op.create_index('ix_bookings_area_date_status', 'bookings',
+                    ['gym_area_id', 'booking_date', 'status'], unique=False)
+    op.create_index('ix_bookings_user_status_date', 'bookings',
+                    ['user_id', 'status', 'booking_date', 'start_time'], unique=False)
+    op.create_index('ix_bookings_confirmed_area_slot', 'bookings',
+                    ['gym_area_id', 'booking_date', 'start_time'], unique=False,
+                    postgresql_where=sa.text("status = 'confirmed'"),
+                    sqlite_where=sa.text("status = 'confirmed'"))
+    op.create_index('ix_workout_sessions_user_start', 'workout_sessions',
+                    ['user_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_workout_sessions_user_start', table_name='workout_sessions')
+    op.drop_index('ix_bookings_confirmed_area_slot', table_name='bookings')
+    op.drop_index('ix_bookings_user_status_date', table_name='bookings')
+    op.drop_index('ix_bookings_area_date_status', table_name='bookings')
+    op.drop_index('ix_workout_programs_tenant_id', table_name='workout_programs')
+    op.drop_index('ix_gym_areas_tenant_id', table_name='gym_areas')
+    op.drop_index('ix_users_username_active', table_name='users')
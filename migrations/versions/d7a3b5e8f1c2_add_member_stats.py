@@ -0,0 +1,39 @@
+"""Add member streak tracking and weekly/monthly stat rollups
+
+Revision ID: d7a3b5e8f1c2
+Revises: c4e1f2a9b7d3
+Create Date: 2026-10-18 18:05:27.640113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3b5e8f1c2'
+down_revision = 'c4e1f2a9b7d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_workout_date', sa.Date(), nullable=True))
+
+    op.create_table('member_stat_periods',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('workouts', sa.Integer(), nullable=False),
+    sa.Column('calories_burned', sa.Integer(), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'period', 'period_start')
+    )
+
+
+def downgrade():
+    op.drop_table('member_stat_periods')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('last_workout_date')
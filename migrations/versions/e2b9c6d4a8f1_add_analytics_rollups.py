@@ -0,0 +1,47 @@
+"""Add booking and workout rollup tables for reports
+
+Revision ID: e2b9c6d4a8f1
+Revises: d7a3b5e8f1c2
+Create Date: 2026-10-18 19:22:09.551870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9c6d4a8f1'
+down_revision = 'd7a3b5e8f1c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('booking_rollups',
+    sa.Column('tenant_id', sa.String(length=36), nullable=False),
+    sa.Column('grain', sa.String(length=4), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('gym_area_id', sa.String(length=36), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('cancellations', sa.Integer(), nullable=False),
+    sa.Column('booked_minutes', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'grain', 'bucket_start', 'gym_area_id')
+    )
+    op.create_table('workout_rollups',
+    sa.Column('tenant_id', sa.String(length=36), nullable=False),
+    sa.Column('grain', sa.String(length=4), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('workout_program_id', sa.String(length=36), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('calories_burned', sa.Integer(), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tenant_id', 'grain', 'bucket_start', 'workout_program_id')
+    )
+
+
+def downgrade():
+    op.drop_table('workout_rollups')
+    op.drop_table('booking_rollups')
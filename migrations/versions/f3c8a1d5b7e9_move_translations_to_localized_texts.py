@@ -0,0 +1,79 @@
+"""Move translated area and program columns to localized_texts
+
+Revision ID: f3c8a1d5b7e9
+Revises: e2b9c6d4a8f1
+Create Date: 2026-10-18 21:04:37.219533
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8a1d5b7e9'
+down_revision = 'e2b9c6d4a8f1'
+branch_labels = None
+depends_on = None
+
+LANGUAGES = ('en', 'el')
+# table -> [(field, old column type)]
+FIELDS = {
+    'gym_areas': [('name', sa.String(length=200)), ('description', sa.Text()),
+                  ('equipment', sa.JSON()), ('trainers', sa.JSON())],
+    'workout_programs': [('name', sa.String(length=200)), ('description', sa.Text())],
+}
+
+
+def upgrade():
+    op.create_table('localized_texts',
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.String(length=36), nullable=False),
+    sa.Column('field', sa.String(length=50), nullable=False),
+    sa.Column('lang', sa.String(length=10), nullable=False),
+    sa.Column('tenant_id', sa.String(length=36), nullable=False),
+    sa.Column('value', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entity_type', 'entity_id', 'field', 'lang')
+    )
+    op.create_index('ix_localized_texts_tenant_id', 'localized_texts', ['tenant_id'], unique=False)
+
+    for table, fields in FIELDS.items():
+        for field, _ in fields:
+            for lang in LANGUAGES:
+                # JSON columns are copied as their JSON text
+                op.execute(
+                    f"INSERT INTO localized_texts (entity_type, entity_id, field, lang, tenant_id, value) "
+                    f"SELECT '{table}', id, '{field}', '{lang}', tenant_id, CAST({field}_{lang} AS TEXT) "
+                    f"FROM {table} WHERE {field}_{lang} IS NOT NULL"
+                )
+        with op.batch_alter_table(table) as batch_op:
+            for field, _ in fields:
+                for lang in LANGUAGES:
+                    batch_op.drop_column(f'{field}_{lang}')
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    for table, fields in FIELDS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for field, column_type in fields:
+                for lang in LANGUAGES:
+                    batch_op.add_column(sa.Column(f'{field}_{lang}', column_type, nullable=True))
+        for field, column_type in fields:
+            for lang in LANGUAGES:
+                value = 'value'
+                if isinstance(column_type, sa.JSON) and postgresql:
+                    value = 'CAST(value AS JSON)'
+                op.execute(
+                    f"UPDATE {table} SET {field}_{lang} = (SELECT {value} FROM localized_texts "
+                    f"WHERE entity_type = '{table}' AND entity_id = {table}.id "
+                    f"AND field = '{field}' AND lang = '{lang}')"
+                )
+        for lang in LANGUAGES:
+            op.execute(f"UPDATE {table} SET name_{lang} = '' WHERE name_{lang} IS NULL")
+        with op.batch_alter_table(table) as batch_op:
+            for lang in LANGUAGES:
+                batch_op.alter_column(f'name_{lang}', existing_type=sa.String(length=200), nullable=False)
+
+    op.drop_index('ix_localized_texts_tenant_id', table_name='localized_texts')
+    op.drop_table('localized_texts')
@@ -3,6 +3,7 @@ Gym SaaS Application Entry Point
 Modern multi-tenant gym management system
 """
 import os
+import click
 from app import create_app, db
 from app.models import Tenant, User, GymArea, WorkoutProgram, Booking, WorkoutSession
 
@@ -36,6 +37,218 @@ def seed_demo_data():
     seed_all()
     print("Demo data seeded successfully!")
 
+@app.cli.command()
+@click.option('--tenants', default=1, help='Number of tenants')
+@click.option('--members', default=100, help='Members per tenant')
+@click.option('--areas', default=6, help='Gym areas per tenant')
+@click.option('--programs', default=6, help='Workout programs per tenant')
+@click.option('--months', default=3, help='Months of bookings and workout sessions')
+@click.option('--seed', default=42, help='Random seed (same seed, same data)')
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first')
+def generate_data(tenants, members, areas, programs, months, seed, reset):
+    """Generate a synthetic data set for load testing"""
+    from app.services.synthetic_data import SyntheticDataGenerator
+    if reset:
+        db.drop_all()
+        db.create_all()
+    generator = SyntheticDataGenerator(tenants=tenants, members=members, areas=areas,
+                                       programs=programs, months=months, seed=seed)
+    for table, count in generator.generate().items():
+        print(f"{table:20} {count:>10}")
+    
+    # Derived tables are not written by the generator's bulk inserts
+    from app.services.analytics import rebuild
+    from app.services.member_stats import recompute
+    from app.services.synthetic_data import SUBDOMAIN_PREFIX
+    for tenant in Tenant.query.filter(Tenant.subdomain.like(f'{SUBDOMAIN_PREFIX}%')).all():
+        rebuild(tenant.id)
+        recompute(tenant.id)
+
+@app.cli.command()
+@click.option('--iterations', default=100, help='Requests per endpoint')
+@click.option('--subdomain', default=None, help='Tenant to benchmark (default: bench-1)')
+@click.option('--baseline', default=os.path.join(app.instance_path, 'benchmark_baseline.json'),
+              help='Baseline file to compare against')
+@click.option('--save', is_flag=True, help='Store this run as the new baseline')
+def benchmark(iterations, subdomain, baseline, save):
+    """Benchmark the main endpoints against generated data"""
+    from app.services.benchmark import BenchmarkRunner, load_baseline, save_baseline, format_report
+    results = BenchmarkRunner(app, iterations=iterations, subdomain=subdomain).run()
+    print(format_report(results, load_baseline(baseline)))
+    if save:
+        save_baseline(baseline, results)
+        print(f"Baseline saved to {baseline}")
+
+@app.cli.command()
+@click.option('--sync-url', default='http://127.0.0.1:5055', help='Running Flask (WSGI) server')
+@click.option('--async-url', default='http://127.0.0.1:8000', help='Running asgi:app server')
+@click.option('--subdomain', default=None, help='Tenant to benchmark (default: bench-1)')
+@click.option('--requests', 'total', default=2000, help='Requests per endpoint and server')
+@click.option('--concurrency', default=32, help='Concurrent keep-alive clients')
+def benchmark_async(sync_url, async_url, subdomain, total, concurrency):
+    """Compare the sync and async API tiers over HTTP, side by side"""
+    from app.services.benchmark import http_load, format_comparison
+    from app.services.synthetic_data import SUBDOMAIN_PREFIX
+    tenant = Tenant.query.filter_by(subdomain=subdomain or f'{SUBDOMAIN_PREFIX}1').first()
+    if tenant is None:
+        raise click.ClickException("Tenant not found; run 'flask generate-data' first")
+    area = GymArea.query.filter_by(tenant_id=tenant.id, is_bookable=True).first()
+    paths = ['/api/gym-status'] + ([f'/api/available-slots/{area.id}'] if area else [])
+
+    results = {}
+    for path in paths:
+        for server, url in (('sync', sync_url), ('async', async_url)):
+            http_load(url, path, concurrency, concurrency, {'X-Tenant-ID': tenant.id})  # warm-up
+            results[(server, path)] = http_load(url, path, total, concurrency, {'X-Tenant-ID': tenant.id})
+    print(format_comparison(results))
+
+@app.cli.command()
+@click.option('--subdomain', default=None, help='Tenant to use (default: bench-1)')
+@click.option('--requests', 'total', default=200, help='Simultaneous booking requests for the same slot')
+@click.option('--duration', default=60, help='Booking length in minutes')
+def stress_booking(subdomain, total, duration):
+    """Fire parallel bookings at one slot and check that exactly one wins"""
+    from app.services.benchmark import booking_stress
+    try:
+        result = booking_stress(app, requests=total, subdomain=subdomain, duration=duration)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    print(f"{result['requests']} requests for {result['slot']}: {result['statuses']}")
+    print(f"latency p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms, max {result['max_ms']:.1f} ms")
+    print(f"confirmed bookings for the slot: {result['confirmed_bookings']}")
+    if result['confirmed_bookings'] != 1 or result['statuses'].get('500'):
+        raise click.ClickException('Double booking or server errors under contention')
+    print('✅ Exactly one booking won, no server errors')
+
+@app.cli.command()
+def compile_translations():
+    """Compile app/translations/*.json into .mo catalogs"""
+    from app.utils.translations import translations
+    for lang in translations.languages():
+        print(f"{lang}: {translations.compile(lang)}")
+
+def _import_tenant(tenant):
+    tenant_record = Tenant.query.filter(db.or_(Tenant.id == tenant, Tenant.subdomain == tenant)).first()
+    if tenant_record is None:
+        raise click.ClickException(f"Tenant '{tenant}' not found")
+    return tenant_record
+
+def _print_import_result(result):
+    for line_no, message in result.errors:
+        print(f"line {line_no}: {message}")
+    print(f"Imported {result.inserted} rows, skipped {result.skipped}")
+
+@app.cli.command()
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--tenant', required=True, help='Tenant id or subdomain')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (default: from file extension, else csv)')
+@click.option('--chunk-size', default=1000, help='Rows validated and written per batch')
+@click.option('--workers', default=None, type=int, help='Password hashing processes')
+@click.option('--default-password', default=None, help='Password for rows without one')
+@click.option('--dry-run', is_flag=True, help='Validate only, write nothing')
+def import_members(source, tenant, fmt, chunk_size, workers, default_password, dry_run):
+    """Import members from a CSV/JSONL file ('-' for stdin)"""
+    from app.services.bulk_import import BulkImporter, read_records
+    importer = BulkImporter(_import_tenant(tenant), chunk_size=chunk_size, workers=workers, dry_run=dry_run)
+    _print_import_result(importer.import_members(read_records(source, fmt), default_password))
+
+@app.cli.command()
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--tenant', required=True, help='Tenant id or subdomain')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (default: from file extension, else csv)')
+@click.option('--chunk-size', default=1000, help='Rows validated and written per batch')
+@click.option('--allow-overlaps', is_flag=True,
+              help='Skip the overlap pre-check (the database still rejects overlapping confirmed bookings)')
+@click.option('--dry-run', is_flag=True, help='Validate only, write nothing')
+def import_bookings(source, tenant, fmt, chunk_size, allow_overlaps, dry_run):
+    """Import bookings from a CSV/JSONL file ('-' for stdin)"""
+    from app.services.bulk_import import BulkImporter, read_records
+    importer = BulkImporter(_import_tenant(tenant), chunk_size=chunk_size, dry_run=dry_run)
+    _print_import_result(importer.import_bookings(read_records(source, fmt),
+                                                  check_overlaps=not allow_overlaps))
+
+@app.cli.command()
+@click.argument('dataset', type=click.Choice(['bookings', 'sessions', 'members']))
+@click.option('--tenant', required=True, help='Tenant id or subdomain')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl', 'parquet']), default='csv')
+@click.option('--output', type=click.File('wb'), default='-', help='Output file (default: stdout)')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None)
+def export(dataset, tenant, fmt, output, date_from, date_to):
+    """Stream a tenant's data set to a file"""
+    from app.services.export import export_chunks
+    chunks = export_chunks(dataset, _import_tenant(tenant).id, fmt,
+                           date_from.date() if date_from else None,
+                           date_to.date() if date_to else None)
+    for chunk in chunks:
+        output.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+@app.cli.command()
+@click.option('--tenant', default=None, help='Tenant id or subdomain (default: all tenants)')
+@click.option('--batch-size', default=1000, show_default=True)
+def recompute_member_stats(tenant, batch_size):
+    """Rebuild member totals, streaks and rollups from workout sessions"""
+    from app.services.member_stats import recompute
+    tenant_id = _import_tenant(tenant).id if tenant else None
+    updated = recompute(tenant_id, batch_size=batch_size)
+    print(f'✅ Recomputed stats for {updated} members')
+
+@app.cli.command()
+@click.option('--tenant', default=None, help='Tenant id or subdomain (default: all tenants)')
+@click.option('--from', 'date_from', type=click.DateTime(['%Y-%m-%d']), default=None)
+@click.option('--to', 'date_to', type=click.DateTime(['%Y-%m-%d']), default=None)
+def rebuild_rollups(tenant, date_from, date_to):
+    """Rebuild the analytics rollup tables from bookings and workout sessions"""
+    from app.services.analytics import rebuild
+    tenant_id = _import_tenant(tenant).id if tenant else None
+    count = rebuild(tenant_id,
+                    date_from.date() if date_from else None,
+                    date_to.date() if date_to else None)
+    print(f'✅ Rebuilt rollups for {count} tenants')
+
+@app.cli.command()
+@click.option('--tenant', default=None, help='Tenant id or subdomain (default: all tenants)')
+def extend_booking_series(tenant):
+    """Book upcoming occurrences of recurring bookings (run daily)"""
+    from app.services.recurring_bookings import recurring_bookings
+    tenant_id = _import_tenant(tenant).id if tenant else None
+    created = recurring_bookings.extend_all(tenant_id)
+    print(f'✅ Booked {created} occurrences')
+
+@app.cli.command()
+def flush_occupancy():
+    """Write live occupancy counts to the database"""
+    from app.services.occupancy import occupancy
+    if not occupancy.store.shared:
+        print("OCCUPANCY_BACKEND=memory: counts live in the web process, which flushes them itself")
+        return
+    count = occupancy.flush()
+    print(f"Flushed occupancy for {count} areas")
+
+@app.cli.command()
+@click.option('--duration', default=1.0, help='Seconds to run each configuration')
+def benchmark_hashers(duration):
+    """Report password hashes/sec per hasher configuration"""
+    from app.utils.passwords import benchmark
+    configs = [
+        (app.config['PASSWORD_HASHER'], app.config['PASSWORD_HASH_PARAMS']),
+        ('scrypt', {'n': 2 ** 14}),
+        ('scrypt', {'n': 2 ** 15}),
+        ('pbkdf2', {'iterations': 260000}),
+        ('pbkdf2', {'iterations': 600000}),
+        ('bcrypt', {'rounds': 10}),
+        ('bcrypt', {'rounds': 12}),
+        ('argon2', {}),
+    ]
+    for result in benchmark(configs, duration):
+        if 'error' in result:
+            print(f"{result['hasher']:8} {result['params']}: {result['error']}")
+        else:
+            print(f"{result['hasher']:8} {str(result['params']):28} "
+                  f"{result['hashes_per_sec']:8.1f} hashes/sec  {result['ms_per_hash']:7.1f} ms/hash")
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5055))
     debug = os.getenv('FLASK_ENV', 'development') == 'development'
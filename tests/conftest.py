@@ -0,0 +1,100 @@
+"""
+Test fixtures
+A freshly seeded application per test, with logged-in clients
+"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Tenant, GymArea
+from app.services.booking_index import booking_index
+from app.services.seed_data import seed_all
+from config.config import TestingConfig, engine_options
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'postgresql: needs the PostgreSQL database named by TEST_POSTGRES_URL')
+
+
+@pytest.fixture
+def app():
+    """Seeded application; no app context stays pushed, so requests don't share `g`"""
+    app = create_app('testing')
+    with app.app_context():
+        seed_all()
+        booking_index.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """Seeded app on a database file, so every thread (and the async engine) gets its own connection"""
+    uri = f"sqlite:///{tmp_path / 'gym.db'}"
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', uri, raising=False)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri), raising=False)
+    app = create_app('testing')
+    with app.app_context():
+        seed_all()
+        booking_index.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def tenant_id(app):
+    with app.app_context():
+        return Tenant.query.filter_by(subdomain='demo').one().id
+
+
+@pytest.fixture
+def area_id(app):
+    with app.app_context():
+        return GymArea.query.filter_by(is_bookable=True).first().id
+
+
+def login(app, tenant_id, username, password):
+    client = app.test_client()
+    response = client.post('/', data={'username': username, 'password': password},
+                           headers={'X-Tenant-ID': tenant_id})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def member_client(app, tenant_id):
+    return login(app, tenant_id, '123456', '654321')
+
+
+@pytest.fixture
+def admin_client(app, tenant_id):
+    """Client sending an admin's access token (the admin web pages do not exist yet)"""
+    client = app.test_client()
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'},
+                           headers={'X-Tenant-ID': tenant_id})
+    assert response.status_code == 200
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {response.get_json()['access_token']}"
+    return client
+
+
+@contextmanager
+def captured_statements(app):
+    """Collect (statement, parameters) of every SQL statement the app runs inside the block"""
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, 'after_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'after_cursor_execute', record)
@@ -0,0 +1,84 @@
+"""
+ASGI tests
+The async views answer like their Flask twins
+"""
+import asyncio
+import gzip
+
+import pytest
+
+pytest.importorskip('asgiref')
+pytest.importorskip('aiosqlite')
+
+from app.asgi import create_asgi_app
+from app.models import Tenant, GymArea
+from app.services.metrics import metrics
+
+
+def call(asgi_app, path, headers=()):
+    """(status, headers, body) of a GET through the ASGI app"""
+    path, _, query = path.partition('?')
+    scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode('latin-1'),
+             'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    async def run():
+        await asgi_app(scope, receive, send)
+        await asgi_app.engine.dispose()
+
+    asyncio.run(run())
+    start = messages[0]
+    response_headers = {}
+    for name, value in start['headers']:
+        name = name.decode('latin-1')
+        response_headers[name] = ', '.join(filter(None, [response_headers.get(name), value.decode('latin-1')]))
+    return start['status'], response_headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+@pytest.fixture
+def demo_id(file_app):
+    with file_app.app_context():
+        return Tenant.query.filter_by(subdomain='demo').one().id
+
+
+@pytest.mark.parametrize('path', ['/api/gym-status', '/api/available-slots/{area_id}?granularity=60'])
+def test_conditional_get_matches_flask(file_app, demo_id, path):
+    with file_app.app_context():
+        area_id = GymArea.query.filter_by(tenant_id=demo_id, is_bookable=True).first().id
+    path = path.format(area_id=area_id)
+    asgi_app = create_asgi_app(flask_app=file_app)
+    headers = [('X-Tenant-ID', demo_id)]
+
+    flask_response = file_app.test_client().get(path, headers=dict(headers))
+    status, response_headers, _ = call(asgi_app, path, headers)
+
+    assert status == 200
+    assert response_headers['etag'] == flask_response.headers['ETag']
+    assert response_headers['cache-control'] == flask_response.headers['Cache-Control']
+    assert 'server-timing' in response_headers
+
+    status, response_headers, body = call(asgi_app, path, headers + [('If-None-Match', flask_response.headers['ETag'])])
+    assert status == 304
+    assert body == b''
+
+
+def test_compression_and_metrics(file_app, demo_id, monkeypatch):
+    monkeypatch.setattr(file_app.extensions['http_cache'], 'min_size', 10)
+    asgi_app = create_asgi_app(flask_app=file_app)
+
+    status, headers, body = call(asgi_app, '/api/gym-status', [('X-Tenant-ID', demo_id),
+                                                               ('Accept-Encoding', 'gzip')])
+
+    assert status == 200
+    assert headers['content-encoding'] == 'gzip'
+    assert 'Accept-Encoding' in headers['vary']
+    assert b'"areas"' in gzip.decompress(body)
+    # Catalog and tenant were not cached yet: the async engine's statements are counted
+    assert '0 queries' not in headers['server-timing']
+    assert 'gym_http_requests_total{endpoint="api.gym_status",method="GET",status="200"' in metrics.render()
@@ -0,0 +1,35 @@
+"""
+Authorization tests
+Role changes and deactivation take effect without waiting for sessions or tokens to expire
+"""
+from app import db
+from app.models import User
+
+
+def update_admin(app, **values):
+    with app.app_context():
+        User.query.filter_by(username='admin').update(values)
+        db.session.commit()
+
+
+def test_demoted_admin_loses_access(app, admin_client):
+    assert admin_client.get('/admin/api/reports').status_code == 200
+
+    update_admin(app, role='member')
+
+    assert admin_client.get('/admin/api/reports').status_code == 403
+
+
+def test_refresh_rebuilds_claims_from_database(app, tenant_id):
+    client = app.test_client()
+    tokens = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'},
+                         headers={'X-Tenant-ID': tenant_id}).get_json()
+    refresh = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+
+    update_admin(app, role='member')
+    access_token = client.post('/api/auth/refresh', headers=refresh).get_json()['access_token']
+    response = client.get('/admin/api/reports', headers={'Authorization': f'Bearer {access_token}'})
+    assert response.status_code == 403
+
+    update_admin(app, is_active=False)
+    assert client.post('/api/auth/refresh', headers=refresh).status_code == 401
@@ -0,0 +1,41 @@
+"""
+Availability tests
+Opening hours from tenant settings, including malformed ones
+"""
+from datetime import date
+
+import pytest
+
+from app import db
+from app.models import Tenant
+from app.services.availability import opening_hours_for
+
+MONDAY = date(2026, 1, 5)
+
+
+@pytest.mark.parametrize('settings, expected', [
+    ({}, (8 * 60, 22 * 60)),
+    ({'opening_hours': '06:30-24:00'}, (6 * 60 + 30, 24 * 60)),
+    ({'opening_hours': {'mon': '09:00-17:00'}}, (9 * 60, 17 * 60)),
+    ({'opening_hours': {'tue': '09:00-17:00'}}, None),
+    ({'opening_hours': None}, None),
+    ({'opening_hours': ['08:00', '22:00']}, None),
+    ({'opening_hours': 8}, None),
+    ({'opening_hours': {'mon': 8}}, None),
+    ({'opening_hours': 'all day'}, None),
+])
+def test_opening_hours(settings, expected):
+    assert opening_hours_for(settings, MONDAY) == expected
+
+
+def test_malformed_hours_mean_closed(app, member_client, tenant_id):
+    with app.app_context():
+        tenant = db.session.get(Tenant, tenant_id)
+        tenant.settings = dict(tenant.settings or {}, opening_hours={'mon': ['08:00'], 'tue': '08:00-10:00'})
+        db.session.commit()
+
+    response = member_client.get('/api/availability', query_string={'start': MONDAY.isoformat(), 'days': 2})
+
+    assert response.status_code == 200
+    days = response.get_json()['rooms'][0]['days']
+    assert [len(day['slots']) for day in days] == [0, 4]
@@ -0,0 +1,100 @@
+"""
+Booking index tests
+Interval buckets answer overlap queries and follow committed bookings only
+"""
+from datetime import date, time
+import random
+
+from app import db
+from app.models import User, Booking
+from app.services.booking_index import booking_index, IntervalBucket
+
+DAY = date(2026, 3, 2)
+
+
+def brute_force(intervals, start, end):
+    return any(s < end and start < e for s, e, _ in intervals)
+
+
+def test_touching_intervals_do_not_overlap():
+    bucket = IntervalBucket([(60, 120, 'a')])
+
+    assert not bucket.overlaps(120, 180)
+    assert not bucket.overlaps(0, 60)
+    assert bucket.overlaps(119, 121)
+    assert bucket.overlaps(0, 240)
+    assert not IntervalBucket().overlaps(0, 1440)
+
+
+def test_updates_match_a_rebuilt_bucket():
+    rng = random.Random(7)
+    bucket = IntervalBucket()
+    for step in range(500):
+        if bucket.intervals and rng.random() < 0.4:
+            bucket.remove(rng.choice(bucket.intervals)[2])
+        else:
+            start = rng.randrange(0, 1380)
+            bucket.add(start, start + rng.randrange(1, 240), f'b{step}')
+        rebuilt = IntervalBucket(bucket.intervals)
+        assert bucket.max_ends == rebuilt.max_ends
+        start = rng.randrange(0, 1400)
+        end = start + rng.randrange(1, 120)
+        assert bucket.overlaps(start, end) == brute_force(bucket.intervals, start, end)
+
+
+def test_add_is_idempotent_and_moves_a_changed_booking():
+    bucket = IntervalBucket()
+    bucket.add(60, 120, 'a')
+    bucket.add(60, 120, 'a')
+    assert len(bucket) == 1
+
+    bucket.add(300, 360, 'a')
+    assert bucket.intervals == [(300, 360, 'a')]
+    assert not bucket.overlaps(60, 120)
+    bucket.remove('missing')
+    assert len(bucket) == 1
+
+
+def test_index_follows_commits_not_rollbacks(app, area_id):
+    with app.app_context():
+        user_id = User.query.filter_by(username='123456').first().id
+        booking_index.bucket(area_id, DAY)
+
+        db.session.add(Booking(user_id=user_id, gym_area_id=area_id, booking_date=DAY,
+                               start_time=time(9, 0), duration_minutes=60, price=10, status='confirmed'))
+        db.session.flush()
+        db.session.rollback()
+        assert not booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
+
+        booking = Booking(user_id=user_id, gym_area_id=area_id, booking_date=DAY,
+                          start_time=time(9, 0), duration_minutes=60, price=10, status='confirmed')
+        db.session.add(booking)
+        db.session.commit()
+        assert booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
+        assert not booking_index.overlaps(area_id, DAY, 10 * 60, 11 * 60)
+
+        booking.status = 'cancelled'
+        db.session.flush()
+        db.session.rollback()
+        assert booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
+
+        booking.status = 'cancelled'
+        db.session.commit()
+        assert not booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
+
+
+def test_discard_rebuilds_from_the_database(app, area_id):
+    with app.app_context():
+        user_id = User.query.filter_by(username='123456').first().id
+        bucket = booking_index.bucket(area_id, DAY)
+        # Written without the ORM, as another worker or a bulk import would
+        db.session.execute(Booking.__table__.insert(), [{
+            'id': 'external', 'user_id': user_id, 'gym_area_id': area_id, 'booking_date': DAY,
+            'start_time': time(9, 0), 'duration_minutes': 60, 'price': 10, 'status': 'confirmed'}])
+        db.session.commit()
+        assert not booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
+
+        booking_index.discard(area_id, DAY)
+
+        assert booking_index.bucket(area_id, DAY) is not bucket
+        assert booking_index.overlaps(area_id, DAY, 9 * 60, 10 * 60)
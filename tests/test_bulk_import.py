@@ -0,0 +1,96 @@
+"""
+Bulk import tests
+Unreadable lines and rejected chunks are reported per line; rooms resolve by localized name
+"""
+from datetime import date, datetime, time, timedelta
+import io
+import uuid
+
+from app import db
+from app.models import Tenant, User, GymArea, Booking
+from app.services import bulk_import
+from app.services.booking_index import booking_index
+from app.services.bulk_import import BulkImporter, InvalidRecord, read_records
+
+
+def record(area_name, day, start, username='123456'):
+    return {'username': username, 'room_name': area_name, 'date': day.isoformat(),
+            'time': start, 'duration': '60', 'price': '10'}
+
+
+def test_import_resolves_names_in_every_language(app, area_id):
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain='demo').one()
+        area = db.session.get(GymArea, area_id)
+        records = [(1, record(area.text('name', 'en'), date.today(), '09:00')),
+                   (2, record(area.text('name', 'el'), date.today(), '11:00'))]
+
+        result = BulkImporter(tenant).import_bookings(iter(records))
+
+        assert result.inserted == 2, result.errors
+
+
+def test_rolled_back_chunk_leaves_no_intervals(app, area_id):
+    today, tomorrow = date.today(), date.today() + timedelta(days=1)
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain='demo').one()
+        user = User.query.filter_by(tenant_id=tenant.id, username='123456').one()
+        name = db.session.get(GymArea, area_id).text('name', 'en')
+        other_area = GymArea.query.filter(GymArea.tenant_id == tenant.id, GymArea.id != area_id).first()
+        # A bucket the import never touches, and one that misses a booking written behind its back
+        kept = booking_index.bucket(other_area.id, today)
+        booking_index.bucket(area_id, tomorrow)
+        now = datetime.utcnow()
+        db.session.execute(Booking.__table__.insert(), [{
+            'id': str(uuid.uuid4()), 'user_id': user.id, 'gym_area_id': area_id, 'booking_date': tomorrow,
+            'start_time': time(10, 0), 'duration_minutes': 60, 'price': 10, 'status': 'confirmed',
+            'created_at': now, 'updated_at': now}])
+        db.session.commit()
+        records = [(1, record(name, today, '09:00')), (2, record(name, tomorrow, '10:00')),
+                   (3, record(name, today, '09:00'))]
+
+        result = BulkImporter(tenant, chunk_size=2).import_bookings(iter(records))
+
+        assert result.inserted == 1
+        assert result.errors == [(1, '2 rows from this line on not written: '
+                                     'a confirmed booking overlaps another')]
+        assert booking_index.bucket(other_area.id, today) is kept
+        assert booking_index.bucket(area_id, today).overlaps(9 * 60, 10 * 60)
+
+
+def test_unreadable_lines_are_reported(app):
+    stream = io.StringIO('{"username": "ann", "password": "pw"}\n{"username": \n\n[1, 2]\n'
+                         '{"username": "bob", "password": "pw"}\n')
+    records = list(read_records(stream, 'jsonl'))
+
+    assert [line_no for line_no, _ in records] == [1, 2, 4, 5]
+    assert isinstance(records[1][1], InvalidRecord) and isinstance(records[2][1], InvalidRecord)
+
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain='demo').one()
+        result = BulkImporter(tenant, workers=1).import_members(iter(records))
+
+    assert result.inserted == 2
+    assert [line_no for line_no, _ in result.errors] == [2, 4]
+
+
+def test_member_chunk_rejected_by_database_is_reported(app, monkeypatch):
+    write_rows = bulk_import.write_rows
+
+    def write_after_concurrent_signup(table, rows):
+        # Another request registers the same username between the check and the write
+        db.session.execute(User.__table__.insert(), [dict(rows[0], id=str(uuid.uuid4()))])
+        write_rows(table, rows)
+
+    monkeypatch.setattr(bulk_import, 'write_rows', write_after_concurrent_signup)
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain='demo').one()
+        records = [(1, {'username': 'ann', 'password': 'pw'}), (2, {'username': 'bob', 'password': 'pw'})]
+
+        result = BulkImporter(tenant, workers=1).import_members(iter(records))
+
+        assert result.inserted == 0
+        assert result.skipped == 2
+        assert result.errors == [(1, '2 rows from this line on not written: '
+                                     'a username or email is already taken')]
+        assert not User.query.filter(User.username.in_(['ann', 'bob'])).count()
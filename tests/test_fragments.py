@@ -0,0 +1,24 @@
+"""
+Fragment cache tests
+Live occupancy is rendered per request and never creates cache entries
+"""
+from app.services.catalog import catalog_cache
+
+
+def test_check_in_reuses_cached_fragments(app, member_client, admin_client, tenant_id, area_id, monkeypatch):
+    stored = []
+    store = catalog_cache.store
+    monkeypatch.setattr(catalog_cache, 'store',
+                        lambda tenant_id, name, value: stored.append(name) or store(tenant_id, name, value))
+
+    before = member_client.get('/member/dashboard').get_data(as_text=True)
+    fragments = [name for name in stored if name.startswith('fragment:')]
+    assert fragments
+
+    response = admin_client.post('/api/check-in', json={'area_id': area_id}, headers={'X-Tenant-ID': tenant_id})
+    current_users = response.get_json()['current_users']
+    after = member_client.get('/member/dashboard').get_data(as_text=True)
+
+    assert after != before
+    assert f'{current_users}/' in after
+    assert [name for name in stored if name.startswith('fragment:')] == fragments
@@ -0,0 +1,62 @@
+"""
+Localized text tests
+Translated fields live in localized_texts and fall back to the default language
+"""
+from app import db
+from app.models import Tenant, GymArea, LocalizedText
+from app.utils.serialization import Schema, in_language, localized
+
+
+def add_area(**fields):
+    tenant = Tenant.query.filter_by(subdomain='demo').one()
+    area = GymArea(tenant_id=tenant.id, capacity=10, **fields)
+    db.session.add(area)
+    db.session.commit()
+    return area.id
+
+
+def text_rows(area_id):
+    return LocalizedText.query.filter_by(entity_type='gym_areas', entity_id=area_id).count()
+
+
+def test_model_texts_round_trip(app):
+    with app.app_context():
+        area_id = add_area(name={'en': 'Studio', 'el': 'Στούντιο'}, equipment={'en': ['Mats', 'Blocks']})
+        db.session.expunge_all()
+        area = db.session.get(GymArea, area_id)
+
+        assert area.text('name', 'el') == 'Στούντιο'
+        assert area.text('equipment', 'en') == ['Mats', 'Blocks']
+        assert area.text('equipment', 'el') is None
+        assert area.text('description', 'en', '') == ''
+        assert area.localized('name') == {'en': 'Studio', 'el': 'Στούντιο'}
+
+        area.set_text('name', 'el', 'Αίθουσα')
+        area.set_text('equipment', 'el', ['Στρώματα'])
+        db.session.commit()
+        assert text_rows(area_id) == 4
+        assert area.localized('equipment') == {'en': ['Mats', 'Blocks'], 'el': ['Στρώματα']}
+
+        db.session.delete(area)
+        db.session.commit()
+        assert text_rows(area_id) == 0
+
+
+def test_schema_falls_back_to_default_language(app):
+    schema = Schema(id=GymArea.id, name=localized(GymArea, 'name'), equipment=localized(GymArea, 'equipment'))
+    with app.app_context():
+        area_id = add_area(name={'en': 'Studio'}, equipment={'en': ['Mats'], 'el': ['Στρώματα']})
+
+        def row(lang):
+            return schema.dump(db.session.execute(schema.select(lang).where(GymArea.id == area_id)).one(), lang)
+
+        assert row('el') == {'id': area_id, 'name': 'Studio', 'equipment': ['Στρώματα']}
+        assert row('fr') == {'id': area_id, 'name': 'Studio', 'equipment': ['Mats']}
+        assert row(None)['name'] == {'en': 'Studio', 'el': 'Studio'}
+
+
+def test_in_language_falls_back_to_default(app):
+    with app.app_context():
+        assert in_language({'en': 'Studio', 'el': 'Στούντιο'}, 'el') == 'Στούντιο'
+        assert in_language({'en': 'Studio'}, 'el') == 'Studio'
+        assert in_language(None, 'el') is None
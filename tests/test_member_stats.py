@@ -0,0 +1,94 @@
+"""
+Member stats tests
+Streaks follow tenant-local days, and incremental counts agree with a recompute
+"""
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app import db
+from app.models import Tenant, User, WorkoutSession
+from app.services import member_stats
+from app.utils.tenant_time import tenant_zone
+
+UTC = ZoneInfo('UTC')
+
+
+def fresh_member():
+    user = User.query.filter_by(username='123456').one()
+    user.total_workouts, user.calories_burned, user.streak_days, user.last_workout_date = 0, 0, 0, None
+    db.session.commit()
+    return user.id
+
+
+def stored(user_id):
+    db.session.expire_all()
+    user = db.session.get(User, user_id)
+    return user.streak_days, user.last_workout_date
+
+
+def test_streak_across_day_gaps(app):
+    day = datetime(2026, 3, 2, 9, 0)
+    with app.app_context():
+        user_id = fresh_member()
+
+        member_stats.record_completion(user_id, day, 100, 1800, UTC)
+        assert stored(user_id) == (1, day.date())
+        member_stats.record_completion(user_id, day + timedelta(hours=8), 100, 1800, UTC)
+        assert stored(user_id) == (1, day.date())
+        member_stats.record_completion(user_id, day + timedelta(days=1), 100, 1800, UTC)
+        assert stored(user_id) == (2, date(2026, 3, 3))
+        # A workout dated before the latest one leaves the streak alone
+        member_stats.record_completion(user_id, day - timedelta(days=5), 100, 1800, UTC)
+        assert stored(user_id) == (2, date(2026, 3, 3))
+        member_stats.record_completion(user_id, day + timedelta(days=3), 100, 1800, UTC)
+        assert stored(user_id) == (1, date(2026, 3, 5))
+
+        user = db.session.get(User, user_id)
+        assert (user.total_workouts, user.calories_burned) == (5, 500)
+
+
+def test_streak_counts_tenant_local_days(app):
+    evening = datetime(2026, 3, 1, 10, 0)
+    after_midnight_in_athens = datetime(2026, 3, 1, 22, 30)
+    with app.app_context():
+        user_id = fresh_member()
+        member_stats.record_completion(user_id, evening, 0, 0, UTC)
+        member_stats.record_completion(user_id, after_midnight_in_athens, 0, 0, UTC)
+        assert stored(user_id) == (1, date(2026, 3, 1))
+
+        user_id = fresh_member()
+        athens = ZoneInfo('Europe/Athens')
+        member_stats.record_completion(user_id, evening, 0, 0, athens)
+        member_stats.record_completion(user_id, after_midnight_in_athens, 0, 0, athens)
+        assert stored(user_id) == (2, date(2026, 3, 2))
+
+
+def test_current_streak_lapses_after_a_missed_day():
+    today = date(2026, 3, 10)
+    assert member_stats.current_streak(4, today, today) == 4
+    assert member_stats.current_streak(4, today - timedelta(days=1), today) == 4
+    assert member_stats.current_streak(4, today - timedelta(days=2), today) == 0
+    assert member_stats.current_streak(None, None, today) == 0
+
+
+def test_completed_session_counted_once_and_matches_recompute(app):
+    with app.app_context():
+        tenant = Tenant.query.filter_by(subdomain='demo').one()
+        zone = tenant_zone(tenant.settings)
+        user_id = User.query.filter_by(username='123456').one().id
+        member_stats.recompute(tenant.id)
+        workout = WorkoutSession(user_id=user_id, start_time=datetime.utcnow() - timedelta(minutes=30))
+        db.session.add(workout)
+        db.session.commit()
+
+        stats = member_stats.complete_session(workout, 250, tenant.id, zone)
+        assert member_stats.complete_session(workout, 250, tenant.id, zone) is None
+        db.session.commit()
+        weekly = member_stats.rollups(user_id, 'week', limit=1)
+
+        member_stats.recompute(tenant.id)
+        db.session.expire_all()
+        user = db.session.get(User, user_id)
+        assert stats == {'total_workouts': user.total_workouts, 'calories_burned': user.calories_burned,
+                         'streak_days': user.streak_days}
+        assert member_stats.rollups(user_id, 'week', limit=1) == weekly
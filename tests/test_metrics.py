@@ -0,0 +1,36 @@
+"""
+Metrics tests
+Access to /metrics and timing of failed statements
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.services.metrics import metrics
+
+
+def test_metrics_hidden_without_token_outside_debug(app, monkeypatch):
+    client = app.test_client()
+    assert client.get('/metrics').status_code == 200
+
+    monkeypatch.setattr(metrics, 'open_access', False)
+    assert client.get('/metrics').status_code == 404
+    assert client.get('/metrics/slow-queries').status_code == 404
+
+    monkeypatch.setattr(metrics, 'token', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_failed_statements_are_timed(app, monkeypatch):
+    recorded = []
+    monkeypatch.setattr(metrics, 'record_statement', lambda statement, duration: recorded.append(statement))
+
+    with app.app_context():
+        with pytest.raises(OperationalError):
+            db.session.execute(text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+        db.session.execute(text('SELECT 1'))
+
+    assert recorded == ['SELECT * FROM no_such_table', 'SELECT 1']
@@ -0,0 +1,69 @@
+"""
+Occupancy tests
+Live counts reach gym_areas whichever process counted them
+"""
+import pytest
+
+from app import create_app, db
+from app.models import GymArea
+from app.services.catalog import catalog_cache
+from app.services.occupancy import occupancy, MemoryOccupancyStore
+from config.config import TestingConfig
+
+
+def empty_area(area_id):
+    """Serialized area with no users inside"""
+    area = db.session.get(GymArea, area_id)
+    area.current_users = 0
+    db.session.commit()
+    return next(serialized for serialized in catalog_cache.areas(area.tenant_id) if serialized['id'] == area_id)
+
+
+def stored_count(area_id):
+    db.session.expire_all()
+    return db.session.get(GymArea, area_id).current_users
+
+
+def test_check_out_counted_apart_from_its_check_in(app, area_id, monkeypatch):
+    with app.app_context():
+        area = empty_area(area_id)
+        first, second = MemoryOccupancyStore(), MemoryOccupancyStore()
+        monkeypatch.setattr(occupancy, 'store', second)
+        occupancy.counts([area_id])
+        monkeypatch.setattr(occupancy, 'store', first)
+        for _ in range(5):
+            occupancy.check_in(area)
+
+        for _ in range(5):
+            monkeypatch.setattr(occupancy, 'store', second)
+            assert occupancy.check_out(area) == 0
+        monkeypatch.setattr(occupancy, 'store', first)
+        occupancy.flush()
+        monkeypatch.setattr(occupancy, 'store', second)
+        occupancy.flush()
+
+        assert stored_count(area_id) == 0
+
+
+def test_reads_flush_due_changes(app, area_id, monkeypatch):
+    with app.app_context():
+        area = empty_area(area_id)
+        occupancy.check_in(area, count=3)
+        assert stored_count(area_id) == 0
+
+        monkeypatch.setattr(occupancy, 'flush_interval', 0)
+        assert occupancy.counts([area_id]) == {area_id: 3}
+        assert stored_count(area_id) == 3
+
+
+def test_memory_backend_refused_with_several_workers(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'WEB_CONCURRENCY', 4, raising=False)
+    with pytest.raises(RuntimeError):
+        create_app('testing')
+
+
+def test_only_staff_post_occupancy_events(member_client, admin_client, tenant_id, area_id):
+    for path in ('/api/check-in', '/api/check-out'):
+        assert member_client.post(path, json={'area_id': area_id}).status_code == 403
+        assert admin_client.post(path, json={'area_id': area_id},
+                                 headers={'X-Tenant-ID': tenant_id}).status_code == 200
@@ -0,0 +1,65 @@
+"""
+Password tests
+Any supported hash format verifies, whichever optional packages are installed
+"""
+import sys
+
+import pytest
+
+from app.utils.passwords import passwords, PasswordManager, ScryptHasher, BcryptHasher, HashingBusy
+
+
+def test_verifies_other_formats(app):
+    manager = PasswordManager(app)
+    scrypt_hash = ScryptHasher(n=2 ** 10).hash('secret')
+
+    assert manager.hasher.name == 'pbkdf2'
+    assert manager.verify('secret', scrypt_hash)
+    assert not manager.verify('wrong', scrypt_hash)
+    assert manager.needs_rehash(scrypt_hash)
+    assert manager.verify('secret', manager.hash('secret'))
+
+
+@pytest.mark.parametrize('package', ['bcrypt', 'argon2'])
+def test_missing_optional_package_is_skipped(app, monkeypatch, package):
+    monkeypatch.setitem(sys.modules, package, None)
+
+    manager = PasswordManager(app)
+
+    assert package not in {hasher.name for hasher in manager.verifiers}
+    assert not manager.verify('secret', '$2b$12$' + 'x' * 53)
+    assert manager.verify('secret', manager.hash('secret'))
+
+
+def test_bcrypt_requires_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'bcrypt', None)
+    with pytest.raises(RuntimeError):
+        BcryptHasher()
+
+
+def test_hashing_is_bounded(app, monkeypatch):
+    manager = PasswordManager(app)
+    hashed = manager.hash('secret')
+    monkeypatch.setattr(manager, 'queue_timeout', 0.01)
+    for _ in range(app.config['PASSWORD_HASH_WORKERS']):
+        manager._slots.acquire()
+
+    with pytest.raises(HashingBusy):
+        manager.verify('secret', hashed)
+    manager._slots.release()
+    assert manager.verify('secret', hashed)
+
+
+def test_login_answers_503_when_busy(app, tenant_id, monkeypatch):
+    monkeypatch.setattr(passwords, 'queue_timeout', 0.01)
+    for _ in range(app.config['PASSWORD_HASH_WORKERS']):
+        passwords._slots.acquire()
+    client = app.test_client()
+
+    response = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'},
+                           headers={'X-Tenant-ID': tenant_id})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    response = client.post('/', data={'username': '123456', 'password': '654321'},
+                           headers={'X-Tenant-ID': tenant_id})
+    assert response.status_code == 503
@@ -0,0 +1,64 @@
+"""
+Query count regression tests
+Listing endpoints issue a fixed number of statements however many rows they return
+"""
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app import db
+from app.models import User, GymArea, WorkoutProgram, Booking, WorkoutSession
+
+from tests.conftest import captured_statements
+
+ROWS = 40
+
+
+@pytest.fixture
+def history(app, tenant_id):
+    """ROWS bookings and workout sessions for the demo member, spread over areas and days"""
+    with app.app_context():
+        member = User.query.filter_by(tenant_id=tenant_id, username='123456').one()
+        areas = GymArea.query.filter_by(tenant_id=tenant_id).all()
+        programs = WorkoutProgram.query.filter_by(tenant_id=tenant_id).all()
+        today = date.today()
+        for i in range(ROWS):
+            db.session.add(Booking(user_id=member.id, gym_area_id=areas[i % len(areas)].id,
+                                   booking_date=today - timedelta(days=i), start_time=time(8 + i % 10),
+                                   duration_minutes=60, price=10))
+            started = datetime.combine(today - timedelta(days=i), time(18))
+            db.session.add(WorkoutSession(user_id=member.id, workout_program_id=programs[i % len(programs)].id,
+                                          start_time=started, end_time=started + timedelta(hours=1),
+                                          duration_seconds=3600, calories_burned=300, status='completed'))
+        db.session.commit()
+
+
+def count_statements(app, client, url):
+    with captured_statements(app) as statements:
+        response = client.get(url)
+        response.get_data()
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.usefixtures('history')
+@pytest.mark.parametrize('url, bound', [
+    # identity, user, listing validator, areas + names, live counts, bookings, programs + names
+    ('/member/dashboard', 9),
+    ('/api/user-bookings', 2),
+    (f'/api/user-bookings?limit={ROWS // 4}', 2),
+])
+def test_member_listings(app, member_client, url, bound):
+    assert count_statements(app, member_client, url) <= bound
+
+
+@pytest.mark.usefixtures('history')
+@pytest.mark.parametrize('url, bound', [
+    # identity, six rollup aggregates, areas + names and programs + names (cold catalog cache)
+    ('/admin/api/reports', 11),
+    ('/admin/api/export/bookings', 2),
+    ('/admin/api/export/sessions?format=jsonl', 2),
+    ('/admin/api/export/members', 2),
+])
+def test_admin_listings(app, admin_client, url, bound):
+    assert count_statements(app, admin_client, url) <= bound
@@ -0,0 +1,54 @@
+"""
+Query plan regression tests
+Hot request paths must reach their tables through an index, never a full scan
+"""
+import re
+
+from app import db
+
+from tests.conftest import captured_statements, login
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)')
+
+
+def full_scans(app, statements):
+    """(table, statement) for every captured SELECT whose plan scans a whole table"""
+    scans = []
+    with app.app_context():
+        tables = set(db.metadata.tables)
+        connection = db.session.connection()
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+            for row in plan:
+                match = FULL_SCAN.match(row[3])
+                if match and match.group(1) in tables:
+                    scans.append((match.group(1), ' '.join(statement.split())))
+    return scans
+
+
+def test_login_uses_indexes(app, tenant_id):
+    with captured_statements(app) as statements:
+        login(app, tenant_id, '123456', '654321')
+    assert full_scans(app, statements) == []
+
+
+def test_member_paths_use_indexes(app, member_client, area_id):
+    with captured_statements(app) as statements:
+        member_client.get('/member/dashboard')
+        member_client.get('/api/user-bookings')
+        member_client.get(f'/api/available-slots/{area_id}')
+        member_client.get('/api/availability')
+        member_client.get('/api/gym-status')
+    assert statements
+    assert full_scans(app, statements) == []
+
+
+def test_booking_uses_indexes(app, member_client, area_id):
+    with captured_statements(app) as statements:
+        response = member_client.post('/api/book-room', json={
+            'room_id': area_id, 'time': '09:00', 'duration': 60, 'price': 10,
+        })
+    assert response.status_code == 200
+    assert full_scans(app, statements) == []
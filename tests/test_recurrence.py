@@ -0,0 +1,59 @@
+"""
+Recurrence rule tests
+Parsing and expanding weekly RRULEs
+"""
+from datetime import date
+
+import pytest
+
+from app.utils.recurrence import WeeklyRule
+
+MONDAY = date(2026, 1, 5)
+WEDNESDAY = date(2026, 1, 7)
+
+
+def test_parse_round_trip():
+    rule = WeeklyRule.parse('RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TH,MO;UNTIL=20261231T235959Z')
+
+    assert (rule.interval, rule.weekdays, rule.count, rule.until) == (2, [0, 3], None, date(2026, 12, 31))
+    assert str(rule) == 'FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH;UNTIL=20261231'
+    assert str(WeeklyRule.parse(str(rule))) == str(rule)
+
+
+@pytest.mark.parametrize('text', [
+    'FREQ=DAILY', 'INTERVAL=2', 'FREQ=WEEKLY;BYDAY=MO,XX', 'FREQ=WEEKLY;COUNT=0',
+    'FREQ=WEEKLY;COUNT=3;UNTIL=20261231', 'FREQ=WEEKLY;INTERVAL=0', 'FREQ=WEEKLY;INTERVAL=53',
+    'FREQ=WEEKLY;BYMONTH=1', 'FREQ=WEEKLY;FREQ=WEEKLY', 'FREQ=WEEKLY;INTERVAL',
+])
+def test_parse_rejects(text):
+    with pytest.raises(ValueError):
+        WeeklyRule.parse(text)
+
+
+def test_interval_and_weekdays():
+    rule = WeeklyRule.parse('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,TH')
+
+    # Starts on a Wednesday: that week's Monday is skipped, Thursday counts
+    assert list(rule.occurrences(WEDNESDAY, window_end=date(2026, 2, 5))) == [
+        date(2026, 1, 8), date(2026, 1, 19), date(2026, 1, 22), date(2026, 2, 2), date(2026, 2, 5)]
+
+
+def test_start_weekday_without_byday():
+    rule = WeeklyRule.parse('FREQ=WEEKLY;UNTIL=20260121')
+
+    assert list(rule.occurrences(WEDNESDAY)) == [WEDNESDAY, date(2026, 1, 14), date(2026, 1, 21)]
+
+
+def test_count_is_used_up_before_the_window():
+    rule = WeeklyRule.parse('FREQ=WEEKLY;COUNT=3')
+
+    assert list(rule.occurrences(MONDAY)) == [MONDAY, date(2026, 1, 12), date(2026, 1, 19)]
+    assert list(rule.occurrences(MONDAY, date(2026, 1, 13))) == [date(2026, 1, 19)]
+    assert list(rule.occurrences(MONDAY, date(2026, 1, 20), date(2026, 12, 31))) == []
+
+
+def test_window_limits_open_ended_rule():
+    rule = WeeklyRule.parse('FREQ=WEEKLY;BYDAY=MO')
+
+    assert list(rule.occurrences(MONDAY, date(2026, 3, 1), date(2026, 3, 16))) == [
+        date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16)]
@@ -0,0 +1,91 @@
+"""
+Recurring booking tests
+Series are booked up to the horizon, skip taken slots, extend and cancel
+"""
+from datetime import date, time, timedelta
+
+import pytest
+
+from app import db
+from app.models import Tenant, User, Booking, BookingSeries
+from app.services.recurring_bookings import recurring_bookings
+from app.services.reservations import reservations
+from app.utils.recurrence import WeeklyRule
+from app.utils.tenant_time import local_today, tenant_zone
+
+
+@pytest.fixture
+def member(app, tenant_id):
+    with app.app_context():
+        return User.query.filter_by(tenant_id=tenant_id, username='123456').one().id
+
+
+def weekly_series(tenant_id, user_id, area_id, starts_on):
+    return recurring_bookings.create(user_id, tenant_id, area_id, WeeklyRule.parse('FREQ=WEEKLY'),
+                                     starts_on, time(7, 0), 60, price=10.0)
+
+
+def test_series_books_to_horizon_and_skips_taken_slots(app, tenant_id, area_id, member):
+    with app.app_context():
+        today = local_today(tenant_zone(db.session.get(Tenant, tenant_id).settings))
+        horizon = today + timedelta(days=recurring_bookings.horizon_days)
+        taken = today + timedelta(days=7)
+        reservations.book(member, area_id, taken, time(7, 30), 30, price=5.0)
+
+        series, bookings, skipped = weekly_series(tenant_id, member, area_id, today)
+
+        weekly = [today + timedelta(weeks=week) for week in range(5)]
+        assert [booking.booking_date for booking in bookings] == [
+            day for day in weekly if day != taken and day <= horizon]
+        assert skipped == [taken]
+        assert series.booked_through == horizon
+        states = {item['date']: item['status']
+                  for item in recurring_bookings.occurrences(series, today, horizon + timedelta(weeks=2))}
+        assert states[taken.isoformat()] == 'unavailable'
+        assert states[today.isoformat()] == 'confirmed'
+        assert states[(horizon + timedelta(weeks=2)).isoformat()] == 'scheduled'
+
+
+def test_extend_and_cancel(app, tenant_id, area_id, member, monkeypatch):
+    with app.app_context():
+        today = local_today(tenant_zone(db.session.get(Tenant, tenant_id).settings))
+        series, bookings, _ = weekly_series(tenant_id, member, area_id, today)
+
+        assert recurring_bookings.extend(series) == ([], [])
+        monkeypatch.setattr(recurring_bookings, 'horizon_days', recurring_bookings.horizon_days + 14)
+        assert recurring_bookings.extend_all(tenant_id) == 2
+        series = db.session.get(BookingSeries, series.id)
+        assert Booking.query.filter_by(series_id=series.id, status='confirmed').count() == len(bookings) + 2
+
+        tomorrow = today + timedelta(days=1)
+        assert recurring_bookings.cancel(series, tomorrow) == len(bookings) + 1
+        assert series.status == 'cancelled'
+        assert Booking.query.filter_by(series_id=series.id, status='confirmed').one().booking_date == today
+        occurrences = recurring_bookings.occurrences(series, tomorrow, tomorrow + timedelta(weeks=12))
+        assert {item['status'] for item in occurrences} == {'cancelled'}
+        assert recurring_bookings.extend(series) == ([], [])
+
+
+def test_endpoints_use_the_gym_date(app, member_client, tenant_id, area_id):
+    # A zone whose date differs from the server's right now
+    zone = next(name for name in ('Pacific/Kiritimati', 'Etc/GMT+12')
+                if local_today(tenant_zone({'timezone': name})) != date.today())
+    with app.app_context():
+        tenant = db.session.get(Tenant, tenant_id)
+        tenant.settings = dict(tenant.settings or {}, timezone=zone)
+        db.session.commit()
+    today = local_today(tenant_zone({'timezone': zone}))
+
+    def batch(day):
+        return member_client.post('/api/bookings/batch', json={'bookings': [
+            {'room_id': area_id, 'date': day.isoformat(), 'time': '10:00', 'duration': 60, 'price': 10}]})
+
+    def series(day):
+        return member_client.post('/api/booking-series', json={
+            'room_id': area_id, 'start': day.isoformat(), 'time': '12:00', 'duration': 60, 'price': 10,
+            'rrule': 'FREQ=WEEKLY;COUNT=1'})
+
+    assert batch(today - timedelta(days=1)).status_code == 400
+    assert batch(today).status_code == 200
+    assert series(today - timedelta(days=1)).status_code == 400
+    assert series(today).status_code == 201
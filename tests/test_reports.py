@@ -0,0 +1,29 @@
+"""
+Report tests
+Localized names in the owner report fall back to the default language
+"""
+from app import db
+from app.models import LocalizedText, GymArea
+from app.services.catalog import catalog_cache
+
+
+def report_names(admin_client, lang):
+    response = admin_client.get(f'/admin/api/reports?lang={lang}')
+    assert response.status_code == 200
+    return {area['id']: area['name'] for area in response.get_json()['report']['areas']}
+
+
+def test_missing_translation_falls_back(app, admin_client, tenant_id, area_id):
+    with app.app_context():
+        english = db.session.get(GymArea, area_id).text('name', 'en')
+        LocalizedText.query.filter_by(entity_id=area_id, field='name', lang='el').delete()
+        db.session.commit()
+        catalog_cache.invalidate(tenant_id)
+
+    assert report_names(admin_client, 'el')[area_id] == english
+
+
+def test_unknown_language_uses_default(app, admin_client, area_id):
+    app.config['LANGUAGES'] = ['en', 'el', 'de']
+    assert report_names(admin_client, 'de')[area_id] == report_names(admin_client, 'en')[area_id]
+    assert report_names(admin_client, 'xx') == report_names(admin_client, 'en')
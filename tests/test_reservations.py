@@ -0,0 +1,159 @@
+"""
+Reservation tests
+Concurrent requests for one slot confirm exactly one booking
+"""
+from datetime import date, time
+import os
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app import create_app, db
+from app.models import User, GymArea, Booking
+from app.services.booking_index import booking_index
+from app.services.reservations import reservations, is_overlap_error, SlotUnavailable, BookingContention
+from app.services.seed_data import seed_all
+from config.config import TestingConfig, engine_options
+
+ATTEMPTS = 100
+
+
+def race(app, user_id, area_id):
+    """Book the same slot from ATTEMPTS threads at once; returns the outcome of each"""
+    barrier = threading.Barrier(ATTEMPTS)
+    outcomes = []
+
+    def attempt():
+        with app.app_context():
+            barrier.wait()
+            try:
+                reservations.book(user_id, area_id, date.today(), time(10), 60, price=10)
+                outcomes.append('booked')
+            except (SlotUnavailable, BookingContention) as e:
+                outcomes.append(type(e).__name__)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=attempt) for _ in range(ATTEMPTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+@pytest.fixture
+def postgresql_app(monkeypatch):
+    """Seeded app on the PostgreSQL database named by TEST_POSTGRES_URL (its tables are dropped)"""
+    uri = os.getenv('TEST_POSTGRES_URL')
+    if not uri:
+        pytest.skip('TEST_POSTGRES_URL is not set')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', uri, raising=False)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', engine_options(uri), raising=False)
+    app = create_app('testing')
+    with app.app_context():
+        seed_all()
+        booking_index.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def member_and_area(app):
+    with app.app_context():
+        return (User.query.filter_by(username='123456').one().id,
+                GymArea.query.filter_by(is_bookable=True).first().id)
+
+
+def assert_one_confirmed(app, outcomes, area_id):
+    assert len(outcomes) == ATTEMPTS
+    assert outcomes.count('booked') == 1
+    with app.app_context():
+        assert Booking.query.filter_by(gym_area_id=area_id, booking_date=date.today(),
+                                       status='confirmed').count() == 1
+
+
+def trust_database_only(monkeypatch):
+    # Every attempt reaches the database, as when the bookings race across workers
+    monkeypatch.setattr(booking_index, 'overlaps', lambda *args: False)
+
+
+@pytest.mark.parametrize('trust_index', [True, False], ids=['index', 'database-only'])
+def test_concurrent_bookings_confirm_one(file_app, monkeypatch, trust_index):
+    if not trust_index:
+        trust_database_only(monkeypatch)
+    user_id, area_id = member_and_area(file_app)
+
+    outcomes = race(file_app, user_id, area_id)
+
+    assert_one_confirmed(file_app, outcomes, area_id)
+
+
+@pytest.mark.postgresql
+def test_concurrent_bookings_confirm_one_on_postgresql(postgresql_app, monkeypatch):
+    trust_database_only(monkeypatch)
+    user_id, area_id = member_and_area(postgresql_app)
+    retries = reservations.stats()['retries']
+
+    outcomes = race(postgresql_app, user_id, area_id)
+
+    assert_one_confirmed(postgresql_app, outcomes, area_id)
+    # The losers either found the slot claimed or were rejected by the constraint
+    assert reservations.stats()['retries'] > retries
+
+
+@pytest.mark.postgresql
+def test_exclusion_constraint_rejects_overlaps(postgresql_app):
+    user_id, area_id = member_and_area(postgresql_app)
+    with postgresql_app.app_context():
+        reservations.book(user_id, area_id, date.today(), time(10), 60, price=10)
+
+        def insert(start, status='confirmed'):
+            # Straight to the table, past the index and the advisory lock
+            db.session.execute(Booking.__table__.insert(), [{
+                'id': f'{start:%H%M}-{status}', 'user_id': user_id, 'gym_area_id': area_id,
+                'booking_date': date.today(), 'start_time': start, 'duration_minutes': 60,
+                'price': 10, 'status': status}])
+            db.session.commit()
+
+        with pytest.raises(DBAPIError) as rejected:
+            insert(time(10, 30))
+        assert is_overlap_error(rejected.value)
+        db.session.rollback()
+
+        insert(time(11))
+        insert(time(10, 30), status='cancelled')
+
+
+@pytest.mark.postgresql
+def test_claimed_slot_is_retried_until_released(postgresql_app):
+    user_id, area_id = member_and_area(postgresql_app)
+    with postgresql_app.app_context():
+        key = f'booking:{area_id}:{date.today().isoformat()}'
+        with db.engine.connect() as other:
+            other.execute(text('SELECT pg_advisory_xact_lock(hashtext(:key))'), {'key': key})
+            retries = reservations.stats()['retries']
+            with pytest.raises(BookingContention):
+                reservations.book(user_id, area_id, date.today(), time(10), 60, price=10)
+            assert reservations.stats()['retries'] - retries == reservations.attempts - 1
+            other.rollback()
+
+        reservations.book(user_id, area_id, date.today(), time(10), 60, price=10)
+        with pytest.raises(SlotUnavailable):
+            reservations.book(user_id, area_id, date.today(), time(10, 30), 60, price=10)
+
+
+def test_bookings_end_by_midnight(app, member_client, area_id):
+    response = member_client.post('/api/book-room', json={
+        'room_id': area_id, 'time': '23:30', 'duration': 60, 'price': 10,
+    })
+    assert response.status_code == 400
+
+    with app.app_context():
+        user_id = User.query.filter_by(username='123456').one().id
+        with pytest.raises(ValueError):
+            reservations.book(user_id, area_id, date.today(), time(23, 30), 60, price=10)
@@ -0,0 +1,41 @@
+"""
+Serialization tests
+FastJSONProvider output and schema serializers
+"""
+from datetime import date, datetime
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.serialization import FastJSONProvider, RawJSON
+
+
+@pytest.mark.parametrize('backend', ['orjson', 'json'])
+def test_provider_matches_flask_defaults(app, monkeypatch, backend):
+    pytest.importorskip(backend)
+    monkeypatch.setitem(app.config, 'JSON_BACKEND', backend)
+    provider = FastJSONProvider(app)
+    value = {'day': date(2026, 1, 2), 'at': datetime(2026, 1, 2, 3, 4, 5), 'name': 'Γυμναστήριο', 'n': [1, 2.5]}
+
+    assert provider.loads(provider.dumps(value)) == DefaultJSONProvider(app).loads(
+        DefaultJSONProvider(app).dumps(value))
+
+
+@pytest.mark.parametrize('backend', ['orjson', 'json'])
+def test_provider_embeds_raw_json(app, monkeypatch, backend):
+    pytest.importorskip(backend)
+    monkeypatch.setitem(app.config, 'JSON_BACKEND', backend)
+    provider = FastJSONProvider(app)
+
+    body = provider.dumps({'items': [RawJSON('{"a": [1, 2]}'), RawJSON('null')], 'text': '\x00'})
+
+    assert provider.loads(body) == {'items': [{'a': [1, 2]}, None], 'text': '\x00'}
+
+
+def test_booking_schema_formats_dates(app, member_client, area_id):
+    member_client.post('/api/book-room', json={'room_id': area_id, 'time': '09:00', 'duration': 60, 'price': 10})
+
+    booking = member_client.get('/api/user-bookings').get_json()['bookings'][0]
+
+    assert booking['date'] == date.today().isoformat()
+    assert booking['time'] == '09:00'
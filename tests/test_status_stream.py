@@ -0,0 +1,40 @@
+"""
+Status stream tests
+Event ids carry the process epoch, so ids from another worker get a snapshot
+"""
+import re
+
+
+def poll(client, since=None):
+    query = {'timeout': 0}
+    if since is not None:
+        query['since'] = since
+    return client.get('/api/gym-status/poll', query_string=query).get_json()
+
+
+def test_poll_resumes_from_own_ids(member_client, admin_client, tenant_id, area_id):
+    first = poll(member_client)
+    assert first['snapshot']
+
+    admin_client.post('/api/check-in', json={'area_id': area_id}, headers={'X-Tenant-ID': tenant_id})
+    delta = poll(member_client, first['seq'])
+
+    assert not delta['snapshot']
+    assert [area['id'] for area in delta['areas']] == [area_id]
+    assert delta['seq'] != first['seq']
+
+
+def test_foreign_ids_get_a_snapshot(member_client):
+    epoch, _, seq = poll(member_client)['seq'].rpartition('-')
+
+    for since in (seq, f'0{epoch}-{seq}', f'{epoch}-x'):
+        assert poll(member_client, since)['snapshot']
+    assert not poll(member_client, f'{epoch}-{seq}')['snapshot']
+
+
+def test_stream_ids_carry_epoch(member_client):
+    response = member_client.get('/api/gym-status/stream', headers={'Last-Event-ID': '3'},
+                                 environ_base={'wsgi.multithread': False})
+    body = response.get_data(as_text=True)
+
+    assert re.search(r'^id: [0-9a-f]+-\d+\nevent: snapshot$', body, re.M)
@@ -0,0 +1,42 @@
+"""
+Tenant resolution tests
+A session or token bound to one gym cannot be pointed at another
+"""
+import pytest
+
+from app import db
+from app.models import Tenant
+
+
+@pytest.fixture
+def other_tenant_id(app):
+    with app.app_context():
+        tenant = Tenant(name='Other Gym', subdomain='other', email='owner@other.example')
+        db.session.add(tenant)
+        db.session.commit()
+        return tenant.id
+
+
+def test_session_rejects_other_tenant_header(member_client, tenant_id, other_tenant_id):
+    assert member_client.get('/api/gym-status', headers={'X-Tenant-ID': tenant_id}).status_code == 200
+    assert member_client.get('/api/gym-status', headers={'X-Tenant-ID': 'demo'}).status_code == 200
+
+    assert member_client.get('/api/gym-status', headers={'X-Tenant-ID': other_tenant_id}).status_code == 403
+    assert member_client.get('/api/gym-status', headers={'X-Tenant-ID': 'other'}).status_code == 403
+
+
+def test_session_rejects_other_tenant_subdomain(app, tenant_id, other_tenant_id):
+    app.extensions['tenant_resolver'].base_domain = 'gymapp.test'
+    client = app.test_client()
+    # As with a session cookie shared across subdomains
+    for host in ('demo.gymapp.test', 'other.gymapp.test'):
+        with client.session_transaction(base_url=f'http://{host}') as session:
+            session['tenant_id'] = tenant_id
+
+    assert client.get('/api/gym-status', base_url='http://demo.gymapp.test').status_code == 200
+    assert client.get('/api/gym-status', base_url='http://other.gymapp.test').status_code == 403
+
+
+def test_token_rejects_other_tenant_header(admin_client, tenant_id, other_tenant_id):
+    assert admin_client.get('/admin/api/reports', headers={'X-Tenant-ID': tenant_id}).status_code == 200
+    assert admin_client.get('/admin/api/reports', headers={'X-Tenant-ID': other_tenant_id}).status_code == 403
@@ -0,0 +1,102 @@
+"""
+Translation tests
+Catalogs compile to valid .mo files on first use and fall back to the default language
+"""
+import gettext
+import json
+import os
+
+import pytest
+
+from app.utils.translations import MoCatalog, Translations, write_mo
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    (source / 'en.json').write_text(json.dumps({'welcome': 'Welcome', 'logout': 'Log out', 'book': 'Book'}))
+    (source / 'el.json').write_text(json.dumps({'welcome': 'Καλώς ήρθατε', 'book': 'Κράτηση'}),
+                                    encoding='utf-8')
+    translations = Translations()
+    translations.source_dir = str(source)
+    translations.compiled_dir = str(tmp_path / 'compiled')
+    return translations
+
+
+def test_mo_file_round_trip(tmp_path):
+    messages = {'zeta': 'Ζ', 'alpha': 'first', 'Ωmega': 'last', 'empty': ''}
+    path = str(tmp_path / 'catalog.mo')
+    write_mo(messages, path)
+
+    catalog = MoCatalog(path)
+    for key, text in messages.items():
+        assert catalog.get(key) == text
+    assert catalog.get('missing', 'default') == 'default'
+    assert sorted(catalog.keys()) == sorted(messages)
+
+
+def test_mo_file_readable_by_gettext(tmp_path):
+    # Without a header entry gettext assumes ASCII, so keep this catalog ASCII
+    path = str(tmp_path / 'catalog.mo')
+    write_mo({'b': 'second', 'a': 'first', 'c': 'third'}, path)
+
+    with open(path, 'rb') as f:
+        catalog = gettext.GNUTranslations(f)
+    assert [catalog.gettext(key) for key in 'abcd'] == ['first', 'second', 'third', 'd']
+
+
+def test_languages_compile_on_first_use(catalogs):
+    assert not os.path.exists(catalogs.compiled_dir)
+
+    assert catalogs.messages('el').welcome == 'Καλώς ήρθατε'
+    assert sorted(os.listdir(catalogs.compiled_dir)) == ['el.mo', 'en.mo']
+    assert catalogs.catalog('el') is catalogs.catalog('el')
+    assert catalogs.catalog('fr') is None
+    assert catalogs.catalog('../en') is None
+
+
+def test_stale_catalog_recompiled(catalogs):
+    catalogs.compile('en')
+    source = os.path.join(catalogs.source_dir, 'en.json')
+    with open(source, 'w') as f:
+        json.dump({'welcome': 'Hello'}, f)
+    compiled = os.path.join(catalogs.compiled_dir, 'en.mo')
+    os.utime(source, (os.path.getmtime(compiled) + 10,) * 2)
+
+    assert catalogs.messages('en')['welcome'] == 'Hello'
+
+
+def test_source_used_when_compiled_dir_unwritable(catalogs, monkeypatch):
+    def read_only(lang):
+        raise PermissionError(lang)
+
+    monkeypatch.setattr(catalogs, 'compile', read_only)
+
+    assert catalogs.messages('el').book == 'Κράτηση'
+
+
+def test_missing_keys_fall_back_to_default_language(catalogs):
+    greek = catalogs.messages('el')
+    assert greek.logout == 'Log out'
+    assert 'logout' in greek and 'missing' not in greek
+    assert greek.get('missing', '') == ''
+    with pytest.raises(KeyError):
+        greek['missing']
+    with pytest.raises(AttributeError):
+        greek.missing
+
+    unknown = catalogs.messages('fr')
+    assert (unknown.lang, unknown.welcome) == ('en', 'Welcome')
+
+
+def test_tenant_overrides_follow_settings(catalogs):
+    settings = {'translations': {'el': {'welcome': 'Γεια'}}}
+    first = catalogs.messages('el', settings, 'tenant-1')
+    assert first.welcome == 'Γεια' and first.book == 'Κράτηση' and first.version
+    assert catalogs.messages('el', settings, 'tenant-1') is first
+    assert catalogs.messages('el', settings, 'tenant-2') is not first
+    assert catalogs.messages('en', settings, 'tenant-1').welcome == 'Welcome'
+
+    replaced = {'translations': {'el': {'welcome': 'Καλησπέρα'}}}
+    assert catalogs.messages('el', replaced, 'tenant-1').welcome == 'Καλησπέρα'